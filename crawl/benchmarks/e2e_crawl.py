@@ -0,0 +1,169 @@
+# End-to-end crawl of a fixture user, fully offline, at increasing concurrency.
+#
+# Real orchestration (pool, scheduler, extractors, browser-use agents) against
+# local fixture sites, a scripted chat model instead of ChatGoogle, and a
+# headless local Chromium. Reports wall time, sources/min, peak RSS (crawler
+# plus browsers) and the time spent per phase, from the crawl trace.
+#
+#   uv run python -m benchmarks.e2e_crawl [--max-concurrency 5] [--chrome /usr/bin/chromium] [--json out.json]
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+import psutil
+
+from src.models import UserInput
+from src.crawl import crawl_user, slugify
+from src.browser_pool import BrowserPool
+from src.browser_settings import LINUX_HEADLESS_ARGS, find_chrome
+from src.http_client import HttpClient, set_http_client
+from src.tracing import Tracer, TracedChatModel, load_spans, set_tracer
+from benchmarks.fixture_sites import FixtureServer, fixture_links
+from benchmarks.scripted_llm import ScriptedChatModel
+
+PHASES = ["browser.launch", "profile.copy", "extractor", "agent.run", "agent.step", "llm", "action", "http"]
+
+
+async def sample_rss(stop: asyncio.Event, interval: float = 0.1) -> int:
+    # Peak resident memory of this process plus all its children (the browsers)
+    me = psutil.Process()
+    peak = 0
+    while not stop.is_set():
+        rss = 0
+        for proc in [me, *me.children(recursive=True)]:
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        peak = max(peak, rss)
+        await asyncio.sleep(interval)
+    return peak
+
+
+async def run_once(concurrency: int, chrome: str, server: FixtureServer, workdir: str, llm_latency: float, scrolls: int, max_jobs: int|None) -> dict:
+    out_path = os.path.join(workdir, f"out-{concurrency}")
+    chrome_user_dir = os.path.join(workdir, "chrome-user")
+    trace_path = os.path.join(workdir, f"trace-{concurrency}.jsonl")
+    chrome_args = server.chrome_args + LINUX_HEADLESS_ARGS + (["--no-sandbox"] if os.geteuid() == 0 else [])
+
+    def pool_factory(size: int) -> BrowserPool:
+        return BrowserPool(
+            size=size,
+            chrome_exec_path=chrome,
+            chrome_user_dir=chrome_user_dir,
+            base_port=9400,
+            tmp_root=os.path.join(workdir, f"profiles-{concurrency}"),
+            headless=True,
+            extra_args=chrome_args,
+            max_jobs=max_jobs,
+        )
+
+    user = UserInput(name="Ada Lovelace", links=fixture_links(), texts=[], docs=[])
+    set_tracer(Tracer(trace_path))
+    set_http_client(HttpClient(cache_dir=None, transport=server.transport()))
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(stop))
+    start = time.perf_counter()
+    try:
+        await crawl_user(
+            user,
+            out_path=out_path,
+            concurrency=concurrency,
+            force_refresh=True,
+            llm_factory=lambda: TracedChatModel(ScriptedChatModel(scrolls=scrolls, latency=llm_latency)),
+            pool_factory=pool_factory,
+        )
+    finally:
+        wall = time.perf_counter() - start
+        stop.set()
+        peak_rss = await sampler
+        set_tracer(None)
+
+    with open(os.path.join(out_path, f"{slugify(user.name)}.json"), "r") as f:
+        result = json.load(f)
+    phases = {p: 0.0 for p in PHASES}
+    for s in load_spans(trace_path):
+        if s["name"] in phases:
+            phases[s["name"]] += s["duration"]
+    return {
+        "concurrency": concurrency,
+        "sources": len(user.links),
+        "ok": sum(1 for v in result.values() if v),
+        "wall_s": wall,
+        "sources_per_min": len(user.links) / wall * 60,
+        "peak_rss_mb": peak_rss / 2**20,
+        "phases_s": phases,
+    }
+
+
+async def run(
+    chrome: str,
+    max_concurrency: int = 5,
+    llm_latency: float = 0.5,
+    scrolls: int = 2,
+    max_jobs: int|None = None,
+    server_delay: float = 0.02,
+) -> list[dict]:
+    # One run per concurrency level 1..max_concurrency
+    with tempfile.TemporaryDirectory() as workdir:
+        # An empty, logged-out profile is enough for the fixture sites
+        os.makedirs(os.path.join(workdir, "chrome-user", "Default"))
+        with open(os.path.join(workdir, "chrome-user", "Default", "Preferences"), "w") as f:
+            f.write("{}")
+        server = FixtureServer(delay=server_delay)
+        server.start(workdir)
+        try:
+            runs = []
+            for c in range(1, max_concurrency + 1):
+                runs.append(await run_once(c, chrome, server, workdir, llm_latency, scrolls, max_jobs))
+        finally:
+            server.stop()
+    return runs
+
+
+def check(runs: list[dict]) -> list[str]:
+    # What must hold: every source of the fixture user has a result at every concurrency
+    return [f"concurrency {r['concurrency']}: {r['ok']}/{r['sources']} sources with a result" for r in runs if r["ok"] < r["sources"]]
+
+
+async def main(args):
+    chrome = find_chrome(args.chrome)
+    if chrome is None:
+        print("No Chromium found: pass --chrome or set CHROME_PATH", file=sys.stderr)
+        sys.exit(2)
+
+    runs = await run(chrome, args.max_concurrency, args.llm_latency, args.scrolls, args.max_jobs, args.server_delay)
+
+    print(f"{'conc':>4} {'ok':>5} {'wall':>8} {'src/min':>8} {'peak RSS':>9}  " + " ".join(f"{p:>14}" for p in PHASES))
+    for r in runs:
+        print(
+            f"{r['concurrency']:>4} {r['ok']:>2}/{r['sources']:<2} {r['wall_s']:>7.1f}s {r['sources_per_min']:>8.1f} {r['peak_rss_mb']:>7.0f}MB  "
+            + " ".join(f"{r['phases_s'][p]:>13.1f}s" for p in PHASES)
+        )
+    print("phases are summed over parallel work")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"chrome": chrome, "runs": runs}, f, indent=2)
+    problems = check(runs)
+    for p in problems:
+        print(f"FAIL: {p}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-concurrency", type=int, default=5, help="run at concurrency 1..N")
+    parser.add_argument("--chrome", default=None, help="Chromium executable (default: $CHROME_PATH or chromium on PATH)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per scripted LLM call")
+    parser.add_argument("--scrolls", type=int, default=2, help="scroll steps per agent before `done`")
+    parser.add_argument("--max-jobs", type=int, default=None, help="recycle each browser after this many jobs")
+    parser.add_argument("--server-delay", type=float, default=0.02, help="seconds per fixture response")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,230 @@
+# Local copies of the sites crawled for one fixture user, served over HTTP and HTTPS.
+#
+# Requests are routed by Host header, so links keep their real URLs
+# (https://github.com/ada, ...): Chromium reaches the HTTPS server through
+# --host-resolver-rules, the shared HTTP client through FixtureTransport.
+import os
+import ssl
+import json
+import time
+import datetime
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from src.models import Link
+
+USERNAME = "ada"
+WEBSITE = "ada-lovelace.dev"
+N_REPOS = 12
+
+
+def fixture_links() -> list[Link]:
+    return [
+        Link(url=f"https://www.linkedin.com/in/{USERNAME}", description=""),
+        Link(url=f"https://github.com/{USERNAME}", description=""),
+        Link(url=f"https://x.com/{USERNAME}", description=""),
+        Link(url=f"https://huggingface.co/{USERNAME}", description=""),
+        Link(url=f"https://{WEBSITE}", description="personal website"),
+    ]
+
+
+def _page(title: str, body: str, links: list[str] = ()) -> str:
+    anchors = "".join(f'<li><a href="{href}">{href}</a></li>' for href in links)
+    paragraphs = "".join(f"<p>{body} Paragraph {i}.</p>" for i in range(20))
+    return f"<html><head><title>{title}</title></head><body><h1>{title}</h1>{paragraphs}<ul>{anchors}</ul></body></html>"
+
+
+def _repo(i: int, owner: str = USERNAME) -> dict:
+    return {
+        "name": f"repo-{i}",
+        "full_name": f"{owner}/repo-{i}",
+        "owner": {"login": owner},
+        "description": f"Fixture repository {i}",
+        "fork": False,
+        "private": False,
+        "stargazers_count": 100 - i,
+        "forks_count": i,
+        "topics": ["fixture"],
+        "homepage": "",
+        "license": {"spdx_id": "MIT"},
+        "pushed_at": f"2025-01-{i + 1:02d}T00:00:00Z",
+        "updated_at": f"2025-01-{i + 1:02d}T00:00:00Z",
+    }
+
+
+def _hub_items(kind: str, limit: int) -> list[dict]:
+    prefix = "model" if kind == "models" else "dataset"
+    return [
+        {
+            "id": f"{USERNAME}/{prefix}-{i}",
+            "pipeline_tag": "text-generation",
+            "downloads": 1000 - i,
+            "likes": i,
+            "lastModified": f"2025-02-{i + 1:02d}T00:00:00Z",
+            "tags": ["size_categories:1K<n<10K"],
+        }
+        for i in range(limit)
+    ]
+
+
+def route(host: str, path: str, query: dict) -> tuple[int, str, str]|None:
+    # (status, content type, body) for a request, None for 404
+    host = host.split(":")[0].removeprefix("www.")
+    html, js = "text/html; charset=utf-8", "application/json"
+
+    if host == "api.github.com":
+        if path == f"/users/{USERNAME}":
+            return 200, js, json.dumps({
+                "login": USERNAME, "name": "Ada Lovelace", "type": "User", "bio": "Analytical engines.",
+                "company": "Fixture Inc.", "location": "London", "blog": f"https://{WEBSITE}",
+                "twitter_username": USERNAME, "public_repos": N_REPOS, "followers": 42,
+                "updated_at": "2025-01-01T00:00:00Z",
+            })
+        if path == f"/users/{USERNAME}/repos":
+            return 200, js, json.dumps([_repo(i) for i in range(min(N_REPOS, int(query.get("per_page", 100))))])
+        if path == f"/users/{USERNAME}/starred":
+            return 200, js, json.dumps([_repo(i, owner="babbage") for i in range(3)])
+        if path == f"/users/{USERNAME}/social_accounts":
+            return 200, js, json.dumps([{"url": f"https://x.com/{USERNAME}"}])
+        if path.endswith("/languages"):
+            return 200, js, json.dumps({"Python": 1000, "C": 200})
+        if path.endswith("/readme"):
+            return 200, "text/plain", "# Fixture\n\nA fixture README. " * 50
+        if path.endswith("/commits"):
+            return 200, js, json.dumps([{"commit": {"author": {"date": "2025-01-01T00:00:00Z"}, "message": "Initial commit"}}])
+        return None
+
+    if host == "github.com":
+        if path == f"/users/{USERNAME}/contributions":
+            return 200, html, "<h2>1,234 contributions in the last year</h2>"
+        return 200, html, _page(f"{USERNAME} on GitHub", "Fixture GitHub profile.", [f"/{USERNAME}?tab=repositories"])
+
+    if host == "huggingface.co":
+        if path == f"/api/users/{USERNAME}/overview":
+            return 200, js, json.dumps({
+                "user": USERNAME, "fullname": "Ada Lovelace", "type": "user", "details": "Fixture ML interests",
+                "numModels": 4, "numDatasets": 4, "numFollowers": 10, "orgs": [{"name": "fixture-org"}],
+            })
+        if path in ("/api/models", "/api/datasets"):
+            return 200, js, json.dumps(_hub_items(path.rsplit("/", 1)[1], int(query.get("limit", 3))))
+        if path == "/api/collections":
+            return 200, js, json.dumps([{"title": "Fixture collection", "slug": f"{USERNAME}/fixture-1", "description": ""}])
+        if path.endswith("/README.md"):
+            return 200, "text/plain", "# Card\n\nA fixture model card. " * 50
+        return 200, html, _page(f"{USERNAME} on Hugging Face", "Fixture Hugging Face profile.")
+
+    if host == "linkedin.com":
+        return 200, html, _page("Ada Lovelace | LinkedIn", "Fixture LinkedIn experience.", [f"/in/{USERNAME}/recent-activity/"])
+
+    if host == "x.com":
+        return 200, html, _page("Ada Lovelace (@ada) / X", "Fixture post.")
+
+    if host == WEBSITE:
+        if path == "/llms.txt":
+            return 200, "text/plain", f"# Ada Lovelace\n\n- [About](https://{WEBSITE}/about)\n- [Projects](https://{WEBSITE}/projects)\n"
+        if path == "/sitemap.xml":
+            urls = "".join(f"<url><loc>https://{WEBSITE}{p}</loc><lastmod>2025-01-01</lastmod></url>" for p in ("/", "/about", "/projects"))
+            return 200, "application/xml", f'<?xml version="1.0"?><urlset>{urls}</urlset>'
+        if path in ("/", "/about", "/projects"):
+            return 200, html, _page(f"Ada Lovelace {path}", "Fixture personal website.", ["/about", "/projects"])
+    return None
+
+
+class FixtureServer():
+    """The fixture sites on 127.0.0.1, over plain HTTP and over HTTPS (self-signed)."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.requests = 0
+        self._servers: list[ThreadingHTTPServer] = []
+
+    def start(self, certdir: str) -> None:
+        self.http = self._serve(None)
+        self.https = self._serve(self._ssl_context(certdir))
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    @property
+    def chrome_args(self) -> list[str]:
+        return [
+            f"--host-resolver-rules=MAP * 127.0.0.1:{self.https.server_port}, EXCLUDE 127.0.0.1",
+            "--ignore-certificate-errors",
+        ]
+
+    def transport(self) -> "FixtureTransport":
+        return FixtureTransport(self.http.server_port)
+
+    def _serve(self, context: ssl.SSLContext|None) -> ThreadingHTTPServer:
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests += 1
+                time.sleep(fixture.delay)
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                found = route(self.headers.get("Host", ""), url.path, query)
+                status, ctype, body = found or (404, "text/plain", "not found")
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        if context is not None:
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        return server
+
+    @staticmethod
+    def _ssl_context(certdir: str) -> ssl.SSLContext:
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "askthebio fixtures")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        cert_path, key_path = os.path.join(certdir, "cert.pem"), os.path.join(certdir, "key.pem")
+        with open(cert_path, "wb") as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_path, "wb") as f:
+            f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        return context
+
+
+class FixtureTransport(httpx.AsyncHTTPTransport):
+    # Send every request to the local HTTP server; the Host header keeps the real site
+    def __init__(self, port: int) -> None:
+        super().__init__()
+        self.port = port
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return await super().handle_async_request(request)
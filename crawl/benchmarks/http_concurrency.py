@@ -0,0 +1,103 @@
+# Check that a slow action does not block other agents, and that the on-disk cache revalidates.
+# Exits non-zero if either fails; tests/test_http_client.py runs the same check.
+#
+#   uv run python -m benchmarks.http_concurrency [--delay 2]
+import sys
+import time
+import argparse
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.http_client import HttpClient
+
+
+def serve(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.server.revalidations += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(b"slow body")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.revalidations = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def agent_steps(stop: asyncio.Event) -> int:
+    # Stand-in for another agent: count event-loop turns while the slow action runs
+    steps = 0
+    while not stop.is_set():
+        steps += 1
+        await asyncio.sleep(0.01)
+    return steps
+
+
+async def run(delay: float) -> dict:
+    server = serve(delay)
+    url = f"http://127.0.0.1:{server.server_port}/repo"
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = HttpClient(cache_dir=cache_dir)
+            stop = asyncio.Event()
+            other = asyncio.create_task(agent_steps(stop))
+            start = time.perf_counter()
+            resp = await client.get(url)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            steps = await other
+
+            start = time.perf_counter()
+            cached = await client.get(url)
+            revalidated = time.perf_counter() - start
+            await client.aclose()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        "slow_seconds": elapsed,
+        "status": resp.status_code,
+        "other_steps": steps,
+        "expected_steps": int(elapsed / 0.01),
+        "revalidated_seconds": revalidated,
+        "revalidated_status": cached.status_code,
+        "revalidated_body": cached.text,
+        "revalidations": server.revalidations,
+    }
+
+
+def check(r: dict, delay: float) -> list[str]:
+    # What must hold: the other agent kept stepping, the second request was a 304 served from the cache
+    problems = []
+    if r["other_steps"] < r["expected_steps"] / 2:
+        problems.append(f"other agent made {r['other_steps']} steps, expected ~{r['expected_steps']}: the event loop was blocked")
+    if r["revalidations"] != 1 or r["revalidated_status"] != 200 or r["revalidated_body"] != "slow body":
+        problems.append(f"second request was not revalidated from the cache ({r['revalidations']} conditional requests, status {r['revalidated_status']})")
+    if r["revalidated_seconds"] > delay / 2:
+        problems.append(f"revalidated request took {r['revalidated_seconds']:.2f}s")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=2.0)
+    delay = parser.parse_args().delay
+    r = asyncio.run(run(delay))
+    print(f"slow action: {r['slow_seconds']:.2f}s, status={r['status']}; other agent made {r['other_steps']} steps meanwhile (~{r['expected_steps']} if never blocked)")
+    print(f"revalidated: {r['revalidated_seconds']:.3f}s, status={r['revalidated_status']}, body={r['revalidated_body']!r}")
+    problems = check(r, delay)
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
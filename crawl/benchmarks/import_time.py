@@ -0,0 +1,55 @@
+# Import time of the CLI entry points, each in a fresh interpreter (best of N runs).
+# Track it over time with --json; --max-plan-seconds fails when planning gets slow.
+#
+#   uv run python -m benchmarks.import_time [--runs 5] [--json import_time.json]
+import sys
+import json
+import argparse
+import subprocess
+
+TARGETS = {
+    "plan (main.py --plan)": "import main; from src.plan import plan_users; plan_users([main.default_user()])",
+    "src.customizations": "import src.customizations",
+    "resolve + import one customization": "from src.customizations import registry; registry.resolve('https://github.com/a').load()",
+    "src.crawl": "import src.crawl",
+    "src.batch": "import src.batch",
+}
+
+
+def measure(code: str, runs: int) -> tuple[float, list[str]]:
+    # Wall time of the import in a clean process, and which heavy packages it pulled in
+    probe = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - t)\n"
+        "print(','.join(m for m in ('browser_use', 'docling', 'torch', 'playwright') if m in sys.modules))\n"
+    )
+    best, heavy = float("inf"), []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.split("\n")
+        best = min(best, float(out[0]))
+        heavy = [m for m in out[1].split(",") if m]
+    return best, heavy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    parser.add_argument("--max-plan-seconds", type=float, default=None, help="exit non-zero if planning is slower")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'target':<38} {'seconds':>8}  heavy imports")
+    for name, code in TARGETS.items():
+        seconds, heavy = measure(code, args.runs)
+        results[name] = {"seconds": seconds, "heavy_imports": heavy}
+        print(f"{name:<38} {seconds:>8.3f}  {', '.join(heavy) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    plan = results["plan (main.py --plan)"]
+    if args.max_plan_seconds is not None and (plan["seconds"] > args.max_plan_seconds or plan["heavy_imports"]):
+        sys.exit(1)
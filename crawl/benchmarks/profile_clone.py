@@ -0,0 +1,49 @@
+# Compare full profile copies against snapshot + clone for N browsers.
+#
+#   uv run python -m benchmarks.profile_clone --clones 5 [--chrome-user-dir DIR] [--profile NAME]
+import os
+import argparse
+import tempfile
+
+from src.profiles import CopyStats, detect_profile_name, build_template, clone_tree, copy_full_profile
+
+
+def fmt(label: str, stats: CopyStats) -> str:
+    return (
+        f"{label:<22} files={stats.files:<7} copied={stats.bytes_copied / 1e6:>10.1f}MB "
+        f"cloned={stats.bytes_cloned / 1e6:>8.1f}MB linked={stats.bytes_linked / 1e6:>8.1f}MB "
+        f"time={stats.seconds:.3f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chrome-user-dir", default=os.path.expanduser("~/Library/Application Support/Google/Chrome/"))
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--clones", type=int, default=5)
+    parser.add_argument("--clone-mode", default="auto", choices=["auto", "reflink", "hardlink", "copy"])
+    parser.add_argument("--skip-full", action="store_true", help="don't run the (slow) full copytree baseline")
+    args = parser.parse_args()
+    profile = args.profile or detect_profile_name(args.chrome_user_dir)
+
+    with tempfile.TemporaryDirectory(prefix="askthebio-bench-") as tmp:
+        if not args.skip_full:
+            full = CopyStats()
+            for i in range(args.clones):
+                full.add(copy_full_profile(args.chrome_user_dir, profile, os.path.join(tmp, "full", str(i))))
+            print(fmt("full copytree", full))
+
+        template_dir = os.path.join(tmp, "template")
+        template = build_template(args.chrome_user_dir, profile, template_dir)
+        print(fmt("snapshot template", template))
+        clones = CopyStats()
+        for i in range(args.clones):
+            clones.add(clone_tree(template_dir, os.path.join(tmp, "snapshot", str(i)), args.clone_mode))
+        print(fmt(f"snapshot clones ({args.clone_mode})", clones))
+        total = template.model_copy()
+        total.add(clones)
+        print(fmt("snapshot total", total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Prompt tokens of the built-in customizations' agents, full vs slim schemas.
+#
+# Each agent runs its real browser-use prompts (system prompt, task, history,
+# output schema of its controller) against the scripted chat model, on an
+# empty page and without a browser: what is left is the fixed per-step
+# overhead, the page content being the same in both modes. With slim schemas
+# the `done` notes are then turned into the full result by UserCrawl's final
+# extraction call, which is counted too.
+#
+#   uv run python -m benchmarks.prompt_overhead [--steps 30] [--name "Ada Lovelace"]
+import os
+import json
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+from browser_use import Agent, Controller
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList, AgentStepInfo
+from browser_use.browser.views import BrowserStateHistory, BrowserStateSummary
+from browser_use.dom.views import SerializedDOMState
+from pydantic import BaseModel
+
+from src.models import UserInput
+from src.crawl import UserCrawl, customization_for
+from src.budgets import Deadline
+from src.prompt_overhead import schema_tokens
+from src.customizations.base_customization import BaseCustomization
+from benchmarks.fixture_sites import fixture_links
+from benchmarks.scripted_llm import ScriptedChatModel
+
+
+async def run_agent(crawl: UserCrawl, builder: BaseCustomization, prompt: str, output_model: type[BaseModel], steps: int) -> tuple[int, BaseModel|None]:
+    # Prompt tokens of `steps` agent steps (the last one `done`) plus the final extraction, if any
+    llm = ScriptedChatModel(scrolls=steps - 2, latency=0.0)
+    crawl.llm_factory = lambda: llm
+    agent = Agent(task=prompt, llm=llm, controller=crawl.controller(builder, output_model))
+    page = BrowserStateSummary(
+        dom_state=SerializedDOMState(_root=None, selector_map={}), url=builder.link.url, title="Fixture", tabs=[],
+    )
+    history = AgentHistoryList(history=[])
+    output, result = None, None
+    for step in range(steps):
+        agent._message_manager.create_state_messages(
+            page, model_output=output, result=result, step_info=AgentStepInfo(step_number=step, max_steps=steps), use_vision=False,
+        )
+        output = (await llm.ainvoke(agent._message_manager.get_messages(), agent.AgentOutput)).completion
+        action = output.action[0].model_dump(exclude_none=True)
+        if "done" in action:
+            result = [ActionResult(is_done=True, success=True, extracted_content=json.dumps(action["done"]["data"]))]
+        else:
+            result = [ActionResult(extracted_content=f"Ran {next(iter(action))} on the fixture page, step {step}.")]
+        history.history.append(AgentHistory(
+            model_output=output, result=result, state=BrowserStateHistory(url=page.url, title=page.title, tabs=[], interacted_element=[None]),
+        ))
+    parsed = await crawl.agent_output(builder, history, output_model, Deadline())
+    return llm.prompt_tokens, parsed
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as out_path:
+        user = UserInput(name=args.name, links=fixture_links(), texts=[], docs=[])
+        full = UserCrawl(user, out_path)
+        slim = UserCrawl(user, out_path, slim_schemas=True)
+
+        print(f"{'agent':<22} {'schema full':>11} {'slim':>6} {'tokens full':>11} {'slim':>8} {'per step':>9} {'saved':>6}")
+        totals = [0, 0]
+        for link in user.links:
+            builder = customization_for(link, out_path)
+            if builder.fan_out:
+                tasks = [t for t in [builder.discovery(user.name)] if t is not None] + builder.subtasks(user.name, None)
+                agents = [(f"{builder.name}/{t.key}", t.prompt, t.output_model) for t in tasks]
+            else:
+                agents = [(builder.name, builder.prompt(user.name), builder.result_class())]
+            for key, prompt, output_model in agents:
+                full_tokens, full_result = await run_agent(full, builder, prompt, output_model, args.steps)
+                slim_tokens, slim_result = await run_agent(slim, builder, prompt, output_model, args.steps)
+                assert isinstance(full_result, output_model) and isinstance(slim_result, output_model), f"{key}: no result"
+                totals[0] += full_tokens
+                totals[1] += slim_tokens
+                print(
+                    f"{key:<22} {schema_tokens(full.controller(builder, output_model)):>11} {schema_tokens(slim.controller(builder, output_model)):>6} "
+                    f"{full_tokens:>11} {slim_tokens:>8} {(full_tokens - slim_tokens) / args.steps:>9.0f} {1 - slim_tokens / full_tokens:>6.0%}"
+                )
+        print(f"{'total':<22} {'':>11} {'':>6} {totals[0]:>11} {totals[1]:>8} {'':>9} {1 - totals[1] / totals[0]:>6.0%}")
+        print(f"{args.steps} steps per agent, empty pages; slim includes the final extraction call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=30, help="steps per agent, the last one `done`")
+    parser.add_argument("--name", default="Ada Lovelace")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+# Build time, size and query latency of the retrieval index, and recall on sample questions.
+#
+#   uv run python -m benchmarks.retrieval [--scale 1 10 100] [--k 5]
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from src.context import count_tokens
+from src.retrieval import RetrievalIndex
+
+TOPICS = ["compilers", "robotics", "databases", "music", "climbing", "cooking", "vision", "security", "chess", "gardening"]
+LANGUAGES = ["Python", "Rust", "Go", "TypeScript", "C", "Haskell", "Julia", "Kotlin"]
+
+# (question, text that must appear in one of the retrieved passages)
+QUESTIONS = [
+    ("Where does Ada work now?", "Analytical Engines Ltd"),
+    ("Where did she study?", "University of London"),
+    ("What was her job at Babbage Labs?", "Difference Engine Architect"),
+    ("Which repository has the most stars?", "note-g"),
+    ("What programming languages does she use for note-g?", "Haskell"),
+    ("Has she published any dataset on Hugging Face?", "bernoulli-numbers"),
+    ("What is her personal website about?", "poetical science"),
+    ("What did she post about looms?", "Jacquard loom"),
+    ("Where is she based?", "Marylebone"),
+    ("Does she have any certifications?", "Certified Mathematician"),
+]
+
+
+def sample_bio(scale: int, seed: int = 0) -> dict:
+    # Results shaped like the crawl's final JSON: the facts of QUESTIONS plus `scale` x filler
+    rng = random.Random(seed)
+    filler = lambda n: " ".join(rng.choice(TOPICS) for _ in range(n))
+    return {
+        "linkedin": {
+            "personal_info": {"name": "Ada Lovelace", "job_title": "Chief Scientist", "location": "Marylebone, London", "user_bio": filler(40)},
+            "experiences": [
+                {"job_title": "Chief Scientist", "company": "Analytical Engines Ltd", "description": "Leads research. " + filler(30)},
+                {"job_title": "Difference Engine Architect", "company": "Babbage Labs", "description": filler(30)},
+            ] + [{"job_title": f"Engineer {i}", "company": f"Company {i}", "description": filler(30)} for i in range(3 * scale)],
+            "education": [{"school": "University of London", "degree": "Mathematics"}],
+            "certifications": [{"name": "Certified Mathematician", "issuer": "Royal Society"}],
+            "posts": [{"summary": "Thoughts on the Jacquard loom and punched cards."}]
+            + [{"summary": f"Post {i} about {filler(25)}"} for i in range(20 * scale)],
+        },
+        "github": {
+            "username": "ada",
+            "personal_bio": filler(20),
+            "repositories_detailed": [
+                {"name": "note-g", "stars": 9000, "languages": ["Haskell"], "readme_summary": "Bernoulli numbers, the first program. " + filler(40)},
+            ] + [
+                {"name": f"repo-{i}", "stars": i, "languages": [rng.choice(LANGUAGES)], "readme_summary": filler(60)}
+                for i in range(8 * scale)
+            ],
+        },
+        "huggingface": {
+            "datasets": [{"name": "ada/bernoulli-numbers", "summary": "The Bernoulli numbers of Note G."}],
+            "models": [{"name": f"ada/model-{i}", "summary": filler(30)} for i in range(3 * scale)],
+        },
+        "website": {
+            "root_url": "https://ada-lovelace.dev",
+            "overall_summary": "A personal website about poetical science and the analytical engine.",
+            "children": [{"url": f"https://ada-lovelace.dev/p/{i}", "page_summary": filler(80)} for i in range(10 * scale)],
+        },
+        "CV": "# Ada Lovelace\n\n" + "\n\n".join(f"## Section {i}\n\n{filler(120)}" for i in range(5 * scale)),
+    }
+
+
+def main(scales: list[int], k: int, budget: int, n_queries: int):
+    print(f"{'scale':>5} {'chunks':>7} {'tokens':>9} {'build':>8} {'size':>9} {'load':>8} {'q p50':>8} {'q p95':>8} {'recall@k':>9} {'ctx tok':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            bio = sample_bio(scale)
+            start = time.perf_counter()
+            index = RetrievalIndex.build(bio)
+            path = os.path.join(tmp, f"bio-{scale}.index.json.gz")
+            index.save(path)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index = RetrievalIndex.load(path)
+            load = time.perf_counter() - start
+
+            latencies = []
+            for i in range(n_queries):
+                question = QUESTIONS[i % len(QUESTIONS)][0]
+                start = time.perf_counter()
+                index.search(question, k=k, budget=budget)
+                latencies.append(time.perf_counter() - start)
+
+            found, context_tokens = 0, []
+            for question, answer in QUESTIONS:
+                hits = index.search(question, k=k, budget=budget)
+                found += any(answer in chunk.text for chunk, _ in hits)
+                context_tokens.append(sum(count_tokens(chunk.render()) for chunk, _ in hits))
+
+            total_tokens = sum(count_tokens(c.render()) for c in index.chunks)
+            q = statistics.quantiles(latencies, n=100)
+            print(
+                f"{scale:>5} {len(index.chunks):>7} {total_tokens:>9} {build * 1000:>6.1f}ms {os.path.getsize(path) / 1024:>7.1f}KB "
+                f"{load * 1000:>6.1f}ms {q[49] * 1000:>6.2f}ms {q[94] * 1000:>6.2f}ms {found:>4}/{len(QUESTIONS):<4} {statistics.mean(context_tokens):>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100], help="filler multiplier (posts, repos, pages, ...)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=2000, help="token budget of the retrieved passages")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    main(args.scale, args.k, args.budget, args.queries)
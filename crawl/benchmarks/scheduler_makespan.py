@@ -0,0 +1,106 @@
+# Makespan of FIFO vs longest-first ordering, by simulation and by running the real Scheduler,
+# and the peak concurrency per domain under the domain limits. Exits non-zero if
+# longest-first is slower than FIFO or a domain runs over its max_concurrent.
+#
+#   uv run python -m benchmarks.scheduler_makespan [--workers 3] [--users 5]
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+from src.models import Link
+from src.customizations.base_customization import BaseCustomization
+from src.scheduler import DomainLimit, DurationHistory, Scheduler, job_domain, simulate
+
+# (url, name, expected seconds): one crawl of a typical user, in link order
+TYPICAL = [
+    ("https://diegobit.com", "website", 120),
+    ("https://x.com/a", "x", 300),
+    ("https://huggingface.co/a", "huggingface", 200),
+    ("https://linkedin.com/in/a", "linkedin", 600),
+    ("https://github.com/a", "github", 900),
+]
+
+
+def workloads(users: int) -> list[tuple[str, list[tuple[str, str, float]]]]:
+    # One typical user, and a batch of users with durations jittered by +-50%
+    random.seed(0)
+    batch = [(url, name, s * random.uniform(0.5, 1.5)) for _ in range(users) for url, name, s in TYPICAL]
+    return [("single user", list(TYPICAL)), (f"batch of {users}", batch)]
+
+
+async def run_real(durations: list[tuple[str, str, float]], workers: int, scale: float, longest_first: bool) -> float:
+    history = DurationHistory()
+    jobs = []
+    for i, (url, name, seconds) in enumerate(durations):
+        builder = BaseCustomization(link=Link(url=url), name=f"{name}-{i}")
+        # FIFO is emulated by estimates that decrease in link order
+        history.durations[builder.name] = seconds if longest_first else len(durations) - i
+        jobs.append((builder, lambda s=seconds: asyncio.sleep(s * scale)))
+    start = time.perf_counter()
+    await Scheduler(n_workers=workers, history=history, domain_limits={}).run(jobs)
+    return (time.perf_counter() - start) / scale
+
+
+async def peak_concurrency(durations: list[tuple[str, str, float]], workers: int, scale: float, limits: dict[str, DomainLimit]) -> dict[str, int]:
+    # Most jobs of each domain that ran at the same time
+    running, peak = {}, {}
+    jobs = []
+    for i, (url, name, seconds) in enumerate(durations):
+        builder = BaseCustomization(link=Link(url=url), name=f"{name}-{i}")
+
+        async def job(domain=job_domain(builder), seconds=seconds):
+            running[domain] = running.get(domain, 0) + 1
+            peak[domain] = max(peak.get(domain, 0), running[domain])
+            await asyncio.sleep(seconds * scale)
+            running[domain] -= 1
+
+        jobs.append((builder, job))
+    await Scheduler(n_workers=workers, history=DurationHistory(), domain_limits=limits).run(jobs)
+    return peak
+
+
+def check(simulated: tuple[float, float], real: tuple[float, float], peak: dict[str, int], limits: dict[str, DomainLimit], tolerance: float = 0.05) -> list[str]:
+    problems = []
+    if simulated[1] > simulated[0]:
+        problems.append(f"simulated LPT makespan {simulated[1]:.0f}s > FIFO {simulated[0]:.0f}s")
+    # Real runs sleep, allow some timer jitter
+    if real[1] > real[0] * (1 + tolerance):
+        problems.append(f"Scheduler LPT makespan {real[1]:.0f}s > FIFO {real[0]:.0f}s")
+    for domain, n in peak.items():
+        if domain in limits and n > limits[domain].max_concurrent:
+            problems.append(f"{domain}: {n} jobs at once, limit {limits[domain].max_concurrent}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.001, help="seconds of real sleep per simulated second")
+    args = parser.parse_args()
+
+    problems = []
+    for label, jobs in workloads(args.users):
+        seconds = [s for _, _, s in jobs]
+        simulated = simulate(seconds, args.workers, longest_first=False), simulate(seconds, args.workers)
+        print(f"{label:<14} simulated  FIFO={simulated[0]:>8.0f}s  LPT={simulated[1]:>8.0f}s  ({100 * (1 - simulated[1] / simulated[0]):.0f}% shorter)")
+        real = (
+            asyncio.run(run_real(jobs, args.workers, args.scale, longest_first=False)),
+            asyncio.run(run_real(jobs, args.workers, args.scale, longest_first=True)),
+        )
+        print(f"{label:<14} Scheduler  FIFO={real[0]:>8.0f}s  LPT={real[1]:>8.0f}s  ({100 * (1 - real[1] / real[0]):.0f}% shorter)")
+        # Token buckets off: only the concurrency limits are checked
+        limits = {"github.com": DomainLimit(max_concurrent=2), "linkedin.com": DomainLimit(max_concurrent=1), "x.com": DomainLimit(max_concurrent=1)}
+        peak = asyncio.run(peak_concurrency(jobs, args.workers + 2, args.scale, limits))
+        print(f"{label:<14} peak jobs per domain: {peak}")
+        problems += [f"{label}: {p}" for p in check(simulated, real, peak, limits)]
+
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
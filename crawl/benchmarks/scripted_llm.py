@@ -0,0 +1,146 @@
+# Deterministic stand-in for ChatGoogle, so that agents and extractors run offline.
+#
+# Browser agents get a fixed script: open the URL of the task, scroll a few
+# times, then call `done` with a placeholder instance of the result model.
+# Any other structured call (extractor summaries) gets a placeholder instance
+# of the requested model; free-text calls get a short fixed answer. Usage counts
+# the output schema as prompt tokens, as Gemini does with its response schema.
+import re
+import json
+import enum
+import types
+import asyncio
+import typing
+from typing import Any, Literal, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from browser_use.llm.schema import SchemaOptimizer
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+
+
+def placeholder(annotation: Any, name: str = "value") -> Any:
+    # Smallest JSON value that validates against `annotation`
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if annotation is type(None):
+        return None
+    if origin in (Union, types.UnionType):
+        return placeholder(next(a for a in args if a is not type(None)), name)
+    if origin is Literal:
+        return args[0]
+    if origin in (list, set, tuple, typing.Sequence):
+        return [placeholder(args[0], name)] if args else []
+    if origin is dict or annotation is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return placeholder_model(annotation)
+        if issubclass(annotation, enum.Enum):
+            return next(iter(annotation)).value
+        if issubclass(annotation, bool):
+            return True
+        if issubclass(annotation, int):
+            return 1
+        if issubclass(annotation, float):
+            return 1.0
+    return f"fixture {name}"
+
+
+def placeholder_model(model: type[BaseModel]) -> dict:
+    return {name: placeholder(field.annotation, name) for name, field in model.model_fields.items()}
+
+
+def _text(message) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(getattr(part, "text", "") for part in content or [])
+
+
+def _action_params(output_format: type[BaseModel], action: str) -> type[BaseModel]|None:
+    # AgentOutput.action is list[ActionModel], where ActionModel is one model or a RootModel union of them
+    action_model = get_args(output_format.model_fields["action"].annotation)[0]
+    candidates = get_args(action_model.model_fields["root"].annotation) if "root" in action_model.model_fields else (action_model,)
+    for candidate in candidates:
+        if action in candidate.model_fields:
+            annotation = candidate.model_fields[action].annotation
+            return next((a for a in get_args(annotation) if a is not type(None)), annotation)
+    return None
+
+
+class ScriptedChatModel():
+    """Replays a fixed script for one agent; create one per agent (as make_llm() does)."""
+
+    _verified_api_keys = True
+
+    def __init__(self, scrolls: int = 2, latency: float = 0.05) -> None:
+        self.model = "scripted"
+        self.scrolls = scrolls
+        self.latency = latency
+        self.calls = 0
+        self.agent_steps = 0
+        self.prompt_tokens = 0
+
+    @property
+    def provider(self) -> str:
+        return "scripted"
+
+    @property
+    def name(self) -> str:
+        return self.model
+
+    @property
+    def model_name(self) -> str:
+        return self.model
+
+    async def ainvoke(self, messages, output_format=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        prompt = "\n".join(_text(m) for m in messages)
+        schema = json.dumps(SchemaOptimizer.create_optimized_json_schema(output_format)) if output_format else ""
+
+        if output_format is None:
+            completion = "Scripted answer."
+            out = completion
+        elif "action" in output_format.model_fields:
+            completion = output_format.model_validate(self._agent_step(prompt, output_format))
+            out = completion.model_dump_json(exclude_none=True)
+        else:
+            completion = output_format.model_validate(placeholder_model(output_format))
+            out = completion.model_dump_json()
+
+        usage = ChatInvokeUsage(
+            prompt_tokens=(len(prompt) + len(schema)) // 4,
+            prompt_cached_tokens=None,
+            prompt_cache_creation_tokens=None,
+            prompt_image_tokens=None,
+            completion_tokens=len(out) // 4,
+            total_tokens=(len(prompt) + len(schema) + len(out)) // 4,
+        )
+        self.prompt_tokens += usage.prompt_tokens
+        return ChatInvokeCompletion(completion=completion, usage=usage)
+
+    def _agent_step(self, prompt: str, output_format: type[BaseModel]) -> dict:
+        step = self.agent_steps
+        self.agent_steps += 1
+        if step == 0 and (url := self._task_url(prompt)):
+            action = {"go_to_url": {"url": url, "new_tab": False}}
+        elif step <= self.scrolls:
+            action = {"scroll": {"down": True, "num_pages": 1.0}}
+        else:
+            params = _action_params(output_format, "done")
+            data = placeholder_model(params) if params else {"text": "done"}
+            data["success"] = True
+            action = {"done": data}
+        return {
+            "evaluation_previous_goal": "Scripted.",
+            "memory": f"Scripted step {step}.",
+            "next_goal": f"Run {next(iter(action))}.",
+            "action": [action],
+        }
+
+    @staticmethod
+    def _task_url(prompt: str) -> str|None:
+        task = re.search(r"<user_request>(.*?)</user_request>", prompt, re.S)
+        match = re.search(r"https?://[^\s'\"<>]+", task.group(1) if task else prompt)
+        return match.group(0).rstrip(".,;)") if match else None
@@ -0,0 +1,110 @@
+# Token count and round-trip fidelity of the output formats of the markdown artifact.
+#
+# Runs on LinkedinResult / CodeRepoResult samples (validated against the result
+# models), or on the sources of real crawl outputs with --input out/<name>.json.
+#
+#   uv run python -m benchmarks.serializers [--input out/diego-giorgini.json] [--repos 30]
+import re
+import json
+import random
+import argparse
+
+from src.context import count_tokens
+from src.serializers import SERIALIZERS
+from src.customizations.linkedin import LinkedinResult
+from src.customizations.code_repo import CodeRepoResult
+
+WORDS = (
+    "model data pipeline training inference research open source library python rust web api service "
+    "distributed systems team lead engineer graph search retrieval evaluation benchmark dataset cloud"
+).split()
+LANGUAGES = ["Python", "Rust", "Go", "TypeScript", "C++", "Jupyter Notebook", "Shell"]
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def sample_linkedin(rng: random.Random, n: int) -> dict:
+    return LinkedinResult.model_validate({
+        "personal_info": {
+            "name": "Ada Lovelace", "job_title": "Chief Scientist", "linkedin_url": "https://www.linkedin.com/in/ada",
+            "current_work_position": "Chief Scientist at Analytical Engines", "sector": "Research", "user_bio": _text(rng, 40),
+            "location": "London, United Kingdom", "email": "", "phone_number": "", "website": "https://ada-lovelace.dev",
+            "others": [],
+        },
+        "experience": [
+            {"job_title": f"{rng.choice(['Senior', 'Staff', 'Lead'])} Engineer", "company": f"Company {i}",
+            "employment_type": "Full-time", "duration_or_dates": f"Jan 20{10 + i} - Dec 20{11 + i}", "summary": _text(rng, 30)}
+            for i in range(n)
+        ],
+        "education": [
+            {"education_title": "MSc", "university_or_school_name": "University of London", "course_name": "Mathematics",
+             "duration_or_dates": "1832 - 1835", "activities_and_associations": "", "description": _text(rng, 15)},
+        ],
+        "certifications": [
+            {"name": f"Certificate {i}", "emitting_organization": "Royal Society", "course_name": "", "date_concession": "2020",
+             "url": f"https://example.org/cert/{i}", "description": ""}
+            for i in range(max(1, n // 3))
+        ],
+        "skills": rng.sample(WORDS, 12),
+        "posts": [_text(rng, 35) for _ in range(n)],
+        "reposts": [_text(rng, 20) for _ in range(n // 2)],
+        "interests": "Analytical engines, poetry",
+        "profile_summary": _text(rng, 60),
+    }).model_dump()
+
+
+def sample_code_repo(rng: random.Random, n: int) -> dict:
+    return CodeRepoResult.model_validate({
+        "username": "ada", "company": "Analytical Engines", "location": "London", "personal_bio": _text(rng, 20),
+        "email": "", "socials": "https://x.com/ada", "achievements": "Pull Shark x3", "contributions_last_year": 1234,
+        "repositories_detailed": [
+            {"name": f"repo-{i}", "description": _text(rng, 12), "stars": rng.randint(0, 5000),
+             "languages": rng.sample(LANGUAGES, 2), "readme_summary": _text(rng, 50), "code_overview": _text(rng, 30),
+             "last_update": "2025-05-01", "license": "MIT", "last_commit": "2025-04-30", "other": ""}
+            for i in range(n)
+        ],
+        "repositories_basic": [{"name": f"lib-{i}", "author": "ada", "short_summary": _text(rng, 10)} for i in range(n)],
+        "other_people_starred_repos": [{"name": f"tool-{i}", "author": f"user{i}", "short_summary": _text(rng, 8)} for i in range(n)],
+        "sponsoring_projects_or_users": [
+            {"name": "note-g", "id": "note-g", "currently_active_sponsorship": True, "sponsorship_amount": 5},
+        ],
+        "profile_summary": _text(rng, 60),
+    }).model_dump()
+
+
+def pieces(text: str) -> int:
+    # Closer to a BPE tokenizer than chars/4: every word and punctuation mark is at least one token
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def main(inputs: dict[str, dict]):
+    print(f"{'source':<14} {'format':<12} {'chars':>8} {'tokens':>8} {'pieces':>8} {'vs indent':>9}  round-trip")
+    totals = {name: 0 for name in SERIALIZERS}
+    for source, value in inputs.items():
+        baseline = None
+        for name, serializer in SERIALIZERS.items():
+            text = serializer.dumps(value)
+            tokens = count_tokens(text)
+            baseline = baseline or tokens
+            totals[name] += tokens
+            ok = serializer.loads(text) == value
+            print(f"{source:<14} {name:<12} {len(text):>8} {tokens:>8} {pieces(text):>8} {tokens / baseline:>8.0%}  {'ok' if ok else 'FAILED'}")
+    baseline = totals["json-indent"]
+    print("\n" + "  ".join(f"{name}: {t} ({t / baseline:.0%})" for name, t in totals.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=None, help="a crawl output (out/<name>.json) instead of the samples")
+    parser.add_argument("--repos", type=int, default=30, help="repositories / experiences / posts in the samples")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "r") as f:
+            inputs = {k: v for k, v in json.load(f).items() if isinstance(v, dict) and v}
+    else:
+        rng = random.Random(0)
+        inputs = {"linkedin": sample_linkedin(rng, args.repos // 3), "github": sample_code_repo(rng, args.repos)}
+    main(inputs)
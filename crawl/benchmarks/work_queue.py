@@ -0,0 +1,74 @@
+# Throughput of the job queue with several worker processes on one host.
+#
+# Each worker process leases jobs from one SQLite queue (src/work_queue.py),
+# "crawls" them by sleeping --job-seconds on each of its --slots, heartbeats and
+# completes them, like src/distributed.py without browsers. With the queue out
+# of the way, jobs/s should grow linearly with the number of workers.
+#
+#   uv run python -m benchmarks.work_queue [--workers 1 2 4 8] [--jobs 200] [--job-seconds 0.2]
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+from src.models import Link, UserInput
+from src.work_queue import JobQueue
+
+
+async def _worker(path: str, name: str, slots: int, job_seconds: float) -> None:
+    queue = JobQueue(path)
+
+    async def slot(i: int):
+        while (job := await asyncio.to_thread(queue.lease, f"{name}-{i}", 30.0)) is not None:
+            await asyncio.sleep(job_seconds / 2)
+            await asyncio.to_thread(queue.heartbeat, job.id, f"{name}-{i}", 30.0)
+            await asyncio.sleep(job_seconds / 2)
+            await asyncio.to_thread(queue.complete, job.id, f"{name}-{i}", {"url": job.user.links[job.link].url})
+
+    await asyncio.gather(*(slot(i) for i in range(slots)))
+    queue.close()
+
+
+def worker_main(path: str, name: str, slots: int, job_seconds: float) -> None:
+    asyncio.run(_worker(path, name, slots, job_seconds))
+
+
+def run(n_workers: int, n_jobs: int, slots: int, job_seconds: float) -> float:
+    path = os.path.join(tempfile.mkdtemp(), "queue.sqlite")
+    queue = JobQueue(path)
+    user = UserInput(name="Ada Lovelace", links=[Link(url=f"https://example.org/{i}", description="") for i in range(n_jobs)], texts=[], docs=[])
+    for i in range(n_jobs):
+        queue.enqueue(user, i, "out")
+
+    start = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=worker_main, args=(path, f"w{w}", slots, job_seconds)) for w in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    finished = queue.collect(list(range(1, n_jobs + 1)))
+    assert len(finished) == n_jobs and all(j.status == "done" for j in finished), "jobs lost or duplicated"
+    queue.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=2, help="concurrent jobs per worker (its browsers)")
+    parser.add_argument("--job-seconds", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'seconds':>8} {'jobs/s':>8} {'speedup':>8} {'ideal':>6}")
+    base = None
+    for n in args.workers:
+        elapsed = run(n, args.jobs, args.slots, args.job_seconds)
+        base = base or elapsed * args.workers[0]
+        print(f"{n:>7} {elapsed:>8.2f} {args.jobs / elapsed:>8.1f} {base / elapsed:>8.2f} {n:>6}")
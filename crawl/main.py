@@ -1,12 +1,19 @@
 from dotenv import load_dotenv
 
+import sys
+import argparse
 import asyncio
+from functools import partial
+from datetime import timedelta
 
-from src.models import Link, UserInput, Text
-from src.crawl import crawl_user
+from src.models import Link, UserInput, Text, load_users
+from src.tracing import Tracer, set_tracer
+from src.context import DEFAULT_BUDGET
+from src.plan import format_plan, plan_users
+from src.serializers import DEFAULT_FORMAT, SERIALIZERS
 
-async def main():
-    user = UserInput(
+def default_user() -> UserInput:
+    return UserInput(
         name="Diego Giorgini",
         texts=[
         ],
@@ -20,9 +27,120 @@ async def main():
         ]
     )
 
-    await crawl_user(user, out_path="out", verbose=True)
+async def main(args):
+    users = load_users(args.batch) if args.batch else [default_user()]
+    if args.plan:
+        rows, problems = plan_users(users)
+        print(format_plan(rows, problems))
+        sys.exit(1 if problems else 0)
+
+    # browser-use, docling, ... are only imported when actually crawling
+    from src.crawl import crawl_user, make_llm
+    from src.batch import crawl_batch
+    from src.proxy import CachingProxy
+    from src.llm_cache import LLMCache
+    from src.distributed import Coordinator
+
+    if args.trace:
+        set_tracer(Tracer(args.trace))
+
+    if args.workers or args.queue:
+        # Sources go through a durable queue to worker processes, each with its own browser pool, proxy and LLM cache
+        worker_args = ["--concurrency", str(args.concurrency)] + (["--verbose"] if args.verbose else [])
+        if args.source_timeout is not None:
+            worker_args += ["--source-timeout", str(args.source_timeout)]
+        if args.slim_schemas:
+            worker_args.append("--slim-schemas")
+        if args.proxy:
+            worker_args += ["--proxy", args.proxy, "--proxy-archive", args.proxy_archive]
+        if args.llm_cache:
+            worker_args += ["--llm-cache", args.llm_cache, "--llm-cache-path", args.llm_cache_path, "--llm-cache-max-mb", str(args.llm_cache_max_mb)]
+        if args.trace:
+            worker_args += ["--trace", args.trace]
+        await Coordinator(args.queue or "out/.queue.sqlite", out_path="out").run(
+            users,
+            force_refresh=args.force_refresh,
+            max_age=timedelta(days=args.max_age_days) if args.max_age_days is not None else None,
+            resume=args.resume,
+            context_budget=args.context_budget,
+            output_format=args.output_format,
+            workers=args.workers,
+            worker_args=worker_args,
+            deadline_seconds=args.deadline,
+        )
+        return
+
+    proxy = None
+    if args.proxy:
+        proxy = CachingProxy(args.proxy_archive, mode=args.proxy)
+        await proxy.start()
+    llm_cache = None
+    if args.llm_cache:
+        llm_cache = LLMCache(args.llm_cache_path, mode=args.llm_cache, max_bytes=args.llm_cache_max_mb * 2**20)
+
+    try:
+        if args.batch:
+            await crawl_batch(
+                users,
+                out_path="out",
+                concurrency=args.concurrency,
+                verbose=args.verbose,
+                force_refresh=args.force_refresh,
+                max_age=timedelta(days=args.max_age_days) if args.max_age_days is not None else None,
+                resume=args.resume,
+                context_budget=args.context_budget,
+                proxy=proxy,
+                output_format=args.output_format,
+                llm_factory=partial(make_llm, llm_cache),
+                deadline_seconds=args.deadline,
+                source_timeout=args.source_timeout,
+                slim_schemas=args.slim_schemas,
+            )
+            return
+
+        await crawl_user(
+            users[0],
+            out_path="out",
+            verbose=True,
+            force_refresh=args.force_refresh,
+            max_age=timedelta(days=args.max_age_days) if args.max_age_days is not None else None,
+            resume=args.resume,
+            context_budget=args.context_budget,
+            proxy=proxy,
+            output_format=args.output_format,
+            llm_factory=partial(make_llm, llm_cache),
+            deadline_seconds=args.deadline,
+            source_timeout=args.source_timeout,
+            slim_schemas=args.slim_schemas,
+        )
+    finally:
+        if proxy is not None:
+            await proxy.close()
+        if llm_cache is not None:
+            llm_cache.close()
 
 
 if __name__ == "__main__":
     load_dotenv()
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", default=None, help="JSON list (or .jsonl) of UserInput records to crawl over one shared browser pool")
+    parser.add_argument("--concurrency", type=int, default=5, help="number of browsers in the batch pool (per worker with --workers)")
+    parser.add_argument("--workers", type=int, default=0, help="crawl through a job queue with this many local worker processes")
+    parser.add_argument("--queue", default=None, help="job queue file (default out/.queue.sqlite); with --workers 0, only enqueue and wait for workers started elsewhere")
+    parser.add_argument("--verbose", action="store_true", help="save agent histories and conversations in batch mode")
+    parser.add_argument("--force-refresh", action="store_true", help="recrawl every source, even if unchanged")
+    parser.add_argument("--max-age-days", type=float, default=None, help="recrawl sources whose extraction is older than this")
+    parser.add_argument("--resume", action="store_true", help="only rerun sources that are missing or failed in the last run")
+    parser.add_argument("--context-budget", type=int, default=DEFAULT_BUDGET, help="max tokens of out/<name>.context.md")
+    parser.add_argument("--output-format", choices=list(SERIALIZERS), default=DEFAULT_FORMAT, help="encoding of the results in out/<name>.md")
+    parser.add_argument("--deadline", type=float, default=None, help="seconds after which the outputs are written, unfinished sources kept partial")
+    parser.add_argument("--source-timeout", type=float, default=None, help="max seconds per source, after which its partial result is kept")
+    parser.add_argument("--slim-schemas", action="store_true", help="send agents a compact result schema while navigating, the full one only for the final extraction")
+    parser.add_argument("--plan", action="store_true", help="only resolve links to customizations and validate the input, then exit")
+    parser.add_argument("--proxy", choices=["cache", "record", "replay"], default=None, help="route the browsers through a local caching proxy")
+    parser.add_argument("--proxy-archive", default="out/.proxy_archive.sqlite", help="on-disk archive of the caching proxy")
+    parser.add_argument("--llm-cache", choices=["cache", "record", "replay"], default=None, help="serve repeated LLM requests from an on-disk cache")
+    parser.add_argument("--llm-cache-path", default="out/.llm_cache.sqlite", help="on-disk store of the LLM cache")
+    parser.add_argument("--llm-cache-max-mb", type=int, default=512, help="evict least recently used LLM responses above this size")
+    parser.add_argument("--trace", default=None, help="append timing/token spans to this JSONL file (summarize with `python -m src.tracing`)")
+    asyncio.run(main(parser.parse_args()))
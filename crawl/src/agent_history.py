@@ -0,0 +1,157 @@
+import os
+import json
+import gzip
+import base64
+import hashlib
+import argparse
+
+from loguru import logger
+
+VERSION = 1
+
+
+class BlobStore():
+    """Content-addressed files, `<root>/<sha[:2]>/<sha><ext>`, each stored once."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.normpath(root)
+
+    def path(self, ref: str) -> str:
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, data: bytes, ext: str) -> str:
+        ref = hashlib.sha256(data).hexdigest()[:32] + ext
+        path = self.path(ref)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, 6) if ext.endswith(".gz") else data)
+            os.replace(tmp, path)
+        return ref
+
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"), ".txt.gz")
+
+    def get(self, ref: str) -> bytes:
+        with open(self.path(ref), "rb") as f:
+            data = f.read()
+        return gzip.decompress(data) if ref.endswith(".gz") else data
+
+    def get_text(self, ref: str) -> str:
+        return self.get(ref).decode("utf-8")
+
+
+class HistoryRecorder():
+    """`on_step_end` hook for Agent.run() that streams each step to `<path>` (JSONL).
+
+    Screenshots and the prompt messages of the step (system prompt, page
+    snapshot, ...) go to a shared BlobStore, so identical ones are stored once
+    across steps, agents and users. `load_history()` rebuilds the full history.
+    """
+
+    def __init__(self, path: str, blob_dir: str) -> None:
+        self.path = path
+        self.blobs = BlobStore(blob_dir)
+        self._written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(json.dumps({"version": VERSION, "blobs": os.path.relpath(blob_dir, os.path.dirname(path) or ".")}) + "\n")
+
+    async def on_step_end(self, agent) -> None:
+        items = agent.history.history[self._written:]
+        self._written += len(items)
+        messages = [(m.role, m.text) for m in agent._message_manager.get_messages()]
+        for item in items:
+            try:
+                self.write(item.model_dump(), messages)
+            except Exception as e:
+                logger.warning(f"Could not record agent step to {self.path}: {e!r}")
+
+    def write(self, step: dict, messages: list[tuple[str, str]]) -> None:
+        state = step["state"]
+        screenshot_path = state.pop("screenshot_path", None)
+        if screenshot_path and os.path.exists(screenshot_path):
+            with open(screenshot_path, "rb") as f:
+                state["screenshot"] = self.blobs.put(f.read(), os.path.splitext(screenshot_path)[1] or ".png")
+        step["messages"] = [[role, self.blobs.put_text(text)] for role, text in messages]
+        with open(self.path, "a") as f:
+            f.write(json.dumps(step, ensure_ascii=False, default=str) + "\n")
+
+    def close(self, history) -> None:
+        # Usage, and any step the hook did not see
+        if history is None:
+            return
+        for item in history.history[self._written:]:
+            self.write(item.model_dump(), [])
+        self._written = len(history.history)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"usage": history.usage.model_dump() if history.usage else None}, default=str) + "\n")
+
+
+def load_steps(path: str, messages: bool = False, screenshots: str = "path") -> dict:
+    """The recorded history as browser-use's `history.json` dict.
+
+    `screenshots` is "path" (screenshot_path into the blob store), "base64" or
+    None; with `messages=True` each step also has the prompt messages' text.
+    """
+    with open(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header, steps = lines[0], lines[1:]
+    blobs = BlobStore(os.path.join(os.path.dirname(path), header["blobs"]))
+    data = {"history": [], "usage": None}
+    for step in steps:
+        if "usage" in step:
+            data["usage"] = step["usage"]
+            continue
+        ref = step["state"].pop("screenshot", None)
+        step["state"]["screenshot_path"] = blobs.path(ref) if ref and screenshots == "path" else None
+        if ref and screenshots == "base64":
+            step["state"]["screenshot"] = base64.b64encode(blobs.get(ref)).decode()
+        refs = step.pop("messages", [])
+        if messages:
+            step["messages"] = [{"role": role, "text": blobs.get_text(ref)} for role, ref in refs]
+        data["history"].append(step)
+    return data
+
+
+def load_history(path: str, output_model):
+    # Same as AgentHistoryList.load_from_file(), from the compact format
+    from browser_use.agent.views import AgentHistoryList
+
+    data = load_steps(path)
+    for h in data["history"]:
+        if isinstance(h["model_output"], dict):
+            h["model_output"] = output_model.model_validate(h["model_output"])
+        else:
+            h["model_output"] = None
+        h["state"].setdefault("interacted_element", None)
+    return AgentHistoryList.model_validate(data)
+
+
+def conversation(path: str, step: int) -> str:
+    # The prompt and response of one step, like browser-use's conversation logs
+    h = load_steps(path, messages=True)["history"][step]
+    lines = []
+    for m in h["messages"]:
+        lines += [f" {m['role']} ", m["text"], ""]
+    lines += [" RESPONSE", json.dumps(h["model_output"], indent=2)]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect a compact agent history (out/<user>/<source>/history.jsonl).")
+    parser.add_argument("history")
+    parser.add_argument("--step", type=int, default=None, help="print the conversation of this step")
+    parser.add_argument("--export", default=None, help="write the full history.json (screenshots inlined as base64)")
+    args = parser.parse_args()
+
+    if args.step is not None:
+        print(conversation(args.history, args.step))
+    elif args.export:
+        with open(args.export, "w") as f:
+            json.dump(load_steps(args.history, messages=True, screenshots="base64"), f, indent=2)
+    else:
+        for i, h in enumerate(load_steps(args.history)["history"]):
+            actions = [next(iter(a)) for a in (h["model_output"] or {}).get("action", []) if a]
+            print(f"{i:>3}  {h['state']['url'][:60]:<60}  {', '.join(actions)}")
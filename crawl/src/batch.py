@@ -0,0 +1,98 @@
+import os
+import asyncio
+from datetime import timedelta
+from typing import Callable
+
+from browser_use.llm import BaseChatModel
+
+from src.models import UserInput, load_users
+from src.crawl import UserCrawl, make_llm, make_pool
+from src.http_client import close_http_client
+from src.scheduler import Scheduler, DurationHistory
+from src.tracing import span
+from src.documents import DocumentIngestor
+from src.context import DEFAULT_BUDGET
+from src.budgets import Deadline, StepHistory
+from src.proxy import CachingProxy
+from src.serializers import DEFAULT_FORMAT
+
+from loguru import logger
+
+
+async def crawl_batch(
+    users: list[UserInput],
+    out_path: str,
+    concurrency: int = 5,
+    verbose: bool = False,
+    force_refresh: bool = False,
+    max_age: timedelta|None = None,
+    resume: bool = False,
+    context_budget: int = DEFAULT_BUDGET,
+    proxy: CachingProxy|None = None,
+    output_format: str = DEFAULT_FORMAT,
+    llm_factory: Callable[[], BaseChatModel] = make_llm,
+    deadline_seconds: float|None = None,
+    source_timeout: float|None = None,
+    slim_schemas: bool = False,
+):
+    """Crawl many users as one global job set over a single long-lived browser pool.
+
+    Each user's outputs are written as soon as the last of its sources finishes,
+    and at the latest at the batch's deadline.
+    """
+    deadline = Deadline(deadline_seconds)
+    step_history = StepHistory(os.path.join(out_path, ".step_history.json"))
+    crawls = [
+        UserCrawl(
+            user, out_path, verbose=verbose, llm_factory=llm_factory, context_budget=context_budget, step_history=step_history,
+            output_format=output_format, deadline=deadline, source_timeout=source_timeout,
+            slim_schemas=slim_schemas,
+        )
+        for user in users
+    ]
+    await asyncio.gather(*(c.prepare(force_refresh=force_refresh, max_age=max_age, resume=resume) for c in crawls))
+
+    # A user is finished when all its sources and its documents (one unit) are done
+    remaining = {}
+    jobs = []
+    for crawl in crawls:
+        remaining[crawl] = len(crawl.builders) + (1 if crawl.user.docs else 0)
+        for builder in crawl.builders:
+            jobs.append((builder, lambda crawl=crawl, builder=builder: run_job(crawl, builder)))
+        if not remaining[crawl]:
+            crawl.finish()
+    logger.info(f"Batch: {len(crawls)} users, {len(jobs)} sources to crawl.")
+
+    def done(crawl: UserCrawl):
+        remaining[crawl] -= 1
+        if remaining[crawl] == 0:
+            crawl.finish()
+            logger.info(f"Finished {crawl.user.name} ({sum(remaining.values())} sources left in the batch).")
+
+    async def run_job(crawl: UserCrawl, builder) -> bool:
+        timed = await crawl.run_scheduled(builder, pool)
+        done(crawl)
+        return timed
+
+    async def run_docs(crawl: UserCrawl):
+        try:
+            await asyncio.wait_for(crawl.ingest_docs(ingestor), deadline.remaining())
+        except asyncio.TimeoutError:
+            logger.warning(f"Batch deadline reached before all documents of {crawl.user.name} were converted.")
+        done(crawl)
+
+    pool = make_pool(max(1, min(concurrency, len(jobs))))
+    if proxy is not None:
+        pool.extra_args += proxy.chrome_args
+    scheduler = Scheduler(n_workers=pool.size, history=DurationHistory(os.path.join(out_path, ".durations.json")))
+    for crawl in crawls:
+        crawl.scheduler = scheduler
+    # Documents don't need a browser: they are converted in worker processes next to the scheduled sources
+    ingestor = DocumentIngestor(os.path.join(out_path, ".doc_cache"))
+    try:
+        with span("batch", users=len(crawls), sources=len(jobs)):
+            await asyncio.gather(scheduler.run(jobs), *(run_docs(c) for c in crawls if c.user.docs))
+    finally:
+        ingestor.close()
+        await pool.close()
+        await close_http_client()
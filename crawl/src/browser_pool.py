@@ -0,0 +1,393 @@
+import os
+import shutil
+import socket
+import asyncio
+import contextlib
+import subprocess
+import time
+from collections import deque
+
+import httpx
+import psutil
+from browser_use import Browser
+
+from src.profiles import CopyStats, build_template, clone_tree, copy_full_profile
+from src.tracing import current_span, span
+
+from loguru import logger
+
+
+class BrowserStartError(RuntimeError):
+    pass
+
+
+def free_port() -> int:
+    # Free when asked; Chrome binds it a moment later
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PooledBrowser():
+    def __init__(self, port: int, user_data_dir: str) -> None:
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.cdp_url = f"http://127.0.0.1:{port}"
+        self.process: asyncio.subprocess.Process|None = None
+        self.browser: Browser|None = None
+        self.jobs = 0          # since the last (re)launch
+        self.jobs_total = 0
+        self.launches = 0
+        self.interrupted = False  # last job was cancelled mid-step
+        self.rss = 0
+        self.peak_rss = 0
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def measure_rss(self) -> int:
+        # Resident memory of Chrome and all its child processes (renderers, GPU, ...)
+        if not self.is_running():
+            return 0
+        rss = 0
+        try:
+            root = psutil.Process(self.process.pid)
+            procs = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return 0
+        for proc in procs:
+            with contextlib.suppress(psutil.Error):
+                rss += proc.memory_info().rss
+        self.rss = rss
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+
+class BrowserPool():
+    """Pool of remote-debugging Chrome instances shared by the crawl agents.
+
+    Browsers are launched concurrently and handed out only once their CDP
+    endpoint answers. The pool never grows past `size`; a browser that fails
+    its health check is replaced before it is handed out again, and one that
+    can't be replaced is dropped, making room for a new launch.
+
+    With `profile_mode="snapshot"` only the logged-in state of the profile is
+    copied once into a template, which is then cloned for every browser.
+    `profile_mode="full"` copies the whole profile directory per browser.
+
+    Browsers are recycled (relaunched on a fresh profile copy) when they are
+    released after `max_jobs` jobs or above `recycle_rss_mb` of memory. A
+    watchdog kills any browser above the hard `memory_limit_mb` ceiling, even
+    mid-job; the job fails and the browser is replaced on release.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        chrome_exec_path: str,
+        chrome_user_dir: str,
+        profile_name: str = "Default",
+        base_port: int|None = 9222,       # None: free ports from the OS, for several pools on one host
+        tmp_root: str = "/tmp/askthebio-profiles",
+        ready_timeout: float = 30.0,
+        headless: bool = False,
+        profile_mode: str = "snapshot",
+        clone_mode: str = "auto",
+        extra_args: list[str]|None = None,
+        max_jobs: int|None = None,
+        recycle_rss_mb: int|None = None,
+        memory_limit_mb: int|None = None,
+        memory_check_interval: float = 5.0,
+    ) -> None:
+        self.size = size
+        self.chrome_exec_path = chrome_exec_path
+        self.chrome_user_dir = chrome_user_dir
+        self.profile_name = profile_name
+        self.base_port = base_port
+        self.tmp_root = tmp_root
+        self.ready_timeout = ready_timeout
+        self.headless = headless
+        self.profile_mode = profile_mode
+        self.clone_mode = clone_mode
+        self.extra_args = extra_args or []
+        self.max_jobs = max_jobs
+        self.recycle_rss_mb = recycle_rss_mb
+        self.memory_limit_mb = memory_limit_mb
+        self.memory_check_interval = memory_check_interval
+        self.copy_stats = CopyStats()
+        self.recycled = 0
+
+        self._template_dir: str|None = None
+        self._template_lock = asyncio.Lock()
+        self._slots: list[PooledBrowser] = []
+        self._idle: deque[PooledBrowser] = deque()
+        self._lock = asyncio.Lock()
+        # Notified when a browser goes idle or is discarded: waiters may take it or grow a new one
+        self._changed = asyncio.Condition(self._lock)
+        self._http = httpx.AsyncClient(timeout=2.0)
+        self._watchdog: asyncio.Task|None = None
+
+    async def start(self, n: int|None = None) -> None:
+        # Launch up to `n` browsers concurrently (all of them by default)
+        n = self.size if n is None else min(n, self.size)
+        async with self._lock:
+            new_slots = [self._new_slot() for _ in range(n - len(self._slots))]
+        results = await asyncio.gather(*(self._launch(s) for s in new_slots), return_exceptions=True)
+        for slot, res in zip(new_slots, results):
+            if isinstance(res, BaseException):
+                logger.warning(f"Browser on port {slot.port} failed to start: {res}")
+                await self._discard(slot)
+            else:
+                await self._put_idle(slot)
+        if new_slots and not self._slots:
+            raise BrowserStartError("No browser could be started")
+
+    @contextlib.asynccontextmanager
+    async def browser(self):
+        slot = await self._acquire()
+        try:
+            yield slot.browser
+        except (asyncio.CancelledError, TimeoutError):
+            slot.interrupted = True
+            raise
+        finally:
+            slot.jobs += 1
+            slot.jobs_total += 1
+            await self._release(slot)
+
+    async def close(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        await self.measure()
+        for row in self.memory_report():
+            logger.info(
+                f"Browser on port {row['port']}: {row['jobs_total']} jobs, {row['launches']} launches, "
+                f"peak RSS {row['peak_rss_mb']:.0f} MB."
+            )
+        for slot in list(self._slots):
+            await self._discard(slot)
+        await self._http.aclose()
+        if self._template_dir is not None:
+            await asyncio.to_thread(shutil.rmtree, self._template_dir, True)
+
+    # ---------------------------------
+    # Memory
+    # ---------------------------------
+    async def measure(self) -> None:
+        await asyncio.to_thread(lambda: [s.measure_rss() for s in self._slots])
+
+    def memory_report(self) -> list[dict]:
+        return [
+            {
+                "port": s.port,
+                "pid": s.process.pid if s.is_running() else None,
+                "rss_mb": s.rss / 2**20,
+                "peak_rss_mb": s.peak_rss / 2**20,
+                "jobs": s.jobs,
+                "jobs_total": s.jobs_total,
+                "launches": s.launches,
+            }
+            for s in self._slots
+        ]
+
+    async def _watch_memory(self) -> None:
+        while True:
+            await asyncio.sleep(self.memory_check_interval)
+            await self.measure()
+            for slot in self._slots:
+                if slot.is_running() and slot.rss > self.memory_limit_mb * 2**20:
+                    logger.warning(
+                        f"Browser on port {slot.port} uses {slot.rss / 2**20:.0f} MB, "
+                        f"over the {self.memory_limit_mb} MB limit: killing it."
+                    )
+                    with contextlib.suppress(ProcessLookupError):
+                        slot.process.kill()
+
+    # ---------------------------------
+    # Health checks
+    # ---------------------------------
+    async def healthy(self, slot: PooledBrowser) -> bool:
+        if not slot.is_running():
+            return False
+        try:
+            resp = await self._http.get(f"{slot.cdp_url}/json/version")
+            return resp.status_code == 200 and "webSocketDebuggerUrl" in resp.json()
+        except (httpx.HTTPError, ValueError):
+            return False
+
+    async def wait_ready(self, slot: PooledBrowser) -> None:
+        deadline = time.monotonic() + self.ready_timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            if not slot.is_running():
+                raise BrowserStartError(f"Chrome on port {slot.port} exited with code {slot.process.returncode}")
+            if await self.healthy(slot):
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        raise BrowserStartError(f"Chrome on port {slot.port} not ready after {self.ready_timeout}s")
+
+    # ---------------------------------
+    # Internals
+    # ---------------------------------
+    def _new_slot(self) -> PooledBrowser:
+        used = {s.port for s in self._slots}
+        if self.base_port is None:
+            port = free_port()
+            while port in used:
+                port = free_port()
+        else:
+            port = next(p for p in range(self.base_port, self.base_port + 10 * self.size + 1) if p not in used)
+        slot = PooledBrowser(port=port, user_data_dir=os.path.join(self.tmp_root, str(port)))
+        self._slots.append(slot)
+        return slot
+
+    async def _acquire(self) -> PooledBrowser:
+        # An idle browser, or grow lazily if there is room (again after a browser is discarded)
+        async with self._changed:
+            while not self._idle and len(self._slots) >= self.size:
+                await self._changed.wait()
+            if self._idle:
+                slot, new = self._idle.popleft(), False
+            else:
+                slot, new = self._new_slot(), True
+
+        try:
+            if new:
+                await self._launch(slot)
+            elif not await self.healthy(slot):
+                logger.warning(f"Browser on port {slot.port} is unhealthy, replacing it.")
+                await self._relaunch(slot)
+        except BaseException:
+            # Its capacity goes back to the pool: the next waiter launches a new browser
+            await self._discard(slot)
+            raise
+        return slot
+
+    async def _release(self, slot: PooledBrowser) -> None:
+        if slot not in self._slots:
+            return
+        if not await self.healthy(slot):
+            logger.warning(f"Browser on port {slot.port} crashed, replacing it.")
+            try:
+                await self._relaunch(slot)
+            except Exception as e:
+                logger.warning(f"Could not replace browser on port {slot.port}: {e}")
+                await self._discard(slot)
+                return
+        elif reason := await self._recycle_reason(slot):
+            logger.info(f"Recycling browser on port {slot.port}: {reason}.")
+            self.recycled += 1
+            try:
+                await self._stop(slot)
+                # Start over from the template: caches and site data are left behind
+                await asyncio.to_thread(shutil.rmtree, slot.user_data_dir, True)
+                await self._launch(slot)
+            except Exception as e:
+                logger.warning(f"Could not recycle browser on port {slot.port}: {e}")
+                await self._discard(slot)
+                return
+        await self._put_idle(slot)
+
+    async def _put_idle(self, slot: PooledBrowser) -> None:
+        async with self._changed:
+            self._idle.append(slot)
+            self._changed.notify()
+
+    async def _recycle_reason(self, slot: PooledBrowser) -> str|None:
+        rss = await asyncio.to_thread(slot.measure_rss)
+        if s := current_span():
+            s.set(browser_rss_mb=round(rss / 2**20, 1))
+        if slot.interrupted:
+            # Pending navigations, dialogs, half-filled forms: the next job gets a fresh browser
+            return "job cancelled mid-step"
+        if self.max_jobs is not None and slot.jobs >= self.max_jobs:
+            return f"{slot.jobs} jobs"
+        if self.recycle_rss_mb is not None and rss > self.recycle_rss_mb * 2**20:
+            return f"{rss / 2**20:.0f} MB RSS over {self.recycle_rss_mb} MB"
+        return None
+
+    async def _launch(self, slot: PooledBrowser) -> None:
+        with span("browser.launch", port=slot.port):
+            await self._launch_traced(slot)
+
+    async def _launch_traced(self, slot: PooledBrowser) -> None:
+        logger.info(f"Starting browser on port: {slot.port}.")
+        await self._prepare_profile(slot)
+        args = [
+            self.chrome_exec_path,
+            f"--remote-debugging-port={slot.port}",
+            f"--user-data-dir={slot.user_data_dir}",
+            f"--profile-directory={self.profile_name}",
+            "--no-first-run",
+            "--no-default-browser-check",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        args += self.extra_args
+        slot.process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        await self.wait_ready(slot)
+        slot.browser = Browser(cdp_url=slot.cdp_url, headless=self.headless)
+        await slot.browser.start()
+        slot.jobs = 0
+        slot.interrupted = False
+        slot.launches += 1
+        if self.memory_limit_mb is not None and self._watchdog is None:
+            self._watchdog = asyncio.create_task(self._watch_memory())
+
+    async def _relaunch(self, slot: PooledBrowser) -> None:
+        await self._stop(slot)
+        await self._launch(slot)
+
+    async def _discard(self, slot: PooledBrowser) -> None:
+        await self._stop(slot)
+        async with self._changed:
+            if slot in self._slots:
+                self._slots.remove(slot)
+            if slot in self._idle:
+                self._idle.remove(slot)
+            self._changed.notify()
+        await asyncio.to_thread(shutil.rmtree, slot.user_data_dir, True)
+
+    async def _stop(self, slot: PooledBrowser) -> None:
+        if slot.browser is not None:
+            with contextlib.suppress(Exception):
+                await slot.browser.stop()
+            slot.browser = None
+        if slot.is_running():
+            with contextlib.suppress(ProcessLookupError):
+                slot.process.terminate()
+            try:
+                await asyncio.wait_for(slot.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                with contextlib.suppress(ProcessLookupError):
+                    slot.process.kill()
+                await slot.process.wait()
+        slot.process = None
+
+    async def _prepare_profile(self, slot: PooledBrowser) -> None:
+        with span("profile.copy", mode=self.profile_mode) as s:
+            if self.profile_mode == "full":
+                stats = await asyncio.to_thread(
+                    copy_full_profile, self.chrome_user_dir, self.profile_name, slot.user_data_dir
+                )
+            else:
+                template_dir = await self._ensure_template()
+                stats = await asyncio.to_thread(clone_tree, template_dir, slot.user_data_dir, self.clone_mode)
+            s.set(**stats.model_dump(exclude={"seconds"}))
+        self.copy_stats.add(stats)
+
+    async def _ensure_template(self) -> str:
+        async with self._template_lock:
+            if self._template_dir is None:
+                template_dir = os.path.join(self.tmp_root, "template")
+                stats = await asyncio.to_thread(
+                    build_template, self.chrome_user_dir, self.profile_name, template_dir
+                )
+                self.copy_stats.add(stats)
+                self._template_dir = template_dir
+        return self._template_dir
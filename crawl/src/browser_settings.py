@@ -0,0 +1,98 @@
+import os
+import sys
+import shutil
+
+from pydantic import BaseModel
+
+from src.browser_pool import BrowserPool
+from src.profiles import detect_profile_name
+
+CHROME_NAMES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+MACOS_CHROME = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+MACOS_USER_DIR = "~/Library/Application Support/Google/Chrome/"
+LINUX_USER_DIRS = ["~/.config/google-chrome", "~/.config/chromium"]
+# Fewer, leaner processes for servers without a display or a big /dev/shm
+LINUX_HEADLESS_ARGS = ["--disable-gpu", "--disable-dev-shm-usage", "--disable-extensions", "--mute-audio"]
+
+
+def find_chrome(path: str|None = None) -> str|None:
+    for candidate in [path, os.environ.get("CHROME_PATH")]:
+        if candidate:
+            return candidate
+    if sys.platform == "darwin" and os.path.exists(MACOS_CHROME):
+        return MACOS_CHROME
+    for name in CHROME_NAMES:
+        if found := shutil.which(name):
+            return found
+    return None
+
+
+def _env_int(name: str) -> int|None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+class BrowserSettings(BaseModel):
+    """Which Chrome the pool runs and how much memory each browser may use.
+
+    `from_env()` picks the platform defaults (local Chrome on macOS, headless
+    Chromium on Linux), overridden by the CHROME_* / BROWSER_* variables.
+    """
+    chrome_exec_path: str
+    chrome_user_dir: str
+    profile_name: str = "Default"
+    headless: bool = False
+    extra_args: list[str] = []
+    max_jobs: int|None = None          # recycle a browser after this many jobs
+    recycle_rss_mb: int|None = None    # recycle a browser released above this RSS
+    memory_limit_mb: int|None = None   # kill a browser above this RSS, even mid-job
+    js_heap_mb: int|None = None        # V8 heap ceiling of each renderer
+
+    @classmethod
+    def from_env(cls) -> "BrowserSettings":
+        linux = sys.platform.startswith("linux")
+        chrome_exec_path = find_chrome()
+        if chrome_exec_path is None:
+            raise FileNotFoundError(f"No Chrome found, set CHROME_PATH (looked for {CHROME_NAMES})")
+
+        user_dir = os.environ.get("CHROME_USER_DIR")
+        if user_dir is None:
+            candidates = LINUX_USER_DIRS if linux else [MACOS_USER_DIR]
+            user_dir = next((d for d in candidates if os.path.isdir(os.path.expanduser(d))), candidates[0])
+        user_dir = os.path.expanduser(user_dir)
+
+        headless = os.environ.get("CHROME_HEADLESS", "1" if linux else "0").lower() in ("1", "true", "yes")
+        extra_args = LINUX_HEADLESS_ARGS.copy() if linux and headless else []
+        if linux and os.geteuid() == 0:
+            # Chrome refuses to run its sandbox as root (containers)
+            extra_args.append("--no-sandbox")
+
+        return cls(
+            chrome_exec_path=chrome_exec_path,
+            chrome_user_dir=user_dir,
+            profile_name=os.environ.get("CHROME_PROFILE") or detect_profile_name(user_dir),
+            headless=headless,
+            extra_args=extra_args,
+            max_jobs=_env_int("BROWSER_MAX_JOBS"),
+            recycle_rss_mb=_env_int("BROWSER_RECYCLE_RSS_MB"),
+            memory_limit_mb=_env_int("BROWSER_MEMORY_LIMIT_MB"),
+            js_heap_mb=_env_int("BROWSER_JS_HEAP_MB"),
+        )
+
+    def pool(self, size: int, **kwargs) -> BrowserPool:
+        # kwargs: pool options that depend on the process, not the machine (base_port, tmp_root)
+        extra_args = list(self.extra_args)
+        if self.js_heap_mb is not None:
+            extra_args.append(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+        return BrowserPool(
+            size=size,
+            chrome_exec_path=self.chrome_exec_path,
+            chrome_user_dir=self.chrome_user_dir,
+            profile_name=self.profile_name,
+            headless=self.headless,
+            extra_args=extra_args,
+            max_jobs=self.max_jobs,
+            recycle_rss_mb=self.recycle_rss_mb,
+            memory_limit_mb=self.memory_limit_mb,
+            **kwargs,
+        )
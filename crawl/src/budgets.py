@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import math
+import time
+import contextlib
+
+from browser_use.agent.views import AgentStepInfo
+
+from src.customizations.base_customization import BaseCustomization
+from src.retrieval import STOPWORDS
+
+from loguru import logger
+
+# Extra time given to the wrap-up step before the agent is cancelled
+WRAP_UP_GRACE = 120.0
+# Before a deadline: the agent is asked to wrap up DEADLINE_WRAP_UP seconds before
+# it is cancelled, and cancelled SALVAGE_SECONDS before the deadline, so that
+# what it gathered can still be turned into a partial result. Each is at most a
+# quarter of the time left when the agent starts.
+DEADLINE_WRAP_UP = 60.0
+SALVAGE_SECONDS = 30.0
+
+
+class Deadline():
+    """A point in time (monotonic clock) a crawl or a source must be finished by; None = never."""
+
+    def __init__(self, seconds: float|None = None) -> None:
+        self.at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float|None:
+        return None if self.at is None else max(0.0, self.at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+    def within(self, seconds: float|None) -> "Deadline":
+        # The earlier of this deadline and `seconds` from now
+        deadline = Deadline(seconds)
+        if deadline.at is None or (self.at is not None and self.at < deadline.at):
+            deadline.at = self.at
+        return deadline
+
+
+class StepHistory():
+    """Steps used by past successful runs per customization, to size the next step budget.
+
+    With enough history the budget is the 90th percentile of the recent runs
+    times `headroom`, never above the customization's `max_steps`.
+    """
+
+    def __init__(
+        self,
+        path: str|None = None,
+        window: int = 20,
+        headroom: float = 1.5,
+        min_steps: int = 15,
+        min_samples: int = 3,
+    ) -> None:
+        self.path = path
+        self.window = window
+        self.headroom = headroom
+        self.min_steps = min_steps
+        self.min_samples = min_samples
+        self.steps: dict[str, list[int]] = {}
+        if path and os.path.exists(path):
+            with contextlib.suppress(Exception), open(path, "r") as f:
+                self.steps = json.load(f)
+
+    def budget(self, builder: BaseCustomization) -> int:
+        runs = sorted(self.steps.get(builder.name, []))
+        if len(runs) < self.min_samples:
+            return builder.max_steps
+        p90 = runs[min(len(runs) - 1, math.ceil(0.9 * len(runs)) - 1)]
+        return max(self.min_steps, min(builder.max_steps, math.ceil(p90 * self.headroom)))
+
+    def record(self, builder: BaseCustomization, steps: int, done: bool) -> None:
+        # Runs that didn't finish would only teach the budget to cut them again
+        if not done:
+            return
+        self.steps[builder.name] = (self.steps.get(builder.name, []) + [steps])[-self.window:]
+        self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.steps, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class AgentBudget():
+    """Wall-clock budget and convergence detection for one browser-use agent.
+
+    After every step, the terms of the step's extracted content and memory are
+    compared with everything gathered so far. When `patience` steps in a row
+    bring fewer than `min_new_terms` new terms, or `max_seconds` have passed,
+    the next step is made the agent's last one: browser-use then asks the model
+    for `done` with the result model filled with what was found. The same
+    happens close to `deadline`; `cut_short` tells that the agent was stopped
+    by its deadline or its hard timeout, so its result is partial.
+    """
+
+    def __init__(
+        self,
+        max_seconds: float|None = None,
+        patience: int = 5,
+        min_new_terms: int = 3,
+        deadline: Deadline|None = None,
+    ) -> None:
+        self.max_seconds = max_seconds
+        self.patience = patience
+        self.min_new_terms = min_new_terms
+        self.deadline = deadline or Deadline()
+        left = self.deadline.remaining()
+        self.salvage_seconds = SALVAGE_SECONDS if left is None else min(SALVAGE_SECONDS, left / 4)
+        self.wrap_up_seconds = DEADLINE_WRAP_UP if left is None else min(DEADLINE_WRAP_UP, left / 4)
+        self.reason: str|None = None
+        self.cut_short = False
+        self.started = False   # a step began: cancelling now may leave the browser mid-action
+        self.stale_steps = 0
+        self._seen: set[str] = set()
+        self._start = time.monotonic()
+
+    def attach(self, agent) -> None:
+        # Reuse browser-use's own last-step handling (forced `done` with the output model)
+        force_done = agent._force_done_after_last_step
+
+        async def force_done_when_wrapping_up(step_info: AgentStepInfo|None = None) -> None:
+            if self.reason is not None and step_info is not None:
+                step_info = AgentStepInfo(step_number=step_info.max_steps - 1, max_steps=step_info.max_steps)
+            await force_done(step_info)
+
+        agent._force_done_after_last_step = force_done_when_wrapping_up
+        self._start = time.monotonic()
+
+    @property
+    def hard_timeout(self) -> float|None:
+        timeouts = []
+        if self.max_seconds is not None:
+            timeouts.append(self.max_seconds - (time.monotonic() - self._start) + WRAP_UP_GRACE)
+        if (remaining := self.deadline.remaining()) is not None:
+            timeouts.append(remaining - self.salvage_seconds)
+        return max(0.0, min(timeouts)) if timeouts else None
+
+    async def on_step_start(self, agent) -> None:
+        self.started = True
+        if self.reason is None and self.max_seconds is not None and time.monotonic() - self._start > self.max_seconds:
+            self.wrap_up(f"time budget of {self.max_seconds:.0f}s")
+        remaining = self.deadline.remaining()
+        if self.reason is None and remaining is not None and remaining < self.salvage_seconds + self.wrap_up_seconds:
+            self.wrap_up(f"deadline in {remaining:.0f}s")
+            self.cut_short = True
+
+    async def on_step_end(self, agent) -> None:
+        texts = [r.extracted_content or "" for r in agent.state.last_result or []]
+        if agent.state.last_model_output is not None:
+            texts.append(agent.state.last_model_output.memory or "")
+        terms = {t for t in re.findall(r"[^\W\d_]{4,}", " ".join(texts).lower()) if t not in STOPWORDS}
+        new = terms - self._seen
+        self._seen |= terms
+        self.stale_steps = 0 if len(new) >= self.min_new_terms else self.stale_steps + 1
+        if self.reason is None and self.stale_steps >= self.patience:
+            self.wrap_up(f"no new information for {self.stale_steps} steps")
+
+    def wrap_up(self, reason: str) -> None:
+        logger.info(f"Wrapping up the agent: {reason}.")
+        self.reason = reason
+
+
+def chain_hooks(*hooks):
+    # Agent.run() takes a single on_step_start / on_step_end
+    async def hook(agent) -> None:
+        for h in hooks:
+            await h(agent)
+    return hook
@@ -0,0 +1,67 @@
+import os
+import shutil
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.manifest import digest
+
+from loguru import logger
+
+
+class SourceCheckpoint(BaseModel):
+    url: str
+    name: str
+    status: str  # "done" | "partial" | "failed"
+    error: str|None = None
+    result: dict|None = None
+    finished_at: str
+
+
+class CheckpointStore():
+    """One JSON file per source, written atomically as soon as the source finishes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def file_for(self, url: str, name: str) -> str:
+        return os.path.join(self.path, f"{name}-{digest(url)[:12]}.json")
+
+    def save(self, url: str, name: str, result: dict|None = None, error: str|None = None) -> SourceCheckpoint:
+        cp = SourceCheckpoint(
+            url=url,
+            name=name,
+            status="failed" if result is None else "partial" if result.get("partial") else "done",
+            error=error,
+            result=result,
+            finished_at=datetime.now().isoformat(),
+        )
+        os.makedirs(self.path, exist_ok=True)
+        path = self.file_for(url, name)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(cp.model_dump_json(indent=2))
+        os.replace(tmp, path)
+        return cp
+
+    def load(self) -> dict[str, SourceCheckpoint]:
+        checkpoints = {}
+        if not os.path.isdir(self.path):
+            return checkpoints
+        for fname in os.listdir(self.path):
+            if not fname.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.path, fname), "r") as f:
+                    cp = SourceCheckpoint.model_validate_json(f.read())
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable checkpoint {fname}: {e}")
+                continue
+            checkpoints[cp.url] = cp
+        return checkpoints
+
+    def done(self) -> dict[str, SourceCheckpoint]:
+        return {url: cp for url, cp in self.load().items() if cp.status == "done"}
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
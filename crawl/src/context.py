@@ -0,0 +1,226 @@
+import re
+import json
+import math
+import argparse
+
+from loguru import logger
+
+# Rough Gemini ratio; only used to compare sizes and to fit the budget
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET = 32_000
+
+# Higher first: kept whole longest when the budget is tight. Texts and docs
+# (plain strings in the results) use DEFAULT_PRIORITY.
+DEFAULT_PRIORITIES = {
+    "linkedin": 90,
+    "website": 80,
+    "github": 70,
+    "code_repo": 70,
+    "huggingface": 60,
+    "x": 50,
+}
+DEFAULT_PRIORITY = 85
+
+PLACEHOLDERS = {
+    "", "-", "--", "n/a", "na", "none", "null", "nil", "unknown", "tbd", "todo", "...", "…",
+    "not available", "not found", "not specified", "not provided", "not mentioned", "no information",
+}
+# Fields that identify an entity (a repo, a job, a page), most specific first
+IDENTITY_FIELDS = [("url",), ("name", "author"), ("job_title", "company"), ("title", "company"), ("name",), ("title",)]
+MIN_DEDUP_CHARS = 80
+
+
+def count_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _norm(value) -> str:
+    text = str(value).lower().removeprefix("https://").removeprefix("http://").removeprefix("www.")
+    return re.sub(r"[\W_]+", "", text)
+
+
+def clean(value):
+    """Drop empty values and placeholder strings, recursively (None if nothing is left)."""
+    if isinstance(value, dict):
+        cleaned = {k: v for k, v in ((k, clean(v)) for k, v in value.items()) if v is not None}
+        return cleaned or None
+    if isinstance(value, list):
+        cleaned = [v for v in (clean(v) for v in value) if v is not None]
+        return cleaned or None
+    if isinstance(value, str):
+        value = value.strip()
+        return None if value.lower().rstrip(".") in PLACEHOLDERS else value
+    return value
+
+
+def entity_key(entity: dict) -> tuple|None:
+    for fields in IDENTITY_FIELDS:
+        if all(isinstance(entity.get(f), str) and entity[f] for f in fields):
+            return (fields, *(_norm(entity[f]) for f in fields))
+    return None
+
+
+class Deduplicator():
+    """Remove entities and long texts already seen in a higher-priority source.
+
+    A repeated entity is merged into the first one: fields missing there are
+    taken from the duplicate.
+    """
+
+    def __init__(self) -> None:
+        self.entities: dict[tuple, dict] = {}
+        self.texts: set[str] = set()
+        self.removed = 0
+
+    def __call__(self, value):
+        if isinstance(value, list):
+            kept = []
+            for item in value:
+                key = entity_key(item) if isinstance(item, dict) else None
+                if key is not None and key in self.entities:
+                    first = self.entities[key]
+                    for k, v in item.items():
+                        first.setdefault(k, v)
+                    self.removed += 1
+                    continue
+                item = self(item)
+                if item is not None:
+                    kept.append(item)
+                    if key is not None:
+                        self.entities[key] = item
+            return kept or None
+        if isinstance(value, dict):
+            deduped = {k: v for k, v in ((k, self(v)) for k, v in value.items()) if v is not None}
+            return deduped or None
+        if isinstance(value, str) and len(value) >= MIN_DEDUP_CHARS:
+            key = _norm(value)
+            if key in self.texts:
+                self.removed += 1
+                return None
+            self.texts.add(key)
+        return value
+
+
+def render(name: str, sections: dict) -> str:
+    md = f"# {name}\n\n"
+    for title, value in sections.items():
+        body = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        md += f"## {title}\n{body}\n\n"
+    return md
+
+
+def _lists(value, found: list):
+    if isinstance(value, list):
+        found.append(value)
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else []
+    for child in children:
+        _lists(child, found)
+    return found
+
+
+def _truncate_strings(value, max_chars: int):
+    if isinstance(value, dict):
+        return {k: _truncate_strings(v, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_truncate_strings(v, max_chars) for v in value]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars].rstrip() + "…"
+    return value
+
+
+def _shrink(value):
+    """One truncation step for a section, None when it can't shrink any further."""
+    if isinstance(value, str):
+        return value[: len(value) // 2].rstrip() + "…" if len(value) > 400 else None
+    # Lists are ordered by relevance (stars, recency, ...): halve the largest one first
+    lists = [l for l in _lists(value, []) if len(l) > 1]
+    if lists:
+        largest = max(lists, key=lambda l: len(json.dumps(l)))
+        del largest[math.ceil(len(largest) / 2):]
+        return value
+    for max_chars in (1000, 400, 150):
+        truncated = _truncate_strings(value, max_chars)
+        if truncated != value:
+            return truncated
+    return None
+
+
+class CompiledContext():
+    def __init__(self, markdown: str, tokens_before: int, tokens_after: int, dropped: list[str], deduplicated: int) -> None:
+        self.markdown = markdown
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+        self.dropped = dropped
+        self.deduplicated = deduplicated
+
+    def report(self) -> str:
+        saved = 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+        line = f"context: {self.tokens_before} -> {self.tokens_after} tokens (-{saved:.0%}), {self.deduplicated} duplicates removed"
+        if self.dropped:
+            line += f", dropped: {', '.join(self.dropped)}"
+        return line
+
+
+def compile_context(
+    name: str,
+    results: dict,
+    budget: int = DEFAULT_BUDGET,
+    priorities: dict[str, int]|None = None,
+    original: str|None = None,
+) -> CompiledContext:
+    """Compact the crawl results of one user into a markdown context within `budget` tokens.
+
+    `results` is the user's final JSON (source or text/doc title -> value);
+    `original` is the markdown it replaces, for the before/after token count.
+    """
+    priorities = DEFAULT_PRIORITIES if priorities is None else priorities
+    order = sorted(results, key=lambda k: priorities.get(k, DEFAULT_PRIORITY), reverse=True)
+    if original is None:
+        original = f"# {name}\n\n" + "".join(f"## {k}\n{json.dumps(results[k], indent=2)}\n\n" for k in order)
+
+    dedup = Deduplicator()
+    sections = {}
+    for key in order:
+        value = clean(results[key])
+        value = dedup(value) if value is not None else None
+        if value is not None:
+            sections[key] = value
+
+    # Shrink the lowest-priority section until it can't shrink, then drop it, then the next one
+    dropped = []
+    markdown = render(name, sections)
+    while count_tokens(markdown) > budget and sections:
+        lowest = next(reversed(sections))
+        shrunk = _shrink(sections[lowest])
+        if shrunk is None:
+            del sections[lowest]
+            dropped.append(lowest)
+        else:
+            sections[lowest] = shrunk
+        markdown = render(name, sections)
+
+    return CompiledContext(markdown, count_tokens(original), count_tokens(markdown), dropped, dedup.removed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a user's crawl results (out/<name>.json) into a compact context.")
+    parser.add_argument("results", help="out/<slugified-name>.json")
+    parser.add_argument("--name", default=None, help="person name for the title (default: from the file name)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="max tokens of the compiled context")
+    parser.add_argument("--out", default=None, help="default: out/<slugified-name>.context.md")
+    args = parser.parse_args()
+
+    with open(args.results, "r") as f:
+        results = json.load(f)
+    base = args.results.removesuffix(".json")
+    original = None
+    try:
+        with open(f"{base}.md", "r") as f:
+            original = f.read()
+    except OSError:
+        pass
+    name = args.name or base.rsplit("/", 1)[-1].replace("-", " ").title()
+    compiled = compile_context(name, results, budget=args.budget, original=original)
+    with open(args.out or f"{base}.context.md", "w") as f:
+        f.write(compiled.markdown)
+    logger.info(compiled.report())
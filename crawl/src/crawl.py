@@ -1,22 +1,39 @@
 import os
-import subprocess
-import time
-import shutil
-import contextlib
 import asyncio
 import json
-from urllib.parse import urlparse
-from types import CoroutineType
-from datetime import datetime
+from datetime import datetime, timedelta
 import inspect
+import contextlib
 import  unicodedata
 import re
+from typing import Callable
 
-from browser_use import Agent, Browser, BrowserProfile
-from browser_use.llm import ChatGoogle
+from browser_use import Agent, Controller
+from browser_use.agent.views import AgentHistoryList
+from browser_use.llm import BaseChatModel, ChatGoogle
+from pydantic import BaseModel
 
 from src.models import Link, UserInput, Text, Doc
-from src.customizations import CodeRepo, GitHub, Linkedin, Website, X, HuggingFace
+from src.customizations import registry
+from src.customizations.base_customization import BaseCustomization
+from src.customizations.fanout import SubTask
+from src.browser_pool import BrowserPool
+from src.browser_settings import BrowserSettings
+from src.http_client import close_http_client
+from src.manifest import CrawlManifest
+from src.checkpoint import CheckpointStore
+from src.scheduler import Scheduler, DurationHistory
+from src.documents import DocumentIngestor
+from src.context import DEFAULT_BUDGET, compile_context
+from src.retrieval import RetrievalIndex
+from src.budgets import SALVAGE_SECONDS, AgentBudget, Deadline, StepHistory, chain_hooks
+from src.agent_history import HistoryRecorder
+from src.serializers import DEFAULT_FORMAT, get_serializer
+from src.tracing import StepTracer, TracedChatModel, span, trace_controller
+from src.proxy import CachingProxy
+from src.llm_cache import CachedChatModel, LLMCache
+from src.prompt_overhead import slim_model
+from src.extractors.base import BaseExtractor
 
 from loguru import logger
 
@@ -33,200 +50,506 @@ def slugify(text: str) -> str:
     text = re.sub(r"-{2,}", "-", text)
     return text
 
-def detect_profile_name(chrome_user_dir: str) -> str:
-    ls_path = os.path.join(chrome_user_dir, "Local State")
-    try:
-        with open(ls_path, "r", encoding="utf-8") as f:
-            ls = json.load(f)
-        return ls.get("profile", {}).get("last_used", "Default")
-    except Exception:
-        return "Default"
-
-async def crawl_user(
-    user: UserInput,
-    out_path: str,
-    concurrency: int = 5,
-    verbose: bool = False
-):
-    final_result = {}
-    final_md = f"# {user.name}\n\n"
-
-    # ---------------------------------
-    # TEXTS
-    # ---------------------------------
-    for text in user.texts:
-        final_result[text.title] = text.content
-
-    # ---------------------------------
-    # DOCS
-    # ---------------------------------
-    # TODO: implement
-    # for doc in user.docs:
-    #     ...
-
-    # ---------------------------------
-    # LINKS
-    # ---------------------------------
-    # TODO: 
-
-    # ---------------------------------
-    # START BROWSERS
-    # ---------------------------------
-    chrome_exec_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-    chrome_user_dir = os.path.expanduser("~/Library/Application Support/Google/Chrome/")
-    profile_name = detect_profile_name(chrome_user_dir)
-    ports = [p for p in list(range(9222, 9222+concurrency))]
-    browsers: list[Browser] = []
-    chrome_tmp_dirs = []
-
-    for p in ports:
-        logger.info(f"Starting browser on port: {p}.")
-        cdp_url = f"http://127.0.0.1:{p}"
-        chrome_tmp_dir = f"/tmp/askthebio-profiles/{p}"
-        chrome_tmp_dirs.append(chrome_tmp_dir)
-        # copy profile dir
-        shutil.copytree(
-            src=os.path.join(chrome_user_dir, profile_name),
-            dst=os.path.join(chrome_tmp_dir, profile_name),
-            symlinks=True,
-            copy_function=shutil.copy2,
-            dirs_exist_ok=True
-        )
-        assert os.path.exists(os.path.join(chrome_tmp_dir, profile_name, "Bookmarks")), "Profile copy failed"
-
-        # start browser
-        subprocess.Popen(
-            [
-                chrome_exec_path,
-                f"--remote-debugging-port={p}",
-                f"--user-data-dir={chrome_tmp_dir}",
-                f"--profile-directory={profile_name}",
-                "--no-first-run",
-                "--no-default-browser-check",
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        time.sleep(1) # TODO: improve waiting
-        # connect browser-use
-        # profile = BrowserProfile(minimum_wait_page_load_time=0.1, wait_between_actions=0.1)
-        br = Browser(cdp_url=cdp_url, headless=False)#, browser_profile=profile, headless=False)
-        await br.start()
-        browsers.append(br)
-
-    browser_pool: asyncio.Queue[Browser] = asyncio.Queue()
-    for br in browsers:
-        await browser_pool.put(br)
-
-    running_agents: list[CoroutineType] = []
+def customization_for(link: Link, out_path: str = "out") -> BaseCustomization:
+    # Make builder for specific website
+    return registry.create(link, out_path)
+
+def make_llm(cache: LLMCache|None = None) -> TracedChatModel:
+    llm = ChatGoogle(
+        model=os.environ['MODEL'],
+        temperature=0.3,
+        thinking_budget=0,
+    )
+    # Inside the tracing wrapper, so that cache hits still show up as (free) llm spans
+    return TracedChatModel(CachedChatModel(llm, cache) if cache is not None else llm)
+
+def make_pool(size: int, **kwargs) -> BrowserPool:
+    # macOS Chrome or headless Linux Chromium, see BrowserSettings.from_env()
+    return BrowserSettings.from_env().pool(size, **kwargs)
+
+class UserCrawl():
+    """State of the crawl of one user: which sources to run, and their results.
+
+    `prepare()` resolves the links and drops the sources that can be reused
+    (resume checkpoints, unchanged fingerprints); `run_isolated()` crawls one of
+    the remaining sources on a shared pool; `finish()` writes the user's outputs.
+
+    Every source must finish within `source_timeout` seconds and before the
+    crawl's `deadline`; a source stopped by them keeps a partial result.
+
+    With `slim_schemas`, agents navigate with a compact `done` (see
+    slim_model()) instead of the full result schema on every step, and the
+    result model is filled from their notes with one LLM call at the end.
+    """
+
+    def __init__(
+        self,
+        user: UserInput,
+        out_path: str,
+        verbose: bool = False,
+        llm_factory: Callable[[], BaseChatModel] = make_llm,
+        context_budget: int = DEFAULT_BUDGET,
+        step_history: StepHistory|None = None,
+        output_format: str = DEFAULT_FORMAT,
+        deadline: Deadline|None = None,
+        source_timeout: float|None = None,
+        slim_schemas: bool = False,
+    ) -> None:
+        self.user = user
+        self.out_path = out_path
+        self.verbose = verbose
+        self.llm_factory = llm_factory
+        self.context_budget = context_budget
+        self.step_history = step_history or StepHistory(os.path.join(out_path, ".step_history.json"))
+        self.serializer = get_serializer(output_format)
+        self.slug_name = slugify(user.name)
+        self.user_path = os.path.join(out_path, self.slug_name)
+        self.final_result = {}
+        self.final_md = f"# {user.name}\n\n"
+        self.builders: list[BaseCustomization] = []
+        self.checkpoints = CheckpointStore(os.path.join(self.user_path, "checkpoints"))
+        self.manifest_path = os.path.join(out_path, f"{self.slug_name}.manifest.json")
+        self.manifest = CrawlManifest.load(self.manifest_path)
+        self.fingerprints: dict[BaseCustomization, str|None] = {}
+        self.deadline = deadline or Deadline()
+        self.source_timeout = source_timeout
+        self.slim_schemas = slim_schemas
+        self.partial: set[BaseCustomization] = set()
+        self.agent_sources: set[BaseCustomization] = set()   # results that came from browser agents
+        # Set by the caller running this crawl's jobs: fan-out sub-agents count against its domain limits
+        self.scheduler: Scheduler|None = None
+
+    async def prepare(self, force_refresh: bool = False, max_age: timedelta|None = None, resume: bool = False) -> None:
+        user = self.user
+
+        # ---------------------------------
+        # TEXTS
+        # ---------------------------------
+        for text in user.texts:
+            self.final_result[text.title] = text.content
+
+        # ---------------------------------
+        # DOCS
+        # ---------------------------------
+        # Converted in parallel with the agents, see ingest_docs()
+
+        # ---------------------------------
+        # LINKS
+        # ---------------------------------
+        builders = [customization_for(link, self.user_path) for link in user.links]
+
+        # ---------------------------------
+        # RESUME
+        # ---------------------------------
+        # Every finished source is checkpointed; resume reuses the successful ones
+        reused = {}
+        if resume:
+            done = self.checkpoints.done()
+            for builder in builders:
+                if builder.link.url in done:
+                    logger.info(f"{builder.link.url} already crawled, resuming from checkpoint.")
+                    reused[builder] = done[builder.link.url].result
+            builders = [b for b in builders if b not in reused]
+        else:
+            self.checkpoints.clear()
+
+        # ---------------------------------
+        # INCREMENTAL RECRAWL
+        # ---------------------------------
+        # Sources whose fingerprint didn't change since the last run reuse the stored extraction
+        self.fingerprints = dict(zip(builders, await asyncio.gather(*(b.fingerprint() for b in builders))))
+        for builder, fp in self.fingerprints.items():
+            entry = None if force_refresh else self.manifest.reusable(builder.link.url, fp, max_age)
+            if entry is not None:
+                logger.info(f"{builder.link.url} unchanged since {entry.knowledge_cutoff_date}, reusing extraction.")
+                reused[builder] = entry.result
+        self.builders = [b for b in builders if b not in reused]
+
+        for builder, parsed_j in reused.items():
+            if builder.link.url in self.manifest.sources:
+                self.manifest.sources[builder.link.url].checked_at = datetime.now().isoformat()
+            self.checkpoints.save(builder.link.url, builder.name, result=parsed_j)
+            self.add_result(builder.name, parsed_j)
 
     # ---------------------------------
     # Run an agent for each url
     # ---------------------------------
-    logger.info("Start crawling.")
-    for link in user.links:
-        netloc = urlparse(link.url).netloc.replace("www.", "")
-
-        # Make builder for specific website
-        if netloc == "github.com":
-            logger.info(f"Processing {link.url} as GitHub")
-            agent_builder = GitHub(link=link, name="github")
-
-        elif "gitlab" in netloc or "bitbucket" in netloc:
-            logger.info(f"Processing {link.url} as Other code repo")
-            agent_builder = CodeRepo(link=link)
-
-        elif netloc == "huggingface.co":
-            logger.info(f"Processing {link.url} as Huggingface")
-            agent_builder = HuggingFace(link=link)
-
-        elif netloc == "linkedin.com":
-            logger.info(f"Processing {link.url} as Linkedin")
-            agent_builder = Linkedin(link=link)
-
-        elif netloc == "x.com":
-            logger.info(f"Processing {link.url} as X")
-            agent_builder = X(link=link)
-
-        else:
-            logger.info(f"Processing {link.url} as Website")
-            agent_builder = Website(link=link)
-
-        # Make browser-use controller
-        controller = agent_builder.controller()
-
+    async def run_source(self, builder: BaseCustomization, pool: BrowserPool, deadline: Deadline) -> dict|None:
+        # API-first: the browser agent only runs if the extractor can't get the data
+        parsed = None
+        extractor = builder.extractor()
+        if extractor is not None:
+            with span("extractor"):
+                parsed = await extractor.extract(builder.link.url, self.user.name, self.llm_factory())
+            if parsed is not None and builder.fan_out and (missing := extractor.missing(parsed)):
+                parsed = await self.fill_in(builder, pool, deadline, parsed, missing)
+
+        if parsed is None:
+            self.agent_sources.add(builder)
+            if builder.fan_out:
+                parsed = await self.run_fan_out(builder, pool, deadline)
+            else:
+                # Step budget from past runs
+                max_steps = self.step_history.budget(builder)
+                history = await self.run_agent(
+                    builder, pool, builder.prompt(self.user.name), self.controller(builder, builder.result_class()), max_steps, builder.max_seconds, deadline,
+                )
+                self.step_history.record(builder, history.number_of_steps(), history.is_done())
+                parsed = await self.agent_output(builder, history, builder.result_class(), deadline)
+            if extractor is not None:
+                parsed = await extractor.complete(parsed, self.user.name, self.llm_factory())
+
+        if parsed is None:
+            return None
+        parsed_j = parsed.model_dump()
+        parsed_j["knowledge_cutoff_date"] = datetime.isoformat(datetime.now())
+        if builder in self.partial:
+            parsed_j["partial"] = True
+        return parsed_j
+
+    async def run_agent(
+        self,
+        builder: BaseCustomization,
+        pool: BrowserPool,
+        task: str,
+        controller: Controller,
+        max_steps: int,
+        max_seconds: float|None,
+        deadline: Deadline,
+        history_name: str = "history",
+    ) -> AgentHistoryList:
         # Start browser-use agent
-        logs_path = None
-        if verbose:
-            logs_path = os.path.join(agent_builder.out_path, "logs/conversation")
-            os.makedirs(logs_path, exist_ok=True)
-
         agent = Agent(
-            task=agent_builder.prompt(user.name),
-            llm=ChatGoogle(
-                model=os.environ['MODEL'],
-                temperature=0.3,
-                thinking_budget=0,
-            ),
-            controller=controller,
+            task=task,
+            llm=self.llm_factory(),
+            controller=trace_controller(controller),
             browser_session=None,
-            downloads_path=out_path,
-            save_conversation_path=logs_path
+            downloads_path=self.user_path,
         )
-
-        # Add agent coroutine to gather async coroutines
-        async def run_agent_w_builder(agent, max_steps, builder, pool: asyncio.Queue):
-            # take a free browser
-            window = await pool.get()
-            try:
+        # Steps are streamed to disk as they run, screenshots and prompts deduplicated in a shared blob store
+        recorder = None
+        if self.verbose:
+            recorder = HistoryRecorder(
+                os.path.join(builder.out_path, f"{history_name}.jsonl"),
+                os.path.join(self.out_path, ".history_blobs"),
+            )
+        # Wrap up early on time out or when steps stop finding anything new
+        budget = AgentBudget(max_seconds=max_seconds, deadline=deadline)
+
+        # take a free browser, it goes back to the pool (or is replaced) when done
+        try:
+            async with pool.browser() as window:
+                # The time budget runs from here: waiting for a free browser doesn't count
+                budget.attach(agent)
                 agent.browser_session = window
-                history = await agent.run(max_steps=max_steps)
-                return history, builder
-            finally:
-                # return the browser to the pool so the next job can use it
-                await pool.put(window)
-
-        running_agents.append(
-            run_agent_w_builder(agent, agent_builder.max_steps, agent_builder, browser_pool)
-        )
-
-    # Wait for agents to finish and save results to file
-    for coro_agent in asyncio.as_completed(running_agents):
-        history, agent_builder = await coro_agent
-
-        if verbose:
-            history.save_to_file(os.path.join(agent_builder.out_path, "history.json"))
-
-        result = history.final_result()
+                steps = StepTracer()
+                on_step_end = [budget.on_step_end, steps.on_step_end] + ([recorder.on_step_end] if recorder else [])
+                try:
+                    with span("agent.run", max_steps=max_steps) as s:
+                        history = await asyncio.wait_for(
+                            agent.run(
+                                max_steps=max_steps,
+                                on_step_start=chain_hooks(steps.on_step_start, budget.on_step_start),
+                                on_step_end=chain_hooks(*on_step_end),
+                            ),
+                            timeout=budget.hard_timeout,
+                        )
+                        s.set(n_steps=history.number_of_steps(), wrap_up=budget.reason)
+                except asyncio.TimeoutError:
+                    if budget.started:
+                        raise
+                    # Out of time before its first step (e.g. the deadline passed while queued): the browser is untouched
+                    logger.warning(f"Agent on {builder.link.url} had no time left to start.")
+                    budget.cut_short = True
+                    history = agent.history
+        except asyncio.TimeoutError:
+            # Cancelled mid-step (the pool replaces its browser): keep the steps that finished
+            logger.warning(f"Agent on {builder.link.url} cancelled at its deadline after {agent.history.number_of_steps()} steps.")
+            budget.cut_short = True
+            history = agent.history
+
+        if budget.cut_short:
+            self.partial.add(builder)
+        if recorder is not None:
+            recorder.close(history)
+        return history
+
+    def controller(self, builder: BaseCustomization, output_model: type[BaseModel]) -> Controller:
+        return builder.controller(slim_model(output_model) if self.slim_schemas else output_model)
+
+    async def agent_output(
+        self,
+        builder: BaseCustomization,
+        history: AgentHistoryList,
+        output_model: type[BaseModel],
+        deadline: Deadline,
+    ) -> BaseModel|None:
+        # final_result() is the last step's text even without `done`
+        result = history.final_result() if history.is_done() else None
+        if result and not self.slim_schemas:
+            return output_model.model_validate_json(result)
+        if not history.history:
+            return None
+
+        # Otherwise one LLM call fills the model: from the notes of a slim `done`, or,
+        # without `done` (cancelled, out of steps), from what the steps gathered
+        gathered = [c for c in history.extracted_content() if c] + [t.memory for t in history.model_thoughts() if t.memory]
         if result:
-            parsed = agent_builder.result_class().model_validate_json(result)
-            parsed_j = parsed.model_dump()
-            parsed_j["knowledge_cutoff_date"] = datetime.isoformat(datetime.now()),
-            final_result[agent_builder.name] = parsed_j
-            final_md += f"## {agent_builder.name}\n"
-            final_md += "```json\n"
-            final_md += f"{json.dumps(parsed_j, indent=2)}\n"
-            final_md += "```\n\n"
-            if verbose:
-                logger.info(parsed_j)
-            json.dump(parsed_j, open(os.path.join(agent_builder.out_path, "extraction.json"), "w"))
+            # The notes are the `done` step's extracted content, last in `gathered`
+            intro = f"A browser agent crawled {builder.link.url} for information about {self.user.name}. Fill in the result from its final notes and what it gathered on the way; leave out what it did not find."
+            name, timeout = "extract", None
         else:
-            logger.info(f'No result from {agent_builder.link.url}')
-            final_result[agent_builder.name] = {}
+            self.partial.add(builder)
+            intro = f"A browser agent crawling {builder.link.url} for information about {self.user.name} was stopped before it finished. Fill in the result with what it gathered; leave out what it did not find."
+            name, timeout = "salvage", SALVAGE_SECONDS
+        if not gathered:
+            return None
+        prompt = (
+            f"{intro}\n\n"
+            f"Visited pages: {json.dumps([u for u in dict.fromkeys(history.urls()) if u])}\n\n"
+            f"Gathered:\n" + "\n\n".join(gathered)
+        )
+        remaining = deadline.remaining()
+        try:
+            async with asyncio.timeout(timeout if remaining is None else max(0.0, remaining - 1)):
+                with span(name, steps=history.number_of_steps()):
+                    return await BaseExtractor.ask(self.llm_factory(), prompt, output_model)
+        except Exception as e:
+            logger.warning(f"Could not {name} a result for {builder.link.url}: {e!r}")
+            return None
+
+    async def run_fan_out(self, builder: BaseCustomization, pool: BrowserPool, deadline: Deadline) -> BaseModel|None:
+        # Discovery agent first, then the sub-task agents in parallel on the free browsers of the pool
+        discovery = None
+        if (task := builder.discovery(self.user.name)) is not None:
+            discovery = await self.run_subtask(builder, pool, task, deadline)
+
+        subtasks = builder.subtasks(self.user.name, discovery)
+        outputs = await self.run_subtasks(builder, pool, subtasks, deadline)
+        return builder.merge(discovery, list(zip(subtasks, outputs)))
+
+    async def fill_in(self, builder: BaseCustomization, pool: BrowserPool, deadline: Deadline, parsed: BaseModel, fields: set[str]) -> BaseModel:
+        # Only the sub-tasks covering the fields the extractor couldn't get run; the rest of its result is kept
+        subtasks = [t for t in builder.subtasks(self.user.name, None) if t.into is None and fields & set(t.output_model.model_fields)]
+        outputs = await self.run_subtasks(builder, pool, subtasks, deadline)
+        filled = builder.merge(None, list(zip(subtasks, outputs)))
+        if filled is None or None in outputs:
+            self.partial.add(builder)
+        if filled is None:
+            return parsed
+        return parsed.model_copy(update={name: getattr(filled, name) for name in fields})
+
+    async def run_subtasks(self, builder: BaseCustomization, pool: BrowserPool, subtasks: list[SubTask], deadline: Deadline) -> list[BaseModel|None]:
+        # In parallel on the free browsers of the pool
+        limit = asyncio.Semaphore(builder.fan_out_concurrency)
+        # Without a shared scheduler (e.g. a distributed worker), the domain limits still hold within the source
+        scheduler = self.scheduler or Scheduler(n_workers=builder.fan_out_concurrency)
+        lends = self.scheduler.lends_slot(builder) if self.scheduler is not None else contextlib.nullcontext()
+
+        async def run(task: SubTask) -> BaseModel|None:
+            async with limit, scheduler.domain_slot(builder):
+                return await self.run_subtask(builder, pool, task, deadline)
+
+        async with lends:
+            outputs = await asyncio.gather(*(run(t) for t in subtasks))
+        logger.info(f"{builder.link.url}: {sum(o is not None for o in outputs)}/{len(subtasks)} sub-tasks returned a result.")
+        return list(outputs)
+
+    async def run_subtask(self, builder: BaseCustomization, pool: BrowserPool, task: SubTask, deadline: Deadline) -> BaseModel|None:
+        # A failed sub-task only leaves its part of the result empty
+        try:
+            with span("subtask", key=task.key):
+                history = await self.run_agent(
+                    builder, pool, task.prompt, self.controller(builder, task.output_model), task.max_steps, task.max_seconds,
+                    deadline, history_name=f"history.{slugify(task.key)}",
+                )
+                return await self.agent_output(builder, history, task.output_model, deadline)
+        except Exception:
+            logger.exception(f"Sub-task {task.key} of {builder.link.url} failed")
+            return None
+
+    async def run_isolated(self, builder: BaseCustomization, pool: BrowserPool) -> dict|None:
+        # A failing source is checkpointed as failed and never takes the others down
+        parsed_j, error = await self.crawl_source(builder, pool)
+        self.finish_source(builder, parsed_j, error)
+        return parsed_j
+
+    async def run_scheduled(self, builder: BaseCustomization, pool: BrowserPool) -> bool:
+        # Scheduler job: its duration is only worth recording for a complete browser-agent result
+        parsed_j = await self.run_isolated(builder, pool)
+        return parsed_j is not None and builder in self.agent_sources and builder not in self.partial
+
+    async def crawl_source(self, builder: BaseCustomization, pool: BrowserPool) -> tuple[dict|None, str|None]:
+        # (result, None) or (None, error), never raises; nothing is written (see finish_source())
+        deadline = self.deadline.within(self.source_timeout)
+        try:
+            if deadline.expired():
+                raise TimeoutError("crawl deadline passed before the source started")
+            with span("source", url=builder.link.url, customization=builder.name, user=self.user.name):
+                # Last resort if the source ignores its deadline (e.g. a hung extractor)
+                async with asyncio.timeout(deadline.remaining()):
+                    parsed_j = await self.run_source(builder, pool, deadline)
+        except TimeoutError as e:
+            logger.warning(f"{builder.link.url} missed its deadline with nothing to keep: {e!r}")
+            return None, f"deadline: {e!r}"
+        except Exception as e:
+            logger.exception(f"Crawling {builder.link.url} failed")
+            return None, repr(e)
+        if parsed_j is None:
+            logger.info(f'No result from {builder.link.url}')
+            return None, "no result"
+        return parsed_j, None
+
+    def finish_source(self, builder: BaseCustomization, parsed_j: dict|None, error: str|None) -> None:
+        self.checkpoints.save(builder.link.url, builder.name, result=parsed_j, error=error)
+        self.record(builder, parsed_j)
+
+    async def ingest_docs(self, ingestor: DocumentIngestor) -> None:
+        # Each document is written to the outputs as soon as it is converted
+        async def ingest(doc: Doc):
+            try:
+                markdown = await ingestor.to_markdown(doc)
+            except Exception:
+                logger.exception(f"Converting {doc.title} ({doc.ref}) failed")
+                return
+            self.final_result[doc.title] = markdown
+            self.final_md += f"## {doc.title}\n\n{markdown}\n\n"
+            self.write_outputs()
+
+        await asyncio.gather(*(ingest(doc) for doc in self.user.docs))
+
+    def add_result(self, name: str, parsed_j: dict):
+        self.final_result[name] = parsed_j
+        self.final_md += f"## {name}\n"
+        self.final_md += f"```{self.serializer.fence}\n"
+        self.final_md += f"{self.serializer.dumps(parsed_j)}\n"
+        self.final_md += "```\n\n"
+
+    def record(self, builder: BaseCustomization, parsed_j: dict|None):
+        if parsed_j is None:
+            self.final_result[builder.name] = {}
+            return
+
+        self.add_result(builder.name, parsed_j)
+        if self.verbose:
+            logger.info(parsed_j)
+        os.makedirs(builder.out_path, exist_ok=True)
+        json.dump(parsed_j, open(os.path.join(builder.out_path, "extraction.json"), "w"))
+        # No fingerprint for a partial result: the next run crawls the source again
+        fingerprint = None if parsed_j.get("partial") else self.fingerprints.get(builder)
+        self.manifest.record(builder.link.url, builder.name, fingerprint, parsed_j)
+        self.manifest.save(self.manifest_path)
+        self.write_outputs()
+
+    def write_outputs(self):
+        # Rewritten as results arrive, so the outputs are usable before the crawl ends
+        os.makedirs(self.out_path, exist_ok=True)
+        for path, content in (
+            (os.path.join(self.out_path, f"{self.slug_name}.json"), json.dumps(self.final_result, indent=2)),
+            (os.path.join(self.out_path, f"{self.slug_name}.md"), self.final_md),
+        ):
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(content)
+            os.replace(tmp, path)
+
+    def finish(self):
+        self.manifest.save(self.manifest_path)
+        self.write_outputs()
+
+        # Compact, token-budgeted version of the .md for the agent worker
+        compiled = compile_context(self.user.name, self.final_result, budget=self.context_budget, original=self.final_md)
+        with open(os.path.join(self.out_path, f"{self.slug_name}.context.md"), "w") as f:
+            f.write(compiled.markdown)
+        logger.info(f"{self.user.name}: {compiled.report()}")
+
+        # Retrieval index, to send only the passages relevant to each question
+        RetrievalIndex.build(self.final_result).save(os.path.join(self.out_path, f"{self.slug_name}.index.json.gz"))
+
+        partial = [url for url, cp in self.checkpoints.load().items() if cp.status == "partial"]
+        if partial:
+            logger.warning(f"{self.user.name}: {len(partial)} source(s) were cut by their deadline and are partial: {partial}")
+        failed = [url for url, cp in self.checkpoints.load().items() if cp.status == "failed"]
+        if failed:
+            logger.warning(f"{self.user.name}: {len(failed)} source(s) failed, rerun with resume=True to retry them: {failed}")
 
-    # Save to file
-    slug_name = slugify(user.name)
-    with open(os.path.join(out_path, f"{slug_name}.json"), "w") as f:
-        json.dump(final_result, f, indent=2)
-    with open(os.path.join(out_path, f"{slug_name}.md"), "w") as f:
-        f.write(final_md)
 
-    # Close all the browsers
-    for br in browsers:
-        with contextlib.suppress(Exception):
-            await br.stop()
+async def crawl_user(
+    user: UserInput,
+    out_path: str,
+    concurrency: int = 5,
+    verbose: bool = False,
+    force_refresh: bool = False,
+    max_age: timedelta|None = None,
+    resume: bool = False,
+    llm_factory: Callable[[], BaseChatModel] = make_llm,
+    pool_factory: Callable[[int], BrowserPool] = make_pool,
+    context_budget: int = DEFAULT_BUDGET,
+    proxy: CachingProxy|None = None,
+    output_format: str = DEFAULT_FORMAT,
+    deadline_seconds: float|None = None,
+    source_timeout: float|None = None,
+    slim_schemas: bool = False,
+):
+    # The outputs are written after deadline_seconds even if some sources are not done (they are kept partial)
+    deadline = Deadline(deadline_seconds)
+    with span("crawl", user=user.name):
+        await _crawl_user(
+            user, out_path, concurrency, verbose, force_refresh, max_age, resume, llm_factory, pool_factory, context_budget, proxy,
+            output_format, deadline, source_timeout, slim_schemas,
+        )
 
-    # Clean tmp dirs
-    for tmp in chrome_tmp_dirs:
-        shutil.rmtree(tmp, ignore_errors=True)
+async def _crawl_user(
+    user: UserInput,
+    out_path: str,
+    concurrency: int,
+    verbose: bool,
+    force_refresh: bool,
+    max_age: timedelta|None,
+    resume: bool,
+    llm_factory: Callable[[], BaseChatModel],
+    pool_factory: Callable[[int], BrowserPool],
+    context_budget: int,
+    proxy: CachingProxy|None,
+    output_format: str,
+    deadline: Deadline,
+    source_timeout: float|None,
+    slim_schemas: bool,
+):
+    crawl = UserCrawl(
+        user, out_path, verbose=verbose, llm_factory=llm_factory, context_budget=context_budget, output_format=output_format,
+        deadline=deadline, source_timeout=source_timeout, slim_schemas=slim_schemas,
+    )
+    await crawl.prepare(force_refresh=force_refresh, max_age=max_age, resume=resume)
 
+    # ---------------------------------
+    # START BROWSERS
+    # ---------------------------------
+    pool = pool_factory(max(1, min(concurrency, len(user.links))))
+    if proxy is not None:
+        pool.extra_args += proxy.chrome_args
+    # Documents are converted in worker processes while browsers start and agents run
+    ingestor = DocumentIngestor(os.path.join(out_path, ".doc_cache"))
+    docs = asyncio.create_task(crawl.ingest_docs(ingestor))
+    try:
+        # Sources with an API extractor may not need a browser: those are started lazily
+        n_browser_only = sum(1 for b in crawl.builders if b.extractor() is None)
+        if n_browser_only:
+            await pool.start(n_browser_only)
+
+        logger.info("Start crawling.")
+        scheduler = Scheduler(n_workers=pool.size, history=DurationHistory(os.path.join(out_path, ".durations.json")))
+        crawl.scheduler = scheduler
+        await scheduler.run([(b, lambda b=b: crawl.run_scheduled(b, pool)) for b in crawl.builders])
+        try:
+            await asyncio.wait_for(docs, deadline.remaining())
+        except asyncio.TimeoutError:
+            logger.warning("Crawl deadline reached before all documents were converted.")
+    finally:
+        docs.cancel()
+        ingestor.close()
+        # Close all the browsers and clean their tmp dirs
+        await pool.close()
+        await close_http_client()
+
+    crawl.finish()
@@ -1,5 +1,26 @@
-from .code_repo import CodeRepo, GitHub, CodeRepoResult
-from .huggingface import HuggingFace, HFResult
-from .linkedin import Linkedin, LinkedinResult
-from .website import Website, WebsiteResult
-from .x import X, XResult
+import importlib
+
+from .registry import CustomizationRegistry, CustomizationSpec
+
+# Built-in customizations, by domain pattern (fnmatch, without "www.").
+# Classes are imported only when a link needs them.
+registry = CustomizationRegistry(fallback=CustomizationSpec("website", ["*"], f"{__name__}.website:Website"))
+registry.register("github", ["github.com"], f"{__name__}.code_repo:GitHub")
+registry.register("code_repo", ["*gitlab*", "*bitbucket*"], f"{__name__}.code_repo:CodeRepo")
+registry.register("huggingface", ["huggingface.co"], f"{__name__}.huggingface:HuggingFace")
+registry.register("linkedin", ["linkedin.com"], f"{__name__}.linkedin:Linkedin")
+registry.register("x", ["x.com"], f"{__name__}.x:X")
+
+_LAZY = {
+    "CodeRepo": "code_repo", "GitHub": "code_repo", "CodeRepoResult": "code_repo",
+    "HuggingFace": "huggingface", "HFResult": "huggingface",
+    "Linkedin": "linkedin", "LinkedinResult": "linkedin",
+    "Website": "website", "WebsiteResult": "website",
+    "X": "x", "XResult": "x",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,32 +1,65 @@
 import os
 from pydantic import BaseModel
-from typing import Type
+from typing import TYPE_CHECKING, Type
 
-from browser_use import Controller
+from .fanout import SubTask, merge_results
+
+if TYPE_CHECKING:
+    from browser_use import Controller
 
 
 class BaseCustomization():
+    # With fan_out, the agent of `prompt()` is replaced by a discovery agent and
+    # sub-task agents running in parallel on the pool, merged into result_class()
+    fan_out = False
+    fan_out_concurrency = 3
+
     def __init__(
         self,
         link,
         name: str = "base",
         allowed_domains: list[str]|None = None,
         max_steps: int = 250,
+        max_seconds: float|None = 900.0,
         out_path: str = "out"
     ) -> None:
         self.link = link
         self.name = name
         self.allowed_domains = allowed_domains
         self.max_steps = max_steps
+        self.max_seconds = max_seconds  # wall-clock budget of the agent, see src/budgets.py
         self.out_path = os.path.join(out_path, self.name)
 
     def prompt(self, *args, **kwargs) -> str:
         raise NotImplementedError
 
     @staticmethod
-    def controller(*args, **kwargs) -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> "Controller":
+        # `done` returns output_model: result_class() by default, a sub-task's model, or their slim stand-in
         raise NotImplementedError
 
     @staticmethod
     def result_class(*args, **kwargs) -> Type[BaseModel]:
         raise NotImplementedError
+
+    @staticmethod
+    def extractor(*args, **kwargs):
+        # Optional API-first extractor (see src/extractors), tried before the browser agent
+        return None
+
+    async def fingerprint(self) -> str|None:
+        # Cheap content fingerprint used to skip unchanged sources (None = always recrawl)
+        extractor = self.extractor()
+        if extractor is None:
+            return None
+        return await extractor.fingerprint(self.link.url)
+
+    def discovery(self, fullname: str) -> SubTask|None:
+        # First agent of a fan-out, whose output the sub-tasks are planned from (None = no discovery)
+        return None
+
+    def subtasks(self, fullname: str, discovery: BaseModel|None) -> list[SubTask]:
+        return []
+
+    def merge(self, discovery: BaseModel|None, results: list[tuple[SubTask, BaseModel|None]]) -> BaseModel|None:
+        return merge_results(self.result_class(), discovery, results)
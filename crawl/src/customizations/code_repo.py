@@ -2,10 +2,12 @@ import inspect
 from typing import Type
 
 from pydantic import BaseModel
-import requests
+import httpx
 from browser_use import Controller, ActionResult
 
 from .base_customization import BaseCustomization
+from .fanout import SubTask
+from ..http_client import get_http_client
 
 
 class CodeRepo(BaseCustomization):
@@ -31,9 +33,9 @@ class CodeRepo(BaseCustomization):
         """)
 
     @staticmethod
-    def controller() -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
         return Controller(
-            output_model=CodeRepoResult
+            output_model=output_model or CodeRepoResult
         )
 
     @staticmethod
@@ -42,19 +44,74 @@ class CodeRepo(BaseCustomization):
 
 
 class GitHub(CodeRepo):
+    # One agent lists the repos, then one agent per repo to detail
+    fan_out = True
+
+    def __init__(
+        self,
+        name: str = "github",
+        *args,
+        **kwargs
+    ) -> None:
+        super().__init__(name=name, *args, **kwargs)
+
+    def discovery(self, fullname: str) -> SubTask:
+        return SubTask(
+            key="discovery",
+            prompt=inspect.cleandoc(f"""
+                Get the profile information of {fullname} on GitHub and list his/her repositories. The URL to start is {self.link.url}.
+
+                - Fill in the profile fields (bio, company, location, socials, achievements, contributions in the last year, sponsorships) and starred repos of other people.
+                - Choose 5/10 public repos among the pinned ones, the most popular and the most recently updated ones (into repositories_to_detail, with their URL). Do not open them: they are analyzed separately.
+                - Put all other public repos into repositories_basic.
+
+                Be thorough, truthful and factual.
+            """),
+            output_model=GitHubDiscovery,
+            max_steps=40,
+        )
+
+    def subtasks(self, fullname: str, discovery: "GitHubDiscovery|None") -> list[SubTask]:
+        if discovery is None:
+            return []
+        return [
+            SubTask(
+                key=f"repo:{repo.name}",
+                prompt=inspect.cleandoc(f"""
+                    Get detailed information about the repository {repo.name} by {fullname}. The URL to start is {repo.url}.
+
+                    Get the overview from the README.md; if unavailable, or you need more information, use `get_github_code` function to get in a single step the first lines of each file in the repo. Stay on this repository.
+
+                    Be thorough, truthful and factual.
+                """),
+                output_model=Repo,
+                into="repositories_detailed",
+                max_steps=12,
+            )
+            for repo in discovery.repositories_to_detail
+        ]
+
     @staticmethod
-    def controller() -> Controller:
-        controller = CodeRepo.controller()
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
+        controller = CodeRepo.controller(output_model)
 
         @controller.registry.action('Get GitHub code summary')
-        def get_github_code(repo_url: str) -> ActionResult:
+        async def get_github_code(repo_url: str) -> ActionResult:
             uithub_url = repo_url.replace("github.com", "uithub.com")
             uithub_url = f"{uithub_url}?accept=text%2Fplain&maxTokens=10000"
-            response = requests.get(uithub_url)
+            try:
+                response = await get_http_client().get(uithub_url)
+            except httpx.HTTPError as e:
+                return ActionResult(error=f"Could not get code from {uithub_url}: {e!r}")
             return ActionResult(extracted_content=response.text, include_in_memory=False)
 
         return controller
 
+    @staticmethod
+    def extractor():
+        from ..extractors import GitHubExtractor
+        return GitHubExtractor()
+
 
 # Result classes
 class Repo(BaseModel):
@@ -80,6 +137,25 @@ class SponsorRef(BaseModel):
     currently_active_sponsorship: bool
     sponsorship_amount: int
 
+class RepoLink(BaseModel):
+    name: str
+    url: str
+
+class GitHubDiscovery(BaseModel):
+    username: str
+    company: str
+    location: str
+    personal_bio: str
+    email: str
+    socials: str
+    achievements: str
+    contributions_last_year: int
+    repositories_to_detail: list[RepoLink]
+    repositories_basic: list[RepoRef]
+    other_people_starred_repos: list[RepoRef]
+    sponsoring_projects_or_users: list[SponsorRef]
+    profile_summary: str
+
 class CodeRepoResult(BaseModel):
     username: str
     company: str
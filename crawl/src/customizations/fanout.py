@@ -0,0 +1,85 @@
+import types
+import typing
+from typing import Any, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+
+class SubTask():
+    """One browser agent of a fanned-out source.
+
+    `output_model` is what the agent returns. Its fields are merged by name into
+    the source's result, or, with `into`, the whole output is appended to that
+    list field of the result (e.g. one `Repo` into `repositories_detailed`).
+    """
+
+    def __init__(
+        self,
+        key: str,
+        prompt: str,
+        output_model: Type[BaseModel],
+        into: str|None = None,
+        max_steps: int = 30,
+        max_seconds: float|None = 300.0,
+    ) -> None:
+        self.key = key
+        self.prompt = prompt
+        self.output_model = output_model
+        self.into = into
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+
+
+def empty(annotation: Any) -> Any:
+    # Value for a field no sub-task filled in
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = get_args(annotation)
+        return None if type(None) in args else empty(args[0])
+    if origin in (list, set, tuple, typing.Sequence):
+        return []
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return {name: empty(f.annotation) for name, f in annotation.model_fields.items()}
+        if issubclass(annotation, bool):
+            return False
+        if issubclass(annotation, (int, float)):
+            return 0
+    return ""
+
+
+def merge_results(
+    result_class: Type[BaseModel],
+    discovery: BaseModel|None,
+    results: list[tuple[SubTask, BaseModel|None]],
+) -> BaseModel|None:
+    """The source's result from the discovery output and the sub-task outputs.
+
+    List fields are concatenated, other fields keep the first non-empty value.
+    Fields nobody returned get an empty value. None if nothing was found.
+    """
+    parts = [(None, discovery)] + list(results)
+    if all(output is None for _, output in parts):
+        return None
+
+    merged: dict[str, Any] = {}
+    for task, output in parts:
+        if output is None:
+            continue
+        if task is not None and task.into is not None:
+            merged.setdefault(task.into, []).append(output.model_dump())
+            continue
+        for name, value in output.model_dump().items():
+            if name not in result_class.model_fields:
+                continue
+            if isinstance(value, list):
+                merged.setdefault(name, []).extend(value)
+            elif not merged.get(name):
+                merged[name] = value
+
+    for name, field in result_class.model_fields.items():
+        if name not in merged and field.is_required():
+            merged[name] = empty(field.annotation)
+    return result_class.model_validate(merged)
@@ -5,9 +5,13 @@ from pydantic import BaseModel, Field
 from browser_use import Controller
 
 from .base_customization import BaseCustomization
+from .fanout import SubTask
 
 
 class HuggingFace(BaseCustomization):
+    # One agent per category of the profile, no discovery needed
+    fan_out = True
+
     def __init__(
         self,
         name="huggingface",
@@ -33,16 +37,48 @@ class HuggingFace(BaseCustomization):
             Be thorough, truthful and factual.
         """)
 
+    def subtasks(self, fullname: str, discovery: BaseModel|None) -> list[SubTask]:
+        additional = ""
+        if self.link.description:
+            additional = f" {fullname} gave this additional information: {self.link.description}"
+        categories = [
+            ("profile", HFProfile, "the profile overview: interests, organizations, recent activity and the counts of followers, following, posts, articles, collections, papers, models and datasets. Also summarize the profile"),
+            ("models", HFModels, "the models: the most recent ones and the ones with the most downloads (use the radio button to change the sorting), at least three"),
+            ("datasets", HFDatasets, "the datasets: the most recent ones and the ones with the most downloads (use the radio button to change the sorting), at least three"),
+            ("papers", HFPapers, "the papers, the most recent ones first, at least three"),
+            ("writing", HFWriting, "the posts, articles and collections, the most recent ones first, at least three per category"),
+        ]
+        return [
+            SubTask(
+                key=key,
+                prompt=inspect.cleandoc(f"""
+                    Get information about {fullname} from his/her huggingface profile. The URL to start is {self.link.url}.{additional}
+
+                    Only look at {what}. Keep only things made by {fullname}. If a section is not in the profile, {fullname} has 0 of that: don't obsess about it.
+
+                    Be thorough, truthful and factual.
+                """),
+                output_model=model,
+                max_steps=25,
+            )
+            for key, model, what in categories
+        ]
+
     @staticmethod
-    def controller() -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
         return Controller(
-            output_model=HFResult
+            output_model=output_model or HFResult
         )
 
     @staticmethod
     def result_class() -> Type[BaseModel]:
         return HFResult
 
+    @staticmethod
+    def extractor():
+        from ..extractors import HuggingFaceExtractor
+        return HuggingFaceExtractor()
+
 
 # Result classes
 class Activity(BaseModel):
@@ -97,3 +133,28 @@ class HFResult(BaseModel):
     models: list[ModelReference]
     datasets: list[DatasetReference]
     summary: str = Field(description="Summary of the profile: is the user active? What's the user's focus? What's the most important contribution?")
+
+# Outputs of the sub-tasks, merged into HFResult by field name
+class HFProfile(BaseModel):
+    name: str
+    username: str
+    url: str
+    ai_ml_interests: str
+    recent_activity: list[Activity]
+    organizations: list[str]
+    stats: Stats
+    summary: str = Field(description="Summary of the profile: is the user active? What's the user's focus? What's the most important contribution?")
+
+class HFModels(BaseModel):
+    models: list[ModelReference]
+
+class HFDatasets(BaseModel):
+    datasets: list[DatasetReference]
+
+class HFPapers(BaseModel):
+    papers: list[Reference]
+
+class HFWriting(BaseModel):
+    posts: list[Reference]
+    articles: list[Reference]
+    collections: list[Reference]
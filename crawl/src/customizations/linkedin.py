@@ -30,9 +30,9 @@ class Linkedin(BaseCustomization):
         """)
 
     @staticmethod
-    def controller() -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
         return Controller(
-            output_model=LinkedinResult
+            output_model=output_model or LinkedinResult
         )
 
     @staticmethod
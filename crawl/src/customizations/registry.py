@@ -0,0 +1,66 @@
+import importlib
+from fnmatch import fnmatch
+from importlib.metadata import entry_points
+from urllib.parse import urlparse
+
+from loguru import logger
+
+# Third-party customizations: the entry point name is a comma-separated list of
+# domain patterns, the value the class, e.g. in pyproject.toml:
+#   [project.entry-points."askthebio.customizations"]
+#   "gitea.com,*.gitea.io" = "mypackage.gitea:Gitea"
+ENTRY_POINT_GROUP = "askthebio.customizations"
+
+
+class CustomizationSpec():
+    def __init__(self, name: str, patterns: list[str], target: str, origin: str = "builtin") -> None:
+        self.name = name
+        self.patterns = patterns
+        self.target = target  # "module:Class", imported on first use
+        self.origin = origin
+
+    def matches(self, netloc: str) -> bool:
+        return any(fnmatch(netloc, p) for p in self.patterns)
+
+    def load(self) -> type:
+        module, _, attr = self.target.partition(":")
+        return getattr(importlib.import_module(module), attr)
+
+
+class CustomizationRegistry():
+    """Maps link domains to customization classes without importing them.
+
+    A class (and browser-use with it) is only imported when a link resolves
+    to it. Entry points are consulted before the built-ins, so they can
+    override them; links matching nothing use the fallback.
+    """
+
+    def __init__(self, fallback: CustomizationSpec) -> None:
+        self.fallback = fallback
+        self.specs: list[CustomizationSpec] = []
+        self._entry_points_loaded = False
+
+    def register(self, name: str, patterns: list[str], target: str, origin: str = "builtin") -> None:
+        self.specs.append(CustomizationSpec(name, patterns, target, origin))
+
+    def load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        plugins = []
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            patterns = [p.strip() for p in ep.name.split(",") if p.strip()]
+            plugins.append(CustomizationSpec(ep.value.rpartition(":")[2].lower(), patterns, ep.value, origin=ep.dist.name if ep.dist else "entry point"))
+            logger.debug(f"Customization {ep.value} registered for {patterns}")
+        self.specs = plugins + self.specs
+
+    def resolve(self, url: str) -> CustomizationSpec:
+        self.load_entry_points()
+        netloc = urlparse(url).netloc.lower().removeprefix("www.")
+        return next((s for s in self.specs if s.matches(netloc)), self.fallback)
+
+    def create(self, link, out_path: str = "out"):
+        spec = self.resolve(link.url)
+        cls = spec.load()
+        logger.info(f"Processing {link.url} as {cls.__name__}")
+        return cls(link=link, out_path=out_path)
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 from browser_use import Controller
 
 from .base_customization import BaseCustomization
+from ..manifest import fingerprint_page, fingerprint_sitemap
 
 
 class Website(BaseCustomization):
@@ -15,11 +16,14 @@ class Website(BaseCustomization):
         **kwargs
     ) -> None:
         super().__init__(name=name, *args, **kwargs)
+        self._extractor = None
 
     def prompt(self, fullname) -> str:
         additional = ""
         if self.link.description:
             additional = f"The website is tagged as '{self.link.description}'"
+        # Pages the static pre-crawl could already read, and those left to the browser
+        static = self._extractor.agent_context() if self._extractor is not None else ""
 
         return inspect.cleandoc(f"""
             I'm gathering all personal information from {fullname} to build a comprehensive profile. I'm equally interested in factual knowledge about {fullname} and in getting to know {fullname} as a person.
@@ -31,18 +35,28 @@ class Website(BaseCustomization):
             Do not write in the final result object any consideration about the extraction; only put information about {fullname}.
 
             Be thorough, truthful and factual.
-        """)
+        """) + (f"\n\n{static}" if static else "")
 
     @staticmethod
-    def controller() -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
         return Controller(
-            output_model=WebsiteResult
+            output_model=output_model or WebsiteResult
         )
 
+    def extractor(self):
+        # HTTP-first: the browser only runs for pages that need JavaScript
+        if self._extractor is None:
+            from ..extractors import WebsiteExtractor
+            self._extractor = WebsiteExtractor()
+        return self._extractor
+
     @staticmethod
     def result_class() -> Type[BaseModel]:
         return WebsiteResult
 
+    async def fingerprint(self) -> str|None:
+        return await fingerprint_sitemap(self.link.url) or await fingerprint_page(self.link.url)
+
 
 # Result classes
 class PageChunk(BaseModel):
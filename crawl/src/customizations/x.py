@@ -31,9 +31,9 @@ class X(BaseCustomization):
         """)
 
     @staticmethod
-    def controller() -> Controller:
+    def controller(output_model: Type[BaseModel]|None = None) -> Controller:
         return Controller(
-            output_model=XResult
+            output_model=output_model or XResult
         )
 
     @staticmethod
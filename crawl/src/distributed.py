@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import functools
+import contextlib
+from datetime import timedelta
+from typing import Callable
+
+from browser_use.llm import BaseChatModel
+
+from src.models import UserInput
+from src.crawl import UserCrawl, customization_for, make_llm, make_pool
+from src.customizations.base_customization import BaseCustomization
+from src.http_client import close_http_client
+from src.scheduler import DurationHistory
+from src.documents import DocumentIngestor
+from src.context import DEFAULT_BUDGET
+from src.budgets import Deadline, StepHistory
+from src.serializers import DEFAULT_FORMAT
+from src.tracing import Tracer, set_tracer, span
+from src.proxy import CachingProxy
+from src.llm_cache import LLMCache
+from src.work_queue import Job, JobQueue
+
+from loguru import logger
+
+
+class Worker():
+    """Leases source jobs from a JobQueue and crawls them on its own browser pool.
+
+    Any number of workers, on this host or others sharing the queue file, can
+    run at once: each pool takes free debug ports and its own profile dir.
+    Results go back to the queue, only the coordinator writes the outputs.
+    """
+
+    def __init__(
+        self,
+        queue_path: str,
+        concurrency: int = 2,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 2.0,
+        exit_when_idle: bool = False,
+        verbose: bool = False,
+        source_timeout: float|None = None,
+        slim_schemas: bool = False,
+        llm_factory: Callable[[], BaseChatModel] = make_llm,
+        proxy: CachingProxy|None = None,
+        deadline: Deadline|None = None,
+    ) -> None:
+        self.queue = JobQueue(queue_path)
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.exit_when_idle = exit_when_idle
+        self.verbose = verbose
+        self.source_timeout = source_timeout
+        self.slim_schemas = slim_schemas
+        self.llm_factory = llm_factory
+        self.proxy = proxy
+        # Sources leased after it are given up at once, as in a local crawl
+        self.deadline = deadline or Deadline()
+        self.id = f"{socket.gethostname()}-{os.getpid()}"
+        self.step_histories: dict[str, StepHistory] = {}   # by out_path, shared by that path's users
+        self._crawls: dict[tuple[str, str], UserCrawl] = {}
+
+    async def run(self) -> None:
+        pool = make_pool(self.concurrency, base_port=None, tmp_root=f"/tmp/askthebio-profiles/{self.id}")
+        if self.proxy is not None:
+            pool.extra_args += self.proxy.chrome_args
+        logger.info(f"Worker {self.id} started with {self.concurrency} browsers.")
+        try:
+            await asyncio.gather(*(self._loop(pool) for _ in range(self.concurrency)))
+        finally:
+            await pool.close()
+            await close_http_client()
+            self.queue.close()
+
+    async def _loop(self, pool) -> None:
+        while True:
+            job = await asyncio.to_thread(self.queue.lease, self.id, self.lease_seconds)
+            if job is not None:
+                await self.run_job(job, pool)
+                continue
+            if self.exit_when_idle:
+                counts = await asyncio.to_thread(self.queue.counts)
+                if not counts["pending"] and not counts["leased"]:
+                    return
+            await asyncio.sleep(self.poll_interval)
+
+    async def run_job(self, job: Job, pool) -> None:
+        crawl = self._crawl_for(job)
+        builder = customization_for(job.user.links[job.link], crawl.user_path)
+        logger.info(f"Worker {self.id}: {builder.link.url} (job {job.id}, attempt {job.attempts}).")
+        task = asyncio.create_task(crawl.crawl_source(builder, pool))
+        # Renew the lease while the source runs; give up if another worker got it
+        while not task.done():
+            await asyncio.wait({task}, timeout=self.lease_seconds / 3)
+            if not task.done() and not await asyncio.to_thread(self.queue.heartbeat, job.id, self.id, self.lease_seconds):
+                logger.warning(f"Worker {self.id} lost the lease of job {job.id}, dropping it.")
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                return
+        try:
+            parsed_j, error = task.result()
+        except Exception as e:
+            # The job fails, not the worker's other loops
+            logger.exception(f"Worker {self.id}: job {job.id} ({builder.link.url}) crashed")
+            parsed_j, error = None, repr(e)
+        await asyncio.to_thread(self.queue.complete, job.id, self.id, parsed_j, error)
+
+    def _crawl_for(self, job: Job) -> UserCrawl:
+        # One UserCrawl per user, only for run_source() and its settings: nothing is written through it
+        key = (job.out_path, job.user.name)
+        if key not in self._crawls:
+            if job.out_path not in self.step_histories:
+                self.step_histories[job.out_path] = StepHistory(os.path.join(job.out_path, ".step_history.json"))
+            self._crawls[key] = UserCrawl(
+                job.user, job.out_path, verbose=self.verbose, llm_factory=self.llm_factory,
+                step_history=self.step_histories[job.out_path], deadline=self.deadline, source_timeout=self.source_timeout,
+                slim_schemas=self.slim_schemas,
+            )
+        return self._crawls[key]
+
+
+class Coordinator():
+    """Enqueues the sources of many users and writes each user's outputs from the results.
+
+    `prepare()` drops the reusable sources as in a local crawl; the others
+    become jobs, longest expected first. Documents are converted here.
+
+    Local workers get what is left of the deadline; sources still without a
+    result `deadline_grace` seconds after it (e.g. on workers started
+    elsewhere, which don't know it) are recorded as failed.
+    """
+
+    def __init__(self, queue_path: str, out_path: str = "out", poll_interval: float = 1.0, deadline_grace: float = 30.0) -> None:
+        self.queue = JobQueue(queue_path)
+        self.out_path = out_path
+        self.poll_interval = poll_interval
+        self.deadline_grace = deadline_grace
+
+    async def run(
+        self,
+        users: list[UserInput],
+        force_refresh: bool = False,
+        max_age: timedelta|None = None,
+        resume: bool = False,
+        context_budget: int = DEFAULT_BUDGET,
+        output_format: str = DEFAULT_FORMAT,
+        workers: int = 0,
+        worker_args: list[str]|None = None,
+        deadline_seconds: float|None = None,
+    ) -> None:
+        deadline = Deadline(deadline_seconds)
+        crawls = [
+            UserCrawl(user, self.out_path, context_budget=context_budget, output_format=output_format, deadline=deadline)
+            for user in users
+        ]
+        await asyncio.gather(*(c.prepare(force_refresh=force_refresh, max_age=max_age, resume=resume) for c in crawls))
+
+        history = DurationHistory(os.path.join(self.out_path, ".durations.json"))
+        jobs: dict[int, tuple[UserCrawl, BaseCustomization]] = {}
+        for crawl in crawls:
+            for builder in crawl.builders:
+                job_id = self.queue.enqueue(
+                    crawl.user, crawl.user.links.index(builder.link), self.out_path, priority=history.estimate(builder)
+                )
+                jobs[job_id] = (crawl, builder)
+        remaining = {c: sum(1 for crawl, _ in jobs.values() if crawl is c) + (1 if c.user.docs else 0) for c in crawls}
+        logger.info(f"Coordinator: {len(crawls)} users, {len(jobs)} sources queued in {self.queue.path}.")
+
+        def done(crawl: UserCrawl):
+            remaining[crawl] -= 1
+            if remaining[crawl] == 0:
+                crawl.finish()
+                logger.info(f"Finished {crawl.user.name} ({sum(remaining.values())} sources left).")
+
+        for crawl in crawls:
+            if not remaining[crawl]:
+                crawl.finish()
+
+        async def run_docs(crawl: UserCrawl):
+            try:
+                await asyncio.wait_for(crawl.ingest_docs(ingestor), deadline.remaining())
+            except asyncio.TimeoutError:
+                logger.warning(f"Deadline reached before all documents of {crawl.user.name} were converted.")
+            done(crawl)
+
+        ingestor = DocumentIngestor(os.path.join(self.out_path, ".doc_cache"))
+        worker_args = list(worker_args or [])
+        if (left := deadline.remaining()) is not None:
+            worker_args += ["--deadline", f"{left:.1f}"]
+        processes = [await spawn_worker(self.queue.path, worker_args) for _ in range(workers)]
+        docs = [asyncio.create_task(run_docs(c)) for c in crawls if c.user.docs]
+        try:
+            with span("coordinator", users=len(crawls), sources=len(jobs), workers=workers):
+                pending = set(jobs)
+                while pending:
+                    for job in await asyncio.to_thread(self.queue.collect, list(pending)):
+                        pending.discard(job.id)
+                        crawl, builder = jobs[job.id]
+                        crawl.finish_source(builder, job.result, job.error)
+                        done(crawl)
+                    if pending and deadline.at is not None and time.monotonic() > deadline.at + self.deadline_grace:
+                        logger.warning(f"Deadline passed, {len(pending)} sources without a result from the workers.")
+                        for job_id in pending:
+                            crawl, builder = jobs[job_id]
+                            crawl.finish_source(builder, None, "deadline: no result from the workers")
+                            done(crawl)
+                        pending = set()
+                    if pending:
+                        if processes and all(p.returncode is not None for p in processes):
+                            logger.warning(f"All local workers exited, {len(pending)} sources left for other workers.")
+                            processes = []
+                        await asyncio.sleep(self.poll_interval)
+                await asyncio.gather(*docs)
+        finally:
+            for task in docs:
+                task.cancel()
+            ingestor.close()
+            for process in processes:
+                if process.returncode is None:
+                    process.terminate()
+            await asyncio.gather(*(p.wait() for p in processes))
+            self.queue.close()
+
+
+async def spawn_worker(queue_path: str, args: list[str]) -> asyncio.subprocess.Process:
+    # A local worker process that exits once the queue is drained
+    return await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "src.distributed", "--queue", queue_path, "--exit-when-idle", *args,
+    )
+
+
+async def main(args) -> None:
+    if args.trace:
+        set_tracer(Tracer(args.trace))
+    proxy = None
+    if args.proxy:
+        proxy = CachingProxy(args.proxy_archive, mode=args.proxy)
+        await proxy.start()
+    llm_cache = None
+    if args.llm_cache:
+        llm_cache = LLMCache(args.llm_cache_path, mode=args.llm_cache, max_bytes=args.llm_cache_max_mb * 2**20)
+    try:
+        worker = Worker(
+            args.queue,
+            concurrency=args.concurrency,
+            lease_seconds=args.lease_seconds,
+            exit_when_idle=args.exit_when_idle,
+            verbose=args.verbose,
+            source_timeout=args.source_timeout,
+            slim_schemas=args.slim_schemas,
+            llm_factory=functools.partial(make_llm, llm_cache),
+            proxy=proxy,
+            deadline=Deadline(args.deadline),
+        )
+        await worker.run()
+    finally:
+        if proxy is not None:
+            await proxy.close()
+        if llm_cache is not None:
+            llm_cache.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Crawl worker: leases sources from a shared queue (see main.py --workers).")
+    parser.add_argument("--queue", default="out/.queue.sqlite", help="queue file, shared with the coordinator")
+    parser.add_argument("--concurrency", type=int, default=2, help="browsers of this worker")
+    parser.add_argument("--lease-seconds", type=float, default=120.0, help="lease renewed while a source runs")
+    parser.add_argument("--exit-when-idle", action="store_true", help="exit once nothing is pending or leased")
+    parser.add_argument("--verbose", action="store_true", help="save agent histories")
+    parser.add_argument("--source-timeout", type=float, default=None, help="max seconds per source")
+    parser.add_argument("--slim-schemas", action="store_true", help="compact `done` schema while navigating")
+    parser.add_argument("--deadline", type=float, default=None, help="seconds after which leased sources are given up, keeping partial results")
+    parser.add_argument("--proxy", choices=["cache", "record", "replay"], default=None, help="route the browsers through a local caching proxy")
+    parser.add_argument("--proxy-archive", default="out/.proxy_archive.sqlite", help="on-disk archive of the caching proxy")
+    parser.add_argument("--llm-cache", choices=["cache", "record", "replay"], default=None, help="serve repeated LLM requests from an on-disk cache")
+    parser.add_argument("--llm-cache-path", default="out/.llm_cache.sqlite", help="on-disk store of the LLM cache")
+    parser.add_argument("--llm-cache-max-mb", type=int, default=512, help="evict least recently used LLM responses above this size")
+    parser.add_argument("--trace", default=None, help="append timing/token spans to this JSONL file")
+    asyncio.run(main(parser.parse_args()))
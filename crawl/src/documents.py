@@ -0,0 +1,94 @@
+import os
+import io
+import asyncio
+import hashlib
+import mimetypes
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+from src.models import Doc
+from src.http_client import get_http_client
+from src.tracing import span
+
+# One converter per worker process: building it loads the layout models
+_converter = None
+
+
+def convert_to_markdown(name: str, data: bytes) -> str:
+    # Runs in a worker process; docling is imported there only
+    global _converter
+    from docling.datamodel.base_models import DocumentStream
+    from docling.document_converter import DocumentConverter
+
+    if _converter is None:
+        _converter = DocumentConverter()
+    result = _converter.convert(DocumentStream(name=name, stream=io.BytesIO(data)))
+    return result.document.export_to_markdown()
+
+
+class DocumentIngestor():
+    """Convert `UserInput.docs` to markdown with docling in a process pool.
+
+    Conversions are cached on disk by content hash, so an unchanged document
+    is never converted twice. `Doc.ref` is a local path or an http(s) URL.
+    """
+
+    def __init__(self, cache_dir: str = "out/.doc_cache", max_workers: int|None = None) -> None:
+        self.cache_dir = cache_dir
+        # Leave half of the cores to the browsers
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self._executor: ProcessPoolExecutor|None = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    async def to_markdown(self, doc: Doc) -> str:
+        with span("doc.ingest", ref=doc.ref) as s:
+            name, data = await self._read(doc.ref)
+            key = hashlib.sha256(data).hexdigest()
+            path = os.path.join(self.cache_dir, f"{key}.md")
+            if os.path.exists(path):
+                s.set(cached=True)
+                with open(path, "r") as f:
+                    return f.read()
+
+            s.set(cached=False, bytes=len(data))
+            loop = asyncio.get_running_loop()
+            markdown = await loop.run_in_executor(self._pool(), convert_to_markdown, name, data)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(markdown)
+            os.replace(tmp, path)
+            return markdown
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Started on first use; spawn, as forking a process with a running event loop is unsafe
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    @staticmethod
+    async def _read(ref: str) -> tuple[str, bytes]:
+        if urlparse(ref).scheme in ("http", "https"):
+            resp = await get_http_client().get(ref)
+            resp.raise_for_status()
+            return _url_name(ref, resp.headers.get("content-type", "")), resp.content
+        path = os.path.expanduser(ref)
+        return os.path.basename(path), await asyncio.to_thread(_read_file, path)
+
+
+def _url_name(url: str, content_type: str) -> str:
+    # docling detects the format from the extension: take it from the Content-Type when the URL has none
+    name = os.path.basename(urlparse(url).path) or "document"
+    if not os.path.splitext(name)[1]:
+        name += mimetypes.guess_extension(content_type.split(";")[0].strip().lower()) or ""
+    return name
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,4 @@
+from .base import BaseExtractor, ExtractorError
+from .github import GitHubExtractor
+from .huggingface import HuggingFaceExtractor
+from .website import WebsiteExtractor
@@ -0,0 +1,121 @@
+from typing import Type
+from urllib.parse import urlparse
+
+import httpx
+from pydantic import BaseModel, ValidationError
+from browser_use.llm import BaseChatModel, SystemMessage, UserMessage
+from browser_use.llm.exceptions import ModelError
+
+from src.http_client import HttpClient, get_http_client
+
+from loguru import logger
+
+
+class ExtractorError(RuntimeError):
+    pass
+
+
+class BaseExtractor():
+    """Fill a customization's result model from public JSON APIs.
+
+    `fetch()` gathers the factual fields over plain HTTP, `summarize()` asks the
+    LLM (once) only for the free-text summary fields. Any failure returns None so
+    the caller can fall back to the browser agent.
+    """
+
+    def __init__(
+        self,
+        api_base: str,
+        web_base: str,
+        client: HttpClient|None = None,
+        headers: dict[str, str]|None = None,
+    ) -> None:
+        self.api_base = api_base.rstrip("/")
+        self.web_base = web_base.rstrip("/")
+        self.client = client or get_http_client()
+        self.headers = headers or {}
+
+    async def extract(self, url: str, fullname: str, llm: BaseChatModel) -> BaseModel|None:
+        try:
+            data = await self.fetch(url)
+            summaries = await self.summarize(data, fullname, llm)
+            return self.build(data, summaries)
+        # ValueError / KeyError / IndexError / TypeError / AttributeError: non-JSON bodies, payloads not shaped
+        # as expected (a list or null where an object was, a missing key)
+        except (
+            ExtractorError, httpx.HTTPError, ValidationError, ModelError,
+            ValueError, KeyError, IndexError, TypeError, AttributeError,
+        ) as e:
+            logger.info(f"API extraction failed for {url}, falling back to browser agent: {e}")
+            return None
+
+    async def fingerprint(self, url: str) -> str|None:
+        try:
+            return await self.fetch_fingerprint(url)
+        except (ExtractorError, httpx.HTTPError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            return None
+
+    def missing(self, result: BaseModel) -> set[str]:
+        # Fields of `result` the API doesn't provide: a fan-out customization's sub-tasks covering them fill them in
+        return set()
+
+    async def complete(self, result: BaseModel|None, fullname: str, llm: BaseChatModel) -> BaseModel|None:
+        # The browser agent's result after extract() failed over: extractors that got part of the data fold it in
+        return result
+
+    async def fetch_fingerprint(self, url: str) -> str:
+        raise NotImplementedError
+
+    async def fetch(self, url: str) -> dict:
+        raise NotImplementedError
+
+    async def summarize(self, data: dict, fullname: str, llm: BaseChatModel) -> BaseModel:
+        raise NotImplementedError
+
+    def build(self, data: dict, summaries: BaseModel) -> BaseModel:
+        raise NotImplementedError
+
+    # ---------------------------------
+    # Helpers
+    # ---------------------------------
+    @staticmethod
+    def username_from_url(url: str) -> str:
+        parts = [p for p in urlparse(url).path.split("/") if p]
+        if len(parts) != 1:
+            raise ExtractorError(f"{url} is not a profile URL")
+        return parts[0]
+
+    async def get_json(self, url: str, params: dict|None = None):
+        resp = await self.client.get(url, params=params, headers=self.headers)
+        if resp.status_code == 404:
+            raise ExtractorError(f"Not found: {url}")
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_json_or(self, url: str, default, params: dict|None = None):
+        # Best effort variant of get_json() for optional data
+        try:
+            return await self.get_json(url, params)
+        except (ExtractorError, httpx.HTTPError, ValueError):
+            return default
+
+    async def get_text(self, url: str, headers: dict[str, str]|None = None, max_chars: int = 4000) -> str:
+        # Best effort: missing READMEs etc. are just empty
+        try:
+            resp = await self.client.get(url, headers={**self.headers, **(headers or {})})
+        except httpx.HTTPError:
+            return ""
+        if resp.status_code != 200:
+            return ""
+        return resp.text[:max_chars]
+
+    @staticmethod
+    async def ask(llm: BaseChatModel, prompt: str, output_format: Type[BaseModel]) -> BaseModel:
+        response = await llm.ainvoke(
+            [
+                SystemMessage(content="You summarize public profile data. Be truthful and factual; only use the data you are given."),
+                UserMessage(content=prompt),
+            ],
+            output_format=output_format,
+        )
+        return response.completion
@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import asyncio
+
+from pydantic import BaseModel
+from browser_use.llm import BaseChatModel
+
+from src.customizations.code_repo import CodeRepoResult
+from src.manifest import digest
+from .base import BaseExtractor, ExtractorError
+
+
+class RepoSummary(BaseModel):
+    name: str
+    readme_summary: str
+    code_overview: str
+
+class GitHubSummaries(BaseModel):
+    repositories: list[RepoSummary]
+    profile_summary: str
+
+
+class GitHubExtractor(BaseExtractor):
+    def __init__(
+        self,
+        api_base: str = "https://api.github.com",
+        web_base: str = "https://github.com",
+        n_detailed: int = 8,
+        *args,
+        **kwargs
+    ) -> None:
+        super().__init__(api_base=api_base, web_base=web_base, *args, **kwargs)
+        self.n_detailed = n_detailed
+        self.headers.setdefault("Accept", "application/vnd.github+json")
+        if os.environ.get("GITHUB_TOKEN"):
+            self.headers.setdefault("Authorization", f"Bearer {os.environ['GITHUB_TOKEN']}")
+
+    async def fetch_fingerprint(self, url: str) -> str:
+        username = self.username_from_url(url)
+        user, last_pushed = await asyncio.gather(
+            self.get_json(f"{self.api_base}/users/{username}"),
+            self.get_json(f"{self.api_base}/users/{username}/repos", {"per_page": 1, "type": "owner", "sort": "pushed"}),
+        )
+        return digest(
+            "github",
+            {k: user.get(k) for k in ("updated_at", "public_repos", "followers", "bio")},
+            [r.get("pushed_at") for r in last_pushed],
+        )
+
+    async def fetch(self, url: str) -> dict:
+        username = self.username_from_url(url)
+        user, repos, starred, socials, contributions = await asyncio.gather(
+            self.get_json(f"{self.api_base}/users/{username}"),
+            self.get_json(f"{self.api_base}/users/{username}/repos", {"per_page": 100, "type": "owner", "sort": "pushed"}),
+            self.get_json(f"{self.api_base}/users/{username}/starred", {"per_page": 30}),
+            self.get_json_or(f"{self.api_base}/users/{username}/social_accounts", []),
+            self._contributions(username),
+        )
+        if user.get("type") != "User":
+            raise ExtractorError(f"{username} is not a user account")
+
+        # Detailed repos: the most starred and the most recently pushed
+        own = [r for r in repos if not r.get("fork") and not r.get("private")]
+        by_stars = sorted(own, key=lambda r: r.get("stargazers_count", 0), reverse=True)
+        by_push = sorted(own, key=lambda r: r.get("pushed_at") or "", reverse=True)
+        detailed = []
+        for r in [x for pair in zip(by_stars, by_push) for x in pair]:
+            if r not in detailed:
+                detailed.append(r)
+            if len(detailed) == self.n_detailed:
+                break
+        details = await asyncio.gather(*(self._repo_details(r) for r in detailed))
+
+        return {
+            "user": user,
+            "detailed": details,
+            "basic": [r for r in repos if r not in detailed and not r.get("private")],
+            "starred": starred,
+            "socials": socials,
+            "contributions": contributions,
+        }
+
+    async def summarize(self, data: dict, fullname: str, llm: BaseChatModel) -> GitHubSummaries:
+        repos = [
+            {
+                "name": d["repo"]["name"],
+                "description": d["repo"].get("description") or "",
+                "languages": d["languages"],
+                "readme": d["readme"],
+            }
+            for d in data["detailed"]
+        ]
+        profile = {k: data["user"].get(k) for k in ("login", "name", "bio", "company", "location", "public_repos", "followers")}
+        prompt = (
+            f"Here is public GitHub data about {fullname}.\n\n"
+            f"Profile:\n{json.dumps(profile)}\n\n"
+            f"Repositories with their README:\n{json.dumps(repos)}\n\n"
+            "For each repository, write a short readme_summary and a code_overview (what it does, how it is built). "
+            f"Then write a profile_summary describing what and how {fullname} codes."
+        )
+        return await self.ask(llm, prompt, GitHubSummaries)
+
+    def build(self, data: dict, summaries: GitHubSummaries) -> CodeRepoResult:
+        user = data["user"]
+        by_name = {s.name: s for s in summaries.repositories}
+        socials = [s["url"] for s in data["socials"]]
+        if user.get("blog"):
+            socials.insert(0, user["blog"])
+        if user.get("twitter_username"):
+            socials.append(f"https://x.com/{user['twitter_username']}")
+
+        repositories_detailed = []
+        for d in data["detailed"]:
+            r = d["repo"]
+            summary = by_name.get(r["name"])
+            repositories_detailed.append({
+                "name": r["name"],
+                "description": r.get("description") or "",
+                "stars": r.get("stargazers_count", 0),
+                "languages": d["languages"],
+                "readme_summary": summary.readme_summary if summary else "",
+                "code_overview": summary.code_overview if summary else "",
+                "last_update": r.get("pushed_at") or r.get("updated_at") or "",
+                "license": (r.get("license") or {}).get("spdx_id") or "",
+                "last_commit": d["last_commit"],
+                "other": ", ".join(filter(None, [
+                    f"topics: {', '.join(r['topics'])}" if r.get("topics") else "",
+                    f"forks: {r['forks_count']}" if r.get("forks_count") else "",
+                    r.get("homepage") or "",
+                ])),
+            })
+
+        return CodeRepoResult.model_validate({
+            "username": user["login"],
+            "company": user.get("company") or "",
+            "location": user.get("location") or "",
+            "personal_bio": user.get("bio") or "",
+            "email": user.get("email") or "",
+            "socials": ", ".join(socials),
+            "achievements": "",
+            "contributions_last_year": data["contributions"],
+            "repositories_detailed": repositories_detailed,
+            "repositories_basic": [
+                {"name": r["name"], "author": r["owner"]["login"], "short_summary": r.get("description") or ""}
+                for r in data["basic"]
+            ],
+            "other_people_starred_repos": [
+                {"name": r["name"], "author": r["owner"]["login"], "short_summary": r.get("description") or ""}
+                for r in data["starred"] if r["owner"]["login"] != user["login"]
+            ],
+            "sponsoring_projects_or_users": [],
+            "profile_summary": summaries.profile_summary,
+        })
+
+    async def _repo_details(self, repo: dict) -> dict:
+        full_name = repo["full_name"]
+        languages, readme, commits = await asyncio.gather(
+            self.get_json(f"{self.api_base}/repos/{full_name}/languages"),
+            self.get_text(f"{self.api_base}/repos/{full_name}/readme", headers={"Accept": "application/vnd.github.raw"}),
+            self.get_json_or(f"{self.api_base}/repos/{full_name}/commits", [], {"per_page": 1}),
+        )
+        last_commit = ""
+        if commits:
+            c = commits[0]["commit"]
+            last_commit = f"{c['author']['date']}: {c['message'].splitlines()[0]}"
+        return {"repo": repo, "languages": list(languages), "readme": readme, "last_commit": last_commit}
+
+    async def _contributions(self, username: str) -> int:
+        html = await self.get_text(f"{self.web_base}/users/{username}/contributions", max_chars=200_000)
+        match = re.search(r"([\d,]+)\s+contributions?\s+in the last year", html)
+        return int(match.group(1).replace(",", "")) if match else 0
@@ -0,0 +1,176 @@
+import json
+import asyncio
+
+from pydantic import BaseModel
+from browser_use.llm import BaseChatModel
+
+from src.customizations.huggingface import HFResult
+from src.manifest import digest
+from .base import BaseExtractor, ExtractorError
+
+
+class NamedSummary(BaseModel):
+    name: str
+    summary: str
+
+class HFSummaries(BaseModel):
+    models: list[NamedSummary]
+    datasets: list[NamedSummary]
+    summary: str
+
+
+class HuggingFaceExtractor(BaseExtractor):
+    # Posts, articles and papers are not in the public API: when the profile has some, the agent gets them
+    AGENT_FIELDS = {"posts": "n_posts", "articles": "n_articles", "papers": "n_papers"}
+
+    def __init__(
+        self,
+        api_base: str = "https://huggingface.co/api",
+        web_base: str = "https://huggingface.co",
+        n_per_category: int = 3,
+        *args,
+        **kwargs
+    ) -> None:
+        super().__init__(api_base=api_base, web_base=web_base, *args, **kwargs)
+        self.n_per_category = n_per_category
+
+    async def fetch_fingerprint(self, url: str) -> str:
+        username = self.username_from_url(url)
+        overview, last_models, last_datasets = await asyncio.gather(
+            self.get_json(f"{self.api_base}/users/{username}/overview"),
+            self.get_json(f"{self.api_base}/models", {"author": username, "sort": "lastModified", "direction": -1, "limit": 1}),
+            self.get_json(f"{self.api_base}/datasets", {"author": username, "sort": "lastModified", "direction": -1, "limit": 1}),
+        )
+        return digest(
+            "huggingface",
+            {k: v for k, v in overview.items() if k.startswith("num") or k in ("details", "orgs")},
+            [(m["id"], m.get("lastModified")) for m in last_models + last_datasets],
+        )
+
+    async def fetch(self, url: str) -> dict:
+        username = self.username_from_url(url)
+        overview = await self.get_json(f"{self.api_base}/users/{username}/overview")
+        if overview.get("type", "user") != "user":
+            raise ExtractorError(f"{username} is not a user account")
+
+        models, datasets, collections = await asyncio.gather(
+            self._most_recent_and_downloaded("models", username),
+            self._most_recent_and_downloaded("datasets", username),
+            self.get_json_or(f"{self.api_base}/collections", [], {"owner": username, "limit": 10}),
+        )
+        model_cards, dataset_cards = await asyncio.gather(
+            asyncio.gather(*(self.get_text(f"{self.web_base}/{m['id']}/raw/main/README.md") for m in models)),
+            asyncio.gather(*(self.get_text(f"{self.web_base}/datasets/{d['id']}/raw/main/README.md") for d in datasets)),
+        )
+        return {
+            "username": username,
+            "overview": overview,
+            "models": list(zip(models, model_cards)),
+            "datasets": list(zip(datasets, dataset_cards)),
+            "collections": collections,
+        }
+
+    async def summarize(self, data: dict, fullname: str, llm: BaseChatModel) -> HFSummaries:
+        ov = data["overview"]
+        profile = {k: ov.get(k) for k in ("fullname", "user", "details", "numModels", "numDatasets", "numSpaces", "numPapers", "numFollowers")}
+        prompt = (
+            f"Here is public Hugging Face data about {fullname}.\n\n"
+            f"Profile:\n{json.dumps(profile)}\n\n"
+            f"Models with their model card:\n{json.dumps([{'name': m['id'], 'card': card} for m, card in data['models']])}\n\n"
+            f"Datasets with their dataset card:\n{json.dumps([{'name': d['id'], 'card': card} for d, card in data['datasets']])}\n\n"
+            f"Collections:\n{json.dumps([{'title': c.get('title'), 'description': c.get('description')} for c in data['collections']])}\n\n"
+            "Write a short summary for each model and each dataset. "
+            f"Then write an overall summary of the profile: is {fullname} active? What's the focus? What's the most important contribution?"
+        )
+        return await self.ask(llm, prompt, HFSummaries)
+
+    def build(self, data: dict, summaries: HFSummaries) -> HFResult:
+        ov = data["overview"]
+        model_summaries = {s.name: s.summary for s in summaries.models}
+        dataset_summaries = {s.name: s.summary for s in summaries.datasets}
+
+        return HFResult.model_validate({
+            "name": ov.get("fullname") or data["username"],
+            "username": data["username"],
+            "url": f"{self.web_base}/{data['username']}",
+            "ai_ml_interests": ov.get("details") or "",
+            "recent_activity": _recent_activity(data, model_summaries | dataset_summaries, self.n_per_category),
+            "organizations": [o.get("fullname") or o.get("name", "") for o in ov.get("orgs", [])],
+            "stats": {
+                "followers": ov.get("numFollowers", 0),
+                "following": ov.get("numFollowing", 0),
+                "n_posts": ov.get("numPosts", 0),
+                "n_articles": ov.get("numArticles", 0),
+                "n_collections": ov.get("numCollections", len(data["collections"])),
+                "n_papers": ov.get("numPapers", 0),
+                "n_models": ov.get("numModels", 0),
+                "n_datasets": ov.get("numDatasets", 0),
+            },
+            "posts": [],
+            "articles": [],
+            "collections": [
+                {
+                    "name": c.get("title", ""),
+                    "url": f"{self.web_base}/collections/{c['slug']}",
+                    "summary": c.get("description") or "",
+                }
+                for c in data["collections"]
+            ],
+            "papers": [],
+            "models": [
+                {
+                    "name": m["id"],
+                    "tag": m.get("pipeline_tag") or "",
+                    "size": _param_count(m),
+                    "updated_date": m.get("lastModified") or m.get("createdAt") or "",
+                    "downloads": m.get("downloads", 0),
+                    "hearts": m.get("likes", 0),
+                    "summary": model_summaries.get(m["id"], ""),
+                }
+                for m, _ in data["models"]
+            ],
+            "datasets": [
+                {
+                    "name": d["id"],
+                    "updated_date": d.get("lastModified") or d.get("createdAt") or "",
+                    "size": next((t.split(":", 1)[1] for t in d.get("tags", []) if t.startswith("size_categories:")), ""),
+                    "downloads": d.get("downloads", 0),
+                    "hearts": d.get("likes", 0),
+                    "summary": dataset_summaries.get(d["id"], ""),
+                }
+                for d, _ in data["datasets"]
+            ],
+            "summary": summaries.summary,
+        })
+
+    def missing(self, result: HFResult) -> set[str]:
+        return {field for field, count in self.AGENT_FIELDS.items() if getattr(result.stats, count)}
+
+    async def _most_recent_and_downloaded(self, kind: str, username: str) -> list[dict]:
+        recent, popular = await asyncio.gather(
+            self.get_json(f"{self.api_base}/{kind}", {"author": username, "sort": "lastModified", "direction": -1, "limit": self.n_per_category}),
+            self.get_json(f"{self.api_base}/{kind}", {"author": username, "sort": "downloads", "direction": -1, "limit": self.n_per_category}),
+        )
+        seen, items = set(), []
+        for item in recent + popular:
+            if item["id"] not in seen:
+                seen.add(item["id"])
+                items.append(item)
+        return items
+
+
+def _recent_activity(data: dict, summaries: dict[str, str], n: int) -> list[dict]:
+    # The last updated models and datasets: what the API shows of the profile's activity feed
+    items = [("model", m) for m, _ in data["models"]] + [("dataset", d) for d, _ in data["datasets"]]
+    items = sorted((i for i in items if i[1].get("lastModified")), key=lambda i: i[1]["lastModified"], reverse=True)
+    return [
+        {"name": f"Updated {kind} {item['id']}", "date": item["lastModified"], "content_short_summary": summaries.get(item["id"], "")}
+        for kind, item in items[:n]
+    ]
+
+
+def _param_count(model: dict) -> str:
+    total = (model.get("safetensors") or {}).get("total")
+    if not total:
+        return ""
+    return f"{total / 1e9:.1f}B" if total >= 1e9 else f"{total / 1e6:.0f}M"
@@ -0,0 +1,312 @@
+import re
+import json
+import asyncio
+from html import unescape
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+import html2text
+from pydantic import BaseModel
+from browser_use.llm import BaseChatModel
+
+from src.customizations.website import WebsiteResult
+from src.tracing import span
+from .base import BaseExtractor, ExtractorError
+
+from loguru import logger
+
+USER_AGENT = "askthebio"
+# Not pages: documents go through src/documents.py, the rest is useless as text
+SKIP_EXTENSIONS = {
+    ".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".zip", ".gz", ".tar", ".rss", ".atom",
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".mp3", ".mp4", ".webm", ".css", ".js", ".json",
+}
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "svg", "nav", "footer", "form")
+_HREF = re.compile(r"""<a\s[^>]*?href\s*=\s*["']([^"'#][^"']*)["']""", re.I)
+_MD_LINK = re.compile(r"\]\((\S+?)\)")
+_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+_BOILERPLATE = re.compile(rf"<({'|'.join(BOILERPLATE_TAGS)})\b.*?</\1\s*>", re.I | re.S)
+
+
+class StaticPage(BaseModel):
+    url: str
+    depth: int
+    title: str = ""
+    markdown: str = ""
+    js_only: bool = False   # only renders with JavaScript: left to the browser agent
+
+
+def same_site(a: str, b: str) -> bool:
+    return urlparse(a).netloc.lower().removeprefix("www.") == urlparse(b).netloc.lower().removeprefix("www.")
+
+
+def path_scope(url: str) -> str:
+    # Path prefix of the pages a link is about: "/@ada/" for medium.com/@ada, "/" for a site's root
+    path = urlparse(url).path
+    if "." in path.rsplit("/", 1)[-1]:
+        path = path.rsplit("/", 1)[0]
+    return path.rstrip("/") + "/"
+
+
+def in_scope(url: str, root: str) -> bool:
+    # Same site, and under the link's path: a profile on a shared host is not the whole host
+    return same_site(url, root) and (urlparse(url).path.rstrip("/") + "/").startswith(path_scope(root))
+
+
+def normalize_url(url: str, base: str) -> str|None:
+    # Absolute, fragment-less http(s) URL of a crawlable page, None otherwise
+    url = urldefrag(urljoin(base, unescape(url.strip())))[0]
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        return None
+    ext = parsed.path[parsed.path.rfind("."):].lower() if "." in parsed.path.rsplit("/", 1)[-1] else ""
+    if ext in SKIP_EXTENSIONS:
+        return None
+    return url
+
+
+def html_to_markdown(html: str) -> str:
+    converter = html2text.HTML2Text()
+    converter.body_width = 0
+    converter.ignore_images = True
+    converter.ignore_links = True
+    converter.ignore_emphasis = True
+    text = converter.handle(_BOILERPLATE.sub(" ", html))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+class StaticCrawler():
+    """Breadth-first crawl of a website over plain HTTP, without a browser.
+
+    llms.txt, sitemap.xml and the root page are fetched together and seed the
+    crawl; links are followed on the same site and under the root's path (see
+    `in_scope()`) up to `max_depth` and `max_pages`, as allowed by robots.txt. Pages whose HTML has scripts but no
+    text left besides them are marked `js_only` instead of converted.
+    """
+
+    def __init__(
+        self,
+        client,
+        headers: dict[str, str],
+        max_pages: int = 40,
+        max_depth: int = 2,
+        concurrency: int = 8,
+        min_text_chars: int = 20,   # below it, a page with scripts is an empty shell (e.g. "Loading...")
+    ) -> None:
+        self.client = client
+        self.headers = headers
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.min_text_chars = min_text_chars
+        self._limit = asyncio.Semaphore(concurrency)
+
+    async def crawl(self, url: str) -> tuple[list[StaticPage], str]:
+        # (pages in crawl order, llms.txt or ""); llms.txt and sitemap.xml are looked up at the root of the scope
+        scope = urljoin(url, path_scope(url))
+        robots, llms, sitemap = await asyncio.gather(
+            self._robots(urljoin(url, "/robots.txt")),
+            self._text(urljoin(scope, "llms.txt")),
+            self._sitemap(urljoin(scope, "sitemap.xml")),
+        )
+        allowed = lambda u: in_scope(u, url) and robots.can_fetch(USER_AGENT, u)
+        if not allowed(url):
+            raise ExtractorError(f"robots.txt disallows {url}")
+
+        # llms.txt and sitemap entries are one hop from the root: the site says they matter
+        seeds = [u for u in (normalize_url(m, url) for m in _MD_LINK.findall(llms) + sitemap) if u]
+        seen = {url}
+        pages: list[StaticPage] = []
+        level = [url]
+        depth = 0
+        while level and len(pages) < self.max_pages:
+            level = level[:self.max_pages - len(pages)]
+            fetched = await asyncio.gather(*(self._page(u, depth) for u in level))
+            following = seeds if depth == 0 else []
+            for page, links in (f for f in fetched if f is not None):
+                pages.append(page)
+                following += links
+            level = []
+            if depth < self.max_depth:
+                for u in following:
+                    if u not in seen and allowed(u):
+                        seen.add(u)
+                        level.append(u)
+            depth += 1
+        return pages, llms
+
+    async def _get(self, url: str) -> httpx.Response|None:
+        async with self._limit:
+            try:
+                resp = await self.client.get(url, headers=self.headers)
+            except httpx.HTTPError as e:
+                logger.debug(f"Static crawl could not fetch {url}: {e!r}")
+                return None
+        return resp if resp.status_code == 200 else None
+
+    async def _text(self, url: str) -> str:
+        # llms.txt is markdown; an HTML page here is a catch-all route, not llms.txt
+        resp = await self._get(url)
+        if resp is None or "html" in resp.headers.get("content-type", ""):
+            return ""
+        return resp.text
+
+    async def _robots(self, url: str) -> RobotFileParser:
+        robots = RobotFileParser(url)
+        async with self._limit:
+            try:
+                resp = await self.client.get(url, headers=self.headers)
+            except httpx.HTTPError:
+                resp = None
+        # Same rules as RobotFileParser.read(): no robots.txt allows all, a forbidden one disallows all
+        if resp is not None and resp.status_code in (401, 403):
+            robots.disallow_all = True
+        elif resp is not None and resp.status_code == 200:
+            robots.parse(resp.text.splitlines())
+        else:
+            robots.allow_all = True
+        return robots
+
+    async def _sitemap(self, url: str, nested: bool = True) -> list[str]:
+        resp = await self._get(url)
+        if resp is None:
+            return []
+        locs = _LOC.findall(resp.text)
+        if nested and "<sitemapindex" in resp.text:
+            # Index of sitemaps: one level down is enough for a personal site
+            parts = await asyncio.gather(*(self._sitemap(loc, nested=False) for loc in locs[:5]))
+            return [u for part in parts for u in part]
+        return locs
+
+    async def _page(self, url: str, depth: int) -> tuple[StaticPage, list[str]]|None:
+        resp = await self._get(url)
+        if resp is None:
+            return None
+        content_type = resp.headers.get("content-type", "")
+        if "html" not in content_type:
+            if content_type.startswith("text/"):
+                return StaticPage(url=str(resp.url), depth=depth, markdown=resp.text.strip()), []
+            return None
+
+        html = resp.text
+        base = str(resp.url)
+        title = _TITLE.search(html)
+        markdown = html_to_markdown(html)
+        js_only = len(markdown) < self.min_text_chars and "<script" in html.lower()
+        links = [u for u in (normalize_url(h, base) for h in _HREF.findall(html)) if u]
+        page = StaticPage(
+            url=base,
+            depth=depth,
+            title=unescape(title.group(1)).strip() if title else "",
+            markdown="" if js_only else markdown,
+            js_only=js_only,
+        )
+        return page, links
+
+
+class WebsiteExtractor(BaseExtractor):
+    """Static pre-crawl of a website, summarized in a single LLM call.
+
+    If the root page or most pages need JavaScript the extraction fails over
+    to the browser agent, told which pages were already fetched (`pages`) so
+    that it only visits the others; `complete()` then merges their text with
+    the agent's result. A few script-only pages of a static site are skipped.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 40,
+        max_depth: int = 2,
+        max_page_chars: int = 6000,
+        max_prompt_chars: int = 120_000,
+        *args,
+        **kwargs
+    ) -> None:
+        super().__init__(api_base="", web_base="", *args, **kwargs)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.max_page_chars = max_page_chars
+        self.max_prompt_chars = max_prompt_chars
+        self.headers.setdefault("User-Agent", f"Mozilla/5.0 (compatible; {USER_AGENT})")
+        self.pages: list[StaticPage] = []
+        self.llms_txt = ""
+        self.url = ""
+
+    async def fetch(self, url: str) -> dict:
+        crawler = StaticCrawler(self.client, self.headers, max_pages=self.max_pages, max_depth=self.max_depth)
+        self.url = url
+        with span("static_crawl", url=url) as s:
+            self.pages, self.llms_txt = await crawler.crawl(url)
+            js_only = [p.url for p in self.pages if p.js_only]
+            s.set(n_pages=len(self.pages), n_js_only=len(js_only))
+        if not self.pages:
+            raise ExtractorError(f"No page of {url} could be fetched over HTTP")
+        if any(p.js_only and p.depth == 0 for p in self.pages) or 2 * len(js_only) > len(self.pages):
+            raise ExtractorError(f"{len(js_only)} of {len(self.pages)} pages need JavaScript")
+        if js_only:
+            logger.debug(f"Static crawl of {url}: {len(js_only)} pages need JavaScript, left out: {js_only}")
+        return {"url": url, "pages": [p for p in self.pages if not p.js_only]}
+
+    async def summarize(self, data: dict, fullname: str, llm: BaseChatModel) -> WebsiteResult:
+        return await self.ask(llm, self.summary_prompt(data["url"], fullname), WebsiteResult)
+
+    async def complete(self, result: BaseModel|None, fullname: str, llm: BaseChatModel) -> BaseModel|None:
+        # After a fail-over, one call merges the static pages' text with what the agent found on the others
+        if not any(not p.js_only for p in self.pages):
+            return result
+        found = ""
+        if result is not None:
+            found = f"A browser agent then crawled the pages that need JavaScript and found:\n{result.model_dump_json()}"
+        try:
+            with span("static_merge", n_pages=len(self.pages)):
+                merged = await self.ask(llm, self.summary_prompt(self.url, fullname, found), WebsiteResult)
+        except Exception as e:
+            logger.warning(f"Could not merge the static crawl of {self.url} into the agent's result: {e!r}")
+            return result
+        return merged.model_copy(update={"root_url": self.url})
+
+    def summary_prompt(self, url: str, fullname: str, found: str = "") -> str:
+        return (
+            f"Here is the text of the website {url}, crawled for information about {fullname}.\n\n"
+            f"{self.page_texts()}\n\n"
+            + (f"{found}\n\n" if found else "")
+            + f"Fill in the result: root_tag and relevant_contents for the root page, one child for every other page "
+            f"with relevant information about {fullname} (its url exactly as given, a tag, content_snippets quoting "
+            f"or closely paraphrasing the page, and a page_summary), then an overall_summary. Skip pages with nothing "
+            f"about {fullname}. Do not write any consideration about the extraction; only information about {fullname}."
+        )
+
+    def build(self, data: dict, summaries: WebsiteResult) -> WebsiteResult:
+        # Children can only be pages that were actually crawled
+        crawled = {p.url.rstrip("/") for p in data["pages"]}
+        children = [c for c in summaries.children if c.url.rstrip("/") in crawled]
+        return summaries.model_copy(update={"root_url": data["url"], "children": children})
+
+    def page_texts(self) -> str:
+        # The crawled pages as one markdown document, shallow pages first, within max_prompt_chars
+        parts = []
+        if self.llms_txt:
+            parts.append(f"## /llms.txt\n\n{self.llms_txt[:self.max_page_chars]}")
+        for page in sorted((p for p in self.pages if not p.js_only), key=lambda p: p.depth):
+            parts.append(f"## {page.url}" + (f" ({page.title})" if page.title else "") + f"\n\n{page.markdown[:self.max_page_chars]}")
+        text, total = [], 0
+        for part in parts:
+            if total + len(part) > self.max_prompt_chars:
+                logger.debug(f"Static crawl text over {self.max_prompt_chars} chars, {len(parts) - len(text)} pages left out.")
+                break
+            text.append(part)
+            total += len(part)
+        return "\n\n".join(text)
+
+    def agent_context(self) -> str:
+        # Prompt addition for the browser agent after a partial static crawl: URLs only, it is repeated on every step
+        static = [p.url for p in self.pages if not p.js_only]
+        if not static:
+            return ""
+        js_only = [p.url for p in self.pages if p.js_only]
+        return (
+            f"These pages were already fetched without a browser and their text is added to your result afterwards; "
+            f"do not visit them again: {json.dumps(static)}.\n"
+            + (f"Focus on these pages, which render with JavaScript: {json.dumps(js_only)}." if js_only else "")
+        ).strip()
@@ -0,0 +1,170 @@
+import os
+import json
+import random
+import hashlib
+import asyncio
+from urllib.parse import urlparse
+
+import httpx
+
+from src.tracing import span
+
+from loguru import logger
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient():
+    """Shared async HTTP client for customization actions and extractors.
+
+    One pooled `httpx.AsyncClient` with a per-host concurrency limit, timeouts,
+    retries with exponential backoff, and an on-disk cache of GET responses
+    keyed by URL that is revalidated with ETag / Last-Modified.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str|None = "out/.http_cache",
+        max_connections: int = 50,
+        per_host_limit: int = 6,
+        timeout: float = 20.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 20.0,
+        transport: httpx.AsyncBaseTransport|None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    async def get(
+        self,
+        url: str,
+        params: dict|None = None,
+        headers: dict[str, str]|None = None,
+        cache: bool = True,
+    ) -> httpx.Response:
+        url = str(httpx.URL(url, params=params))
+        headers = dict(headers or {})
+        key = self._cache_key(url, headers) if cache and self.cache_dir else None
+        cached = await asyncio.to_thread(self._cache_load, key) if key else None
+        if cached is not None:
+            meta, _ = cached
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = await self.request("GET", url, headers=headers)
+
+        if resp.status_code == 304 and cached is not None:
+            meta, body = cached
+            return httpx.Response(
+                status_code=meta["status_code"],
+                headers=meta["headers"],
+                content=body,
+                request=resp.request,
+            )
+        if key and resp.status_code == 200 and ("etag" in resp.headers or "last-modified" in resp.headers):
+            await asyncio.to_thread(self._cache_store, key, resp)
+        return resp
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = urlparse(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        attempt = 0
+        while True:
+            try:
+                async with limit:
+                    with span("http", method=method, host=host, attempt=attempt) as s:
+                        resp = await self._client.request(method, url, **kwargs)
+                        s.set(status=resp.status_code)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+                delay = self._retry_after(resp)
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                delay = None
+                logger.debug(f"{method} {url} failed ({e!r}), retrying.")
+            if delay is None:
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * (0.5 + random.random() / 2)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    # ---------------------------------
+    # Internals
+    # ---------------------------------
+    def _retry_after(self, resp: httpx.Response) -> float|None:
+        try:
+            return min(self.max_backoff, float(resp.headers["retry-after"]))
+        except (KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def _cache_key(url: str, headers: dict[str, str]) -> str:
+        accept = headers.get("Accept", headers.get("accept", ""))
+        return hashlib.sha256(f"{url}\n{accept}".encode()).hexdigest()
+
+    def _cache_load(self, key: str) -> tuple[dict, bytes]|None:
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(f"{path}.json", "r") as f:
+                meta = json.load(f)
+            with open(f"{path}.body", "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def _cache_store(self, key: str, resp: httpx.Response) -> None:
+        path = os.path.join(self.cache_dir, key)
+        meta = {
+            "url": str(resp.url),
+            "status_code": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")},
+            "etag": resp.headers.get("etag"),
+            "last_modified": resp.headers.get("last-modified"),
+        }
+        # body first, so a readable .json always has its body
+        for suffix, mode, data in ((".body", "wb", resp.content), (".json", "w", json.dumps(meta))):
+            tmp = f"{path}{suffix}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, f"{path}{suffix}")
+
+
+_shared: HttpClient|None = None
+
+
+def get_http_client() -> HttpClient:
+    global _shared
+    if _shared is None:
+        _shared = HttpClient()
+    return _shared
+
+
+def set_http_client(client: HttpClient) -> None:
+    # e.g. a client whose transport points at local fixtures (benchmarks)
+    global _shared
+    _shared = client
+
+
+async def close_http_client() -> None:
+    global _shared
+    if _shared is not None:
+        await _shared.aclose()
+        _shared = None
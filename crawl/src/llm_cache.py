@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import sqlite3
+import argparse
+import threading
+
+from browser_use.llm.exceptions import ModelError
+from browser_use.llm.views import ChatInvokeCompletion
+
+from src.tracing import current_span
+
+from loguru import logger
+
+MODES = ("cache", "record", "replay")
+# Parts of browser-use prompts that change between otherwise identical steps
+_VOLATILE = [
+    (re.compile(r"Current date and time: \d{4}-\d{2}-\d{2} \d{2}:\d{2}"), "Current date and time: <now>"),
+    (re.compile(r"Current date: \d{4}-\d{2}-\d{2}"), "Current date: <today>"),
+    (re.compile(r"browser_use_agent_[\w\-]+"), "browser_use_agent_<id>"),
+    # The step budget comes from past runs (StepHistory), so it moves between reruns
+    (re.compile(r"Maximum steps: \d+"), "Maximum steps: <max>"),
+]
+# Tab ids are the last 4 chars of random CDP target ids, a new set every browser
+_TAB_ID = re.compile(r"(?<=\bTab )([0-9A-Fa-f]{4})(?=:)|(?<=\bCurrent tab: )([0-9A-Fa-f]{4})\b")
+# Actions of an agent's output whose `tab_id` parameter is one of those ids
+TAB_ACTIONS = ("switch_tab", "close_tab")
+
+
+class LLMCacheMiss(ModelError):
+    pass
+
+
+class LLMCache():
+    """Chat model responses in one SQLite file, keyed by `request_key()`.
+
+    - "cache": read-through, a miss calls the model and stores its response.
+    - "record": always calls the model and stores (refreshes) the response.
+    - "replay": only serves stored responses, a miss raises LLMCacheMiss.
+
+    Least recently used entries are evicted above `max_bytes` (compressed).
+    """
+
+    def __init__(self, path: str, mode: str = "cache", max_bytes: int = 512 * 2**20) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {MODES}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, model TEXT, data BLOB, size INTEGER, stored_at REAL, used_at REAL)"
+            )
+            self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> dict|None:
+        with self._lock, self._db:
+            row = self._db.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, model: str, entry: dict) -> None:
+        data = zlib.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), 6)
+        now = time.time()
+        with self._lock, self._db:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", (key, model, data, len(data), now, now))
+            self._size += len(data) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Down to 90% of max_bytes, so that eviction doesn't run on every put
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY used_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.stats["evicted"] += len(evicted)
+
+    def close(self) -> None:
+        logger.info(f"LLM cache ({self.mode}): {self.stats}")
+        with self._lock:
+            self._db.close()
+
+
+def normalize(text: str, tab_ids: list[str]) -> str:
+    # Volatile parts replaced by placeholders; tab ids by their order of appearance (collected in tab_ids)
+    for pattern, placeholder in _VOLATILE:
+        text = pattern.sub(placeholder, text)
+
+    def tab(match: re.Match) -> str:
+        tab_id = match.group(0).upper()
+        if tab_id not in tab_ids:
+            tab_ids.append(tab_id)
+        return f"#{tab_ids.index(tab_id)}"
+
+    return _TAB_ID.sub(tab, text)
+
+
+def _normalize_value(value, tab_ids: list[str]):
+    if isinstance(value, str):
+        if value.startswith("data:"):
+            # Inline screenshots: hashing is enough, and much smaller
+            return hashlib.sha256(value.encode()).hexdigest()
+        return normalize(value, tab_ids)
+    if isinstance(value, dict):
+        return {k: _normalize_value(v, tab_ids) for k, v in value.items() if k != "cache"}
+    if isinstance(value, list):
+        return [_normalize_value(v, tab_ids) for v in value]
+    return value
+
+
+def request_key(llm, messages, output_format=None) -> tuple[str, list[str]]:
+    # (hash of the normalized request, tab ids of the request in order)
+    tab_ids: list[str] = []
+    request = {
+        "model": llm.model,
+        "temperature": getattr(llm, "temperature", None),
+        "output_format": output_format.model_json_schema() if output_format is not None else None,
+        "messages": [_normalize_value(m.model_dump(), tab_ids) for m in messages],
+    }
+    key = hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+    return key, tab_ids
+
+
+class CachedChatModel():
+    """Wrap a browser-use chat model to serve repeated requests from an LLMCache.
+
+    Requests are compared after normalization (see `request_key()`), so the
+    same step of a rerun hits even though its prompt has a new timestamp and
+    new tab ids; the tab ids in a cached response are mapped to the new ones.
+    """
+
+    def __init__(self, llm, cache: LLMCache) -> None:
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    async def ainvoke(self, messages, output_format=None):
+        key, tab_ids = request_key(self.llm, messages, output_format)
+        if self.cache.mode != "record":
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry is not None:
+                self.cache.stats["hits"] += 1
+                if (s := current_span()) is not None:
+                    s.set(llm_cache="hit")
+                return self._completion(entry, tab_ids, output_format)
+            self.cache.stats["misses"] += 1
+            if self.cache.mode == "replay":
+                raise LLMCacheMiss(f"No cached response for this {self.llm.model} request (replay mode)")
+
+        response = await self.llm.ainvoke(messages, output_format)
+        completion = response.completion
+        entry = {
+            "completion": completion.model_dump_json() if output_format is not None else completion,
+            "thinking": response.thinking,
+            "tab_ids": tab_ids,
+        }
+        await asyncio.to_thread(self.cache.put, key, self.llm.model, entry)
+        self.cache.stats["stored"] += 1
+        return response
+
+    @staticmethod
+    def _completion(entry: dict, tab_ids: list[str], output_format) -> ChatInvokeCompletion:
+        # No usage: a cached response costs nothing
+        if output_format is None:
+            return ChatInvokeCompletion(completion=entry["completion"], thinking=entry.get("thinking"), usage=None)
+        data = json.loads(entry["completion"])
+        mapping = {old: new for old, new in zip(entry["tab_ids"], tab_ids) if old != new}
+        if mapping and isinstance(data, dict):
+            # Only the tab actions' parameters: any other 4-hex string ("2023", "cafe") is left alone
+            for action in data.get("action") or []:
+                for name in TAB_ACTIONS:
+                    params = action.get(name) if isinstance(action, dict) else None
+                    if isinstance(params, dict) and isinstance(params.get("tab_id"), str):
+                        params["tab_id"] = mapping.get(params["tab_id"].upper(), params["tab_id"])
+        return ChatInvokeCompletion(completion=output_format.model_validate(data), thinking=entry.get("thinking"), usage=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the LLM response cache.")
+    parser.add_argument("path", nargs="?", default="out/.llm_cache.sqlite")
+    parser.add_argument("--clear", action="store_true", help="delete every entry")
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.path)
+    if args.clear:
+        with db:
+            db.execute("DELETE FROM entries")
+        db.execute("VACUUM")
+    for model, n, size, last in db.execute("SELECT model, COUNT(*), SUM(size), MAX(used_at) FROM entries GROUP BY model"):
+        print(f"{model:<30} {n:>7} entries {size / 2**20:>8.1f} MB  last used {time.strftime('%Y-%m-%d %H:%M', time.localtime(last))}")
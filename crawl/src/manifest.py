@@ -0,0 +1,97 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+import httpx
+from pydantic import BaseModel
+
+from src.http_client import get_http_client
+
+from loguru import logger
+
+
+class SourceEntry(BaseModel):
+    url: str
+    name: str
+    fingerprint: str|None = None
+    knowledge_cutoff_date: str
+    checked_at: str
+    result: dict
+
+
+class CrawlManifest(BaseModel):
+    """Per-user record of what was crawled, used to skip unchanged sources."""
+    sources: dict[str, SourceEntry] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "CrawlManifest":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls.model_validate_json(f.read())
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return cls()
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.model_dump_json(indent=2))
+        os.replace(tmp, path)
+
+    def reusable(self, url: str, fingerprint: str|None, max_age: timedelta|None = None) -> SourceEntry|None:
+        # A source is reused only if we could fingerprint it and the fingerprint didn't change
+        entry = self.sources.get(url)
+        if entry is None or fingerprint is None or entry.fingerprint != fingerprint:
+            return None
+        if max_age is not None and datetime.now() - datetime.fromisoformat(entry.knowledge_cutoff_date) > max_age:
+            return None
+        return entry
+
+    def record(self, url: str, name: str, fingerprint: str|None, result: dict) -> SourceEntry:
+        now = datetime.now().isoformat()
+        entry = SourceEntry(
+            url=url,
+            name=name,
+            fingerprint=fingerprint,
+            knowledge_cutoff_date=result.get("knowledge_cutoff_date", now),
+            checked_at=now,
+            result=result,
+        )
+        self.sources[url] = entry
+        return entry
+
+
+def digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+async def fingerprint_page(url: str) -> str|None:
+    # Cheapest signal first: validators, then a hash of the page itself
+    try:
+        resp = await get_http_client().get(url, cache=False)
+    except httpx.HTTPError:
+        return None
+    if resp.status_code != 200:
+        return None
+    if resp.headers.get("etag"):
+        return digest("etag", resp.headers["etag"])
+    if resp.headers.get("last-modified"):
+        return digest("last-modified", resp.headers["last-modified"])
+    return digest("page", resp.content)
+
+
+async def fingerprint_sitemap(url: str) -> str|None:
+    try:
+        resp = await get_http_client().get(urljoin(url, "/sitemap.xml"), cache=False)
+    except httpx.HTTPError:
+        return None
+    if resp.status_code != 200:
+        return None
+    lastmods = re.findall(r"<lastmod>\s*([^<\s]+)\s*</lastmod>", resp.text)
+    return digest("sitemap", sorted(lastmods)) if lastmods else None
@@ -1,3 +1,5 @@
+import json
+
 from pydantic import BaseModel
 
 class Link(BaseModel):
@@ -10,7 +12,7 @@ class Text(BaseModel):
 
 class Doc(BaseModel):
     title: str
-    ref: str # TODO: implement
+    ref: str # local path or http(s) URL (PDF, DOCX, PPTX, HTML, ...)
 
 class UserInput(BaseModel):
     name: str
@@ -18,3 +20,11 @@ class UserInput(BaseModel):
     texts: list[Text]
     docs: list[Doc]
 
+
+
+def load_users(path: str) -> list[UserInput]:
+    # Either a JSON list of UserInput records or one record per line (.jsonl)
+    with open(path, "r") as f:
+        if path.endswith(".jsonl"):
+            return [UserInput.model_validate_json(line) for line in f if line.strip()]
+        return [UserInput.model_validate(u) for u in json.load(f)]
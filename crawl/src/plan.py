@@ -0,0 +1,36 @@
+from urllib.parse import urlparse
+
+from src.models import UserInput
+from src.customizations import registry
+
+
+def plan_users(users: list[UserInput]) -> tuple[list[tuple[str, str, str, str]], list[str]]:
+    """Resolve every link to its customization without importing any of them.
+
+    Returns (user, url, customization, origin) rows and the problems found.
+    """
+    rows, problems = [], []
+    for user in users:
+        seen = {}
+        for link in user.links:
+            parsed = urlparse(link.url)
+            if parsed.scheme not in ("http", "https") or not parsed.netloc:
+                problems.append(f"{user.name}: invalid URL {link.url!r}")
+                continue
+            spec = registry.resolve(link.url)
+            rows.append((user.name, link.url, spec.name, spec.origin))
+            # Results and output dirs are keyed by customization name
+            if spec.name in seen:
+                problems.append(f"{user.name}: {link.url} and {seen[spec.name]} both use '{spec.name}', one result would overwrite the other")
+            seen[spec.name] = link.url
+        for doc in user.docs:
+            rows.append((user.name, doc.ref, "document", "docling"))
+    return rows, problems
+
+
+def format_plan(rows: list[tuple[str, str, str, str]], problems: list[str]) -> str:
+    width = max((len(r[1]) for r in rows), default=3)
+    lines = [f"{'user':<24} {'source':<{width}} {'customization':<14} origin"]
+    lines += [f"{user[:24]:<24} {url:<{width}} {name:<14} {origin}" for user, url, name, origin in rows]
+    lines += [f"! {p}" for p in problems]
+    return "\n".join(lines)
@@ -0,0 +1,130 @@
+import enum
+import json
+import types
+import typing
+import argparse
+import functools
+from typing import Any, Literal, Union, get_args, get_origin
+
+from browser_use import Controller
+from browser_use.agent.prompts import SystemPrompt
+from browser_use.agent.views import AgentOutput
+from browser_use.llm.schema import SchemaOptimizer
+from pydantic import BaseModel, Field, create_model
+
+from src.models import Link
+from src.context import count_tokens
+from src.customizations import registry
+from src.customizations.base_customization import BaseCustomization
+
+# What every browser-use step sends besides the page: the task (repeated in each
+# state message as <user_request>) and the output schema, which holds the
+# parameters of every registered action and, in `done`, the whole result model.
+
+
+def schema_outline(model: type[BaseModel]) -> str:
+    # `name, downloads:int, stats{followers:int}, models[name, tag]`: the fields without the JSON schema around them
+    return ", ".join(f"{name}{_shape(field.annotation)}" for name, field in model.model_fields.items())
+
+
+def _shape(annotation: Any) -> str:
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (Union, types.UnionType):
+        return _shape(next((a for a in args if a is not type(None)), str))
+    if origin is Literal:
+        return ":" + "|".join(str(a) for a in args)
+    if origin in (list, set, tuple, typing.Sequence):
+        inner = _shape(args[0]) if args else ""
+        return f"[{inner.strip('{}:')}]"
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return "{" + schema_outline(annotation) + "}"
+        if issubclass(annotation, enum.Enum):
+            return ":" + "|".join(str(e.value) for e in annotation)
+        if annotation is not str:
+            return f":{annotation.__name__}"
+    return ""
+
+
+@functools.cache
+def slim_model(model: type[BaseModel]) -> type[BaseModel]:
+    """Compact stand-in for `model` in the agent's `done` action.
+
+    Its schema is one text field outlining the fields of `model`, a fraction of
+    the full JSON schema sent on every step. The full model is filled once from
+    the notes at the end (see UserCrawl.agent_output()).
+    """
+    return create_model(
+        f"{model.__name__}Notes",
+        notes=(str, Field(description=f"Everything found, as compact notes covering: {schema_outline(model)}")),
+    )
+
+
+def schema_tokens(controller: Controller, actions: list[str]|None = None) -> int:
+    # Tokens of the agent's output schema, as ChatGoogle sends it, with all or only `actions`
+    action_model = controller.registry.create_action_model(include_actions=actions)
+    schema = SchemaOptimizer.create_optimized_json_schema(AgentOutput.type_with_custom_actions(action_model))
+    return count_tokens(json.dumps(schema))
+
+
+def step_overhead(prompt: str, controller: Controller) -> dict[str, int]:
+    # Fixed tokens per step: the task, the actions (with the output envelope) and the `done` result model
+    actions = [name for name in controller.registry.registry.actions if name != "done"]
+    total = schema_tokens(controller)
+    without_done = schema_tokens(controller, actions)
+    return {
+        "prompt": count_tokens(prompt),
+        "actions": without_done,
+        "output": total - without_done,
+        "per_step": count_tokens(prompt) + total,
+    }
+
+
+def system_tokens() -> int:
+    # browser-use's own system prompt, the same for every customization
+    return count_tokens(SystemPrompt(action_description="").get_system_message().content)
+
+
+def measure(builder: BaseCustomization, fullname: str) -> list[dict]:
+    """Per-step overhead of each agent a customization runs, full and with slim schemas.
+
+    One row per agent: the main one, or the discovery and sub-task agents of a
+    fan-out (sub-tasks planned from a discovery result are not known upfront).
+    """
+    if builder.fan_out:
+        tasks = [t for t in [builder.discovery(fullname)] if t is not None] + builder.subtasks(fullname, None)
+        agents = [(f"{builder.name}/{t.key}", t.prompt, t.output_model, t.max_steps) for t in tasks]
+    else:
+        agents = [(builder.name, builder.prompt(fullname), builder.result_class(), builder.max_steps)]
+
+    rows = []
+    for key, prompt, output_model, max_steps in agents:
+        full = step_overhead(prompt, builder.controller(output_model))
+        slim = step_overhead(prompt, builder.controller(slim_model(output_model)))
+        rows.append({"agent": key, "max_steps": max_steps, "full": full, "slim": slim})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fixed per-step prompt overhead of each customization's agents.")
+    parser.add_argument("urls", nargs="*", default=[
+        "https://www.linkedin.com/in/example",
+        "https://github.com/example",
+        "https://x.com/example",
+        "https://huggingface.co/example",
+        "https://example.com",
+    ])
+    parser.add_argument("--name", default="Ada Lovelace", help="full name the prompts are written for")
+    args = parser.parse_args()
+
+    print(f"browser-use system prompt: {system_tokens()} tokens per step, for every agent\n")
+    print(f"{'agent':<28} {'steps':>5} {'prompt':>7} {'actions':>8} {'output':>7} {'per step':>9} {'x steps':>9}   {'slim output':>11} {'per step':>9} {'saved':>6}")
+    for url in args.urls:
+        for r in measure(registry.create(Link(url=url, description=""), "out"), args.name):
+            full, slim = r["full"], r["slim"]
+            print(
+                f"{r['agent']:<28} {r['max_steps']:>5} {full['prompt']:>7} {full['actions']:>8} {full['output']:>7} "
+                f"{full['per_step']:>9} {full['per_step'] * r['max_steps']:>9}   {slim['output']:>11} {slim['per_step']:>9} "
+                f"{1 - slim['per_step'] / full['per_step']:>6.0%}"
+            )
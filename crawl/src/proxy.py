@@ -0,0 +1,383 @@
+import os
+import ssl
+import json
+import time
+import zlib
+import base64
+import asyncio
+import hashlib
+import shutil
+import sqlite3
+import datetime
+import tempfile
+import threading
+from fnmatch import fnmatch
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+from loguru import logger
+
+HOP_BY_HOP = {
+    "connection", "proxy-connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade",
+    "proxy-authorization", "proxy-authenticate", "content-length", "content-encoding", "host", "accept-encoding",
+}
+MODES = ("cache", "record", "replay")
+# In "cache" mode, what may be served again later (record mode keeps every status, for replay)
+CACHEABLE_STATUS = {200, 203, 301}
+# Revalidations of the browser's own cache: their 304 has no body to archive, so the full response is asked for
+CONDITIONAL = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"}
+
+
+class CacheRule(BaseModel):
+    pattern: str                          # host, fnmatch
+    content_types: list[str] = ["*"]      # media types that may be cached, fnmatch
+    max_age: float|None = None            # seconds before refetching, None = never
+
+    def allows(self, content_type: str) -> bool:
+        media = content_type.split(";")[0].strip().lower()
+        return any(fnmatch(media, p) for p in self.content_types)
+
+
+STATIC = ["text/css", "*javascript*", "image/*", "font/*", "application/font*", "application/wasm"]
+
+# In "cache" mode only these hosts go through the cache (everything else is tunneled untouched)
+DEFAULT_RULES = [
+    CacheRule(pattern="github.githubassets.com"),
+    CacheRule(pattern="avatars.githubusercontent.com", max_age=7 * 86400),
+    CacheRule(pattern="*.licdn.com", content_types=STATIC),
+    CacheRule(pattern="abs.twimg.com"),
+    CacheRule(pattern="pbs.twimg.com", max_age=7 * 86400),
+    CacheRule(pattern="huggingface.co", content_types=STATIC, max_age=86400),
+    CacheRule(pattern="cdn-avatars.huggingface.co", max_age=7 * 86400),
+    CacheRule(pattern="fonts.gstatic.com"),
+    CacheRule(pattern="fonts.googleapis.com", max_age=86400),
+]
+
+
+class ProxyArchive():
+    """Responses in one SQLite file, bodies zlib-compressed and stored once per content hash."""
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS bodies (sha TEXT PRIMARY KEY, data BLOB)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, sha TEXT, stored_at REAL)"
+            )
+
+    def get(self, key: str) -> tuple[int, list[tuple[str, str]], bytes, float]|None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT e.status, e.headers, b.data, e.stored_at FROM entries e JOIN bodies b ON e.sha = b.sha WHERE e.key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, data, stored_at = row
+        return status, [tuple(h) for h in json.loads(headers)], zlib.decompress(data), stored_at
+
+    def put(self, key: str, url: str, status: int, headers: list[tuple[str, str]], body: bytes) -> None:
+        sha = hashlib.sha256(body).hexdigest()
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?)", (sha, zlib.compress(body, 6)))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), sha, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class CachingProxy():
+    """Local HTTP(S) proxy for the pool browsers, with an on-disk archive.
+
+    - "cache": hosts matching a rule are served from the archive while fresh,
+      and cacheable responses are stored; other hosts are tunneled untouched.
+    - "record": every GET of every host is fetched and stored.
+    - "replay": everything is served from the archive, never from the network.
+
+    HTTPS is intercepted with per-host certificates sharing one key, which
+    Chrome is told to accept via --ignore-certificate-errors-spki-list.
+    Upgrade requests (WebSockets) on intercepted hosts are passed through to
+    the origin as a raw stream, except in "replay" mode.
+    """
+
+    def __init__(
+        self,
+        archive_path: str,
+        mode: str = "cache",
+        rules: list[CacheRule]|None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        timeout: float = 30.0,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown proxy mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.host = host
+        self.port = port
+        self.archive = ProxyArchive(archive_path)
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "tunnels": 0, "bytes_cached": 0, "bytes_fetched": 0}
+        self._client = httpx.AsyncClient(timeout=timeout, follow_redirects=False)
+        self._server: asyncio.AbstractServer|None = None
+        self._key = None
+        self._spki = ""
+        self._contexts: dict[str, ssl.SSLContext] = {}
+        self._certdir = tempfile.mkdtemp(prefix="askthebio-proxy-")
+
+    async def start(self) -> None:
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        self._key = ec.generate_private_key(ec.SECP256R1())
+        spki = self._key.public_key().public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+        digest = hashes.Hash(hashes.SHA256())
+        digest.update(spki)
+        self._spki = base64.b64encode(digest.finalize()).decode()
+
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Caching proxy ({self.mode}) on {self.host}:{self.port}, archive {self.archive.path}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self._client.aclose()
+        self.archive.close()
+        await asyncio.to_thread(shutil.rmtree, self._certdir, True)
+        logger.info(f"Caching proxy: {self.stats}")
+
+    @property
+    def chrome_args(self) -> list[str]:
+        return [
+            f"--proxy-server=http://{self.host}:{self.port}",
+            f"--ignore-certificate-errors-spki-list={self._spki}",
+        ]
+
+    def rule_for(self, host: str) -> CacheRule|None:
+        return next((r for r in self.rules if fnmatch(host, r.pattern)), None)
+
+    # ---------------------------------
+    # Connections
+    # ---------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            method, target, headers, body = request
+            if method == "CONNECT":
+                host, _, port = target.rpartition(":")
+                if self.mode == "cache" and self.rule_for(host) is None:
+                    await self._tunnel(reader, writer, host, int(port))
+                    return
+                writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+                await writer.drain()
+                await writer.start_tls(self._tls_context(host))
+                origin = f"https://{host}" if port == "443" else f"https://{target}"
+                while (request := await _read_request(reader)) is not None:
+                    method, path, headers, body = request
+                    if _is_upgrade(headers):
+                        await self._upgrade(reader, writer, method, origin + path, headers, body)
+                        break
+                    if not await self._respond(writer, method, origin + path, headers, body):
+                        break
+            else:
+                # Plain http, absolute-form target
+                while request is not None:
+                    method, target, headers, body = request
+                    if _is_upgrade(headers):
+                        await self._upgrade(reader, writer, method, target, headers, body)
+                        break
+                    if not await self._respond(writer, method, target, headers, body):
+                        break
+                    request = await _read_request(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        except Exception:
+            logger.exception("Proxy connection failed")
+        finally:
+            writer.close()
+
+    async def _tunnel(self, reader, writer, host: str, port: int) -> None:
+        self.stats["tunnels"] += 1
+        try:
+            up_reader, up_writer = await asyncio.open_connection(host, port)
+        except OSError:
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        await writer.drain()
+        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+
+    async def _upgrade(self, reader, writer, method: str, url: str, headers: list[tuple[str, str]], body: bytes) -> None:
+        # The request goes to the origin as is (Upgrade and Connection included), then both sides are piped
+        if self.mode == "replay":
+            writer.write(b"HTTP/1.1 504 Gateway Timeout\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        self.stats["tunnels"] += 1
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        try:
+            up_reader, up_writer = await asyncio.open_connection(
+                parts.hostname, parts.port or (443 if secure else 80),
+                ssl=ssl.create_default_context() if secure else None,
+                server_hostname=parts.hostname if secure else None,
+            )
+        except (OSError, ssl.SSLError):
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        head = f"{method} {path} HTTP/1.1\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in headers if k.lower() not in ("proxy-connection", "proxy-authorization"))
+        up_writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await up_writer.drain()
+        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+
+    async def _respond(self, writer, method: str, url: str, headers: list[tuple[str, str]], body: bytes) -> bool:
+        status, resp_headers, content = await self._fetch(method, url, headers, body)
+        head = f"HTTP/1.1 {status} {_reason(status)}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in resp_headers)
+        head += f"Content-Length: {len(content)}\r\n\r\n"
+        writer.write(head.encode("latin-1") + content)
+        await writer.drain()
+        return not any(k.lower() == "connection" and v.lower() == "close" for k, v in headers)
+
+    async def _fetch(self, method: str, url: str, headers: list[tuple[str, str]], body: bytes):
+        host = urlsplit(url).hostname or ""
+        rule = self.rule_for(host)
+        key = f"{method} {url.split('#')[0]}"
+
+        if method == "GET" and self.mode in ("cache", "replay"):
+            cached = await asyncio.to_thread(self.archive.get, key)
+            fresh = cached is not None and (
+                self.mode == "replay" or rule is None or rule.max_age is None or time.time() - cached[3] < rule.max_age
+            )
+            if fresh:
+                self.stats["hits"] += 1
+                self.stats["bytes_cached"] += len(cached[2])
+                return cached[0], cached[1], cached[2]
+        if self.mode == "replay":
+            self.stats["misses"] += 1
+            return 504, [("Content-Type", "text/plain")], f"Not in the proxy archive: {key}".encode()
+
+        self.stats["misses"] += 1
+        archived = method == "GET" and (self.mode == "record" or rule is not None)
+        forwarded = [(k, v) for k, v in headers if k.lower() not in HOP_BY_HOP and not (archived and k.lower() in CONDITIONAL)]
+        try:
+            resp = await self._client.request(method, url, headers=forwarded, content=body or None)
+        except httpx.HTTPError as e:
+            return 502, [("Content-Type", "text/plain")], f"Upstream error: {e!r}".encode()
+        resp_headers = [(k, v) for k, v in resp.headers.multi_items() if k.lower() not in HOP_BY_HOP]
+        content = resp.content
+        self.stats["bytes_fetched"] += len(content)
+
+        cache_control = resp.headers.get("cache-control", "").lower()
+        storable = method == "GET" and resp.status_code != 304 and (
+            (self.mode == "record" and resp.status_code < 500)
+            or (
+                rule is not None
+                and resp.status_code in CACHEABLE_STATUS
+                and "no-store" not in cache_control
+                and "private" not in cache_control
+                and rule.allows(resp.headers.get("content-type", ""))
+            )
+        )
+        if storable:
+            # Never replay cookies set for this session
+            kept = [(k, v) for k, v in resp_headers if k.lower() != "set-cookie"]
+            await asyncio.to_thread(self.archive.put, key, url, resp.status_code, kept, content)
+            self.stats["stored"] += 1
+        return resp.status_code, resp_headers, content
+
+    def _tls_context(self, host: str) -> ssl.SSLContext:
+        if host not in self._contexts:
+            from cryptography import x509
+            from cryptography.x509.oid import NameOID
+            from cryptography.hazmat.primitives import hashes, serialization
+
+            now = datetime.datetime.now(datetime.timezone.utc)
+            name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+            cert = (
+                x509.CertificateBuilder()
+                .subject_name(name)
+                .issuer_name(name)
+                .public_key(self._key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=30))
+                .add_extension(x509.SubjectAlternativeName([x509.DNSName(host)]), critical=False)
+                .sign(self._key, hashes.SHA256())
+            )
+            path = os.path.join(self._certdir, hashlib.sha1(host.encode()).hexdigest())
+            with open(f"{path}.pem", "wb") as f:
+                f.write(cert.public_bytes(serialization.Encoding.PEM))
+                f.write(self._key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.set_alpn_protocols(["http/1.1"])
+            context.load_cert_chain(f"{path}.pem")
+            # The file holds the unencrypted key: not needed once loaded
+            os.remove(f"{path}.pem")
+            self._contexts[host] = context
+        return self._contexts[host]
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = []
+    while (raw := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        k, _, v = raw.decode("latin-1").partition(":")
+        headers.append((k.strip(), v.strip()))
+    lower = {k.lower(): v for k, v in headers}
+    body = b""
+    if "content-length" in lower:
+        body = await reader.readexactly(int(lower["content-length"]))
+    elif lower.get("transfer-encoding", "").lower() == "chunked":
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            body += await reader.readexactly(size)
+            await reader.readline()
+        await reader.readline()
+    return method, target, headers, body
+
+
+def _is_upgrade(headers: list[tuple[str, str]]) -> bool:
+    return any(k.lower() == "upgrade" for k, _ in headers) and any(
+        k.lower() == "connection" and "upgrade" in v.lower() for k, v in headers
+    )
+
+
+async def _pipe(src: asyncio.StreamReader, dst: asyncio.StreamWriter) -> None:
+    try:
+        while data := await src.read(65536):
+            dst.write(data)
+            await dst.drain()
+    except ConnectionError:
+        pass
+    finally:
+        dst.close()
+
+
+def _reason(status: int) -> str:
+    try:
+        from http import HTTPStatus
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
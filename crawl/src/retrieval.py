@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import gzip
+import math
+import argparse
+from collections import Counter
+
+from src.context import clean, count_tokens
+
+MAX_CHUNK_CHARS = 1200
+STOPWORDS = set("""
+a an and are as at be by did do does for from has have he her his how i in is it its me my of on or she
+that the their them they this to was were what when where which who whom why will with you your about
+""".split())
+# Question words -> the field names the crawl results use for them
+QUERY_EXPANSIONS = {
+    "work": ["experience", "company", "job_title"],
+    "job": ["experience", "company", "job_title"],
+    "employer": ["experience", "company"],
+    "study": ["education", "school", "degree"],
+    "studied": ["education", "school", "degree"],
+    "degree": ["education", "school"],
+    "based": ["location"],
+    "live": ["location"],
+    "from": ["location"],
+    "code": ["repositories_detailed", "languages"],
+    "project": ["repositories_detailed", "children"],
+}
+
+
+class Chunk():
+    def __init__(self, source: str, section: str, text: str) -> None:
+        self.source = source
+        self.section = section
+        self.text = text
+
+    def render(self) -> str:
+        return f"[{self.source} / {self.section}]\n{self.text}"
+
+    def to_list(self) -> list[str]:
+        return [self.source, self.section, self.text]
+
+
+def tokenize(text: str) -> list[str]:
+    terms = []
+    for term in re.findall(r"\w+", text.lower()):
+        if term in STOPWORDS:
+            continue
+        # Crude plural folding, enough for "repos"/"repo", "companies"/"company"
+        if len(term) > 4 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def _flat(value) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{k}: {_flat(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return ", ".join(_flat(v) for v in value)
+    return str(value)
+
+
+def _split(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list[str]:
+    # On paragraph boundaries when possible
+    parts, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        while len(para) > max_chars:
+            parts.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and len(current) + len(para) + 2 > max_chars:
+            parts.append(current)
+            current = ""
+        current = f"{current}\n\n{para}" if current else para
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+def chunk_results(results: dict) -> list[Chunk]:
+    """Passages keyed by source and section from a user's final JSON.
+
+    Scalar fields of a source form one "profile" passage, every item of a list
+    field is its own passage, texts and documents are split on their headings.
+    """
+    chunks = []
+    for source, value in results.items():
+        value = clean(value)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            section = "text"
+            for block in re.split(r"(?m)^(?=#{1,3} )", value):
+                if match := re.match(r"#{1,3} (.+)", block):
+                    section = match.group(1).strip()
+                    if not block[match.end():].strip():
+                        continue
+                chunks += [Chunk(source, section, part) for part in _split(block)]
+            continue
+        if not isinstance(value, dict):
+            chunks.append(Chunk(source, "profile", _flat(value)))
+            continue
+
+        scalars = {k: v for k, v in value.items() if not isinstance(v, (list, dict))}
+        if scalars:
+            chunks += [Chunk(source, "profile", part) for part in _split("\n".join(f"{k}: {v}" for k, v in scalars.items()))]
+        for field, v in value.items():
+            items = v if isinstance(v, list) else [v] if isinstance(v, dict) else []
+            for item in items:
+                chunks += [Chunk(source, field, part) for part in _split(_flat(item))]
+    return chunks
+
+
+class RetrievalIndex():
+    """BM25 over the passages of one user, stored with them in a single gzip'd JSON file."""
+
+    def __init__(self, chunks: list[Chunk], postings: dict[str, list[list[int]]], lengths: list[int], k1: float = 1.2, b: float = 0.75) -> None:
+        self.chunks = chunks
+        self.postings = postings
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, results: dict) -> "RetrievalIndex":
+        chunks = chunk_results(results)
+        postings: dict[str, list[list[int]]] = {}
+        lengths = []
+        for i, chunk in enumerate(chunks):
+            # Source and section names are searchable too ("github", "experiences", ...)
+            terms = tokenize(f"{chunk.source} {chunk.section} {chunk.text}")
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append([i, tf])
+        return cls(chunks, postings, lengths)
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": 1,
+            "chunks": [c.to_list() for c in self.chunks],
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RetrievalIndex":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([Chunk(*c) for c in data["chunks"]], data["postings"], data["lengths"])
+
+    def scores(self, query: str) -> dict[int, float]:
+        n = len(self.chunks)
+        scores: dict[int, float] = {}
+        terms = set()
+        for word in re.findall(r"\w+", query.lower()):
+            terms.update(tokenize(" ".join([word, *QUERY_EXPANSIONS.get(word, [])])))
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def search(self, query: str, k: int = 8, budget: int|None = 2000) -> list[tuple[Chunk, float]]:
+        """Top `k` passages for `query`, best first, whose total size fits `budget` tokens."""
+        ranked = sorted(self.scores(query).items(), key=lambda x: x[1], reverse=True)
+        hits, used = [], 0
+        for i, score in ranked:
+            if len(hits) == k:
+                break
+            tokens = count_tokens(self.chunks[i].render())
+            if budget is not None and used + tokens > budget:
+                continue
+            hits.append((self.chunks[i], score))
+            used += tokens
+        return hits
+
+
+def render_hits(hits: list[tuple[Chunk, float]]) -> str:
+    return "\n\n".join(chunk.render() for chunk, _ in hits)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query a user's retrieval index (out/<name>.index.json.gz).")
+    parser.add_argument("index")
+    parser.add_argument("query")
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=2000, help="max tokens of the returned passages")
+    args = parser.parse_args()
+    index = RetrievalIndex.load(args.index)
+    for chunk, score in index.search(args.query, k=args.k, budget=args.budget):
+        print(f"{score:6.2f}  {chunk.render()}\n")
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import asyncio
+import contextlib
+from urllib.parse import urlparse
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from src.customizations.base_customization import BaseCustomization
+
+
+class DomainLimit(BaseModel):
+    max_concurrent: int = 3
+    per_minute: float|None = None  # job starts per minute (token bucket), None = unlimited
+    burst: int = 1
+
+
+DEFAULT_DOMAIN_LIMITS = {
+    "linkedin.com": DomainLimit(max_concurrent=1, per_minute=2),
+    "x.com": DomainLimit(max_concurrent=1, per_minute=2),
+    "github.com": DomainLimit(max_concurrent=2, per_minute=10, burst=2),
+    "huggingface.co": DomainLimit(max_concurrent=2, per_minute=10, burst=2),
+}
+
+
+def job_domain(builder: BaseCustomization) -> str:
+    # The allowed domain matching the link, so that e.g. gitlab links don't count as github.com
+    netloc = urlparse(builder.link.url).netloc.lower().removeprefix("www.")
+    for pattern in builder.allowed_domains or []:
+        domain = pattern.removeprefix("*.")
+        if netloc == domain or netloc.endswith(f".{domain}"):
+            return domain
+    return netloc
+
+
+class TokenBucket():
+    def __init__(self, per_minute: float, burst: int = 1) -> None:
+        self.rate = per_minute / 60
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+class DurationHistory():
+    """Exponential moving average of past job durations per customization."""
+
+    def __init__(self, path: str|None = None, seconds_per_step: float = 4.0, alpha: float = 0.3) -> None:
+        self.path = path
+        self.seconds_per_step = seconds_per_step
+        self.alpha = alpha
+        self.durations: dict[str, float] = {}
+        if path and os.path.exists(path):
+            with contextlib.suppress(Exception), open(path, "r") as f:
+                self.durations = json.load(f)
+
+    def estimate(self, builder: BaseCustomization) -> float:
+        if builder.name in self.durations:
+            return self.durations[builder.name]
+        return builder.max_steps * self.seconds_per_step
+
+    def record(self, builder: BaseCustomization, seconds: float) -> None:
+        prev = self.durations.get(builder.name)
+        self.durations[builder.name] = seconds if prev is None else self.alpha * seconds + (1 - self.alpha) * prev
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.durations, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Scheduler():
+    """Run jobs on `n_workers` slots, longest expected job first (LPT).
+
+    A job only starts when its domain is below its concurrency limit and its
+    token bucket has a token; otherwise the next-longest runnable job starts.
+    A job's duration is only recorded if its coroutine returns True, so that
+    failures and fast API extractions don't skew the estimates.
+
+    A job that runs several agents (fan-out) takes one `domain_slot()` per
+    extra agent, under the same limits, and `lends_slot()` its own meanwhile.
+    """
+
+    def __init__(
+        self,
+        n_workers: int,
+        history: DurationHistory|None = None,
+        domain_limits: dict[str, DomainLimit]|None = None,
+        default_limit: DomainLimit = DomainLimit(),
+    ) -> None:
+        self.n_workers = n_workers
+        self.history = history or DurationHistory()
+        self.domain_limits = DEFAULT_DOMAIN_LIMITS if domain_limits is None else domain_limits
+        self.default_limit = default_limit
+        self._running: dict[str, int] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._changed = asyncio.Condition()
+
+    def limit_for(self, domain: str) -> DomainLimit:
+        return self.domain_limits.get(domain, self.default_limit)
+
+    async def run(self, jobs: list[tuple[BaseCustomization, Callable[[], Awaitable]]]) -> None:
+        # jobs: (builder, zero-arg coroutine factory returning whether to record the duration)
+        pending = sorted(jobs, key=lambda j: self.history.estimate(j[0]), reverse=True)
+        changed = self._changed
+
+        async def worker():
+            while True:
+                async with changed:
+                    while True:
+                        if not pending:
+                            return
+                        job, wait = self._pick(pending)
+                        if job is not None:
+                            break
+                        # Nothing runnable: wait for a job to finish or a token to refill
+                        with contextlib.suppress(asyncio.TimeoutError):
+                            await asyncio.wait_for(changed.wait(), timeout=wait)
+                    pending.remove(job)
+                    builder, factory = job
+                    domain = job_domain(builder)
+                    self._start(domain)
+
+                start = time.monotonic()
+                timed = False
+                try:
+                    timed = await factory()
+                finally:
+                    if timed is True:
+                        self.history.record(builder, time.monotonic() - start)
+                    async with changed:
+                        self._running[domain] -= 1
+                        changed.notify_all()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.n_workers)))
+        finally:
+            self.history.save()
+
+    @contextlib.asynccontextmanager
+    async def domain_slot(self, builder: BaseCustomization):
+        # One more agent for a running job of `builder`'s domain, once the domain's limits allow it
+        domain = job_domain(builder)
+        async with self._changed:
+            while (wait := self._wait_time(domain)) != 0.0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            self._start(domain)
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._running[domain] -= 1
+                self._changed.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def lends_slot(self, builder: BaseCustomization):
+        # A job only waiting for its sub-agents doesn't count against its domain meanwhile
+        domain = job_domain(builder)
+        async with self._changed:
+            self._running[domain] -= 1
+            self._changed.notify_all()
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._running[domain] += 1
+
+    def _start(self, domain: str) -> None:
+        self._running[domain] = self._running.get(domain, 0) + 1
+        if domain in self._buckets:
+            self._buckets[domain].take()
+
+    def _wait_time(self, domain: str) -> float|None:
+        # 0: can start now; None: at its concurrency limit; else seconds until its bucket has a token
+        limit = self.limit_for(domain)
+        if self._running.get(domain, 0) >= limit.max_concurrent:
+            return None
+        if limit.per_minute:
+            return self._buckets.setdefault(domain, TokenBucket(limit.per_minute, limit.burst)).wait_time()
+        return 0.0
+
+    def _pick(self, pending: list) -> tuple[tuple|None, float|None]:
+        min_wait = None
+        for job in pending:
+            wait = self._wait_time(job_domain(job[0]))
+            if wait == 0.0:
+                return job, None
+            if wait is not None:
+                min_wait = wait if min_wait is None else min(min_wait, wait)
+        return None, min_wait
+
+
+def simulate(durations: list[float], n_workers: int, longest_first: bool = True) -> float:
+    # Makespan of list-scheduling `durations` on identical workers (no domain limits)
+    queue = sorted(durations, reverse=True) if longest_first else list(durations)
+    free_at = [0.0] * n_workers
+    for d in queue:
+        i = free_at.index(min(free_at))
+        free_at[i] += d
+    return max(free_at, default=0.0)
+
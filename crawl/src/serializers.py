@@ -0,0 +1,263 @@
+import re
+import json
+
+# Plain (unquoted) keys and scalars of the compact formats
+_PLAIN_KEY = re.compile(r"[A-Za-z_][\w\-]*")
+_NUMBER = re.compile(r"-?\d+(\.\d+)?([eE][+-]?\d+)?")
+_TABLE_HEADER = re.compile(r"\[(\d+)\]\{(.*)\}:")
+INDENT = "  "
+
+
+class Serializer():
+    """Text encoding of a source's results in the markdown artifact.
+
+    `fence` is the language of the code block the text goes into;
+    `loads(dumps(x)) == x` for anything json.loads() can return.
+    """
+    name = ""
+    fence = ""
+
+    def dumps(self, value) -> str:
+        raise NotImplementedError
+
+    def loads(self, text: str):
+        raise NotImplementedError
+
+
+class IndentedJson(Serializer):
+    name = "json-indent"
+    fence = "json"
+
+    def dumps(self, value) -> str:
+        return json.dumps(value, indent=2)
+
+    def loads(self, text: str):
+        return json.loads(text)
+
+
+class MinifiedJson(Serializer):
+    name = "json"
+    fence = "json"
+
+    def dumps(self, value) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(self, text: str):
+        return json.loads(text)
+
+
+class CompactYaml(Serializer):
+    """YAML-like: `key: value` lines, `- ` list items, two-space indentation.
+
+    Strings are only quoted (as JSON strings) when they would be ambiguous:
+    empty, multi-line, numeric-looking, `null`/`true`/`false`, ... With
+    `tables=True`, lists of objects that all have the same keys become
+    `key[n]{a,b,c}:` followed by one comma-separated row per object, so the
+    keys are written once instead of once per item.
+    """
+    fence = "yaml"
+
+    def __init__(self, tables: bool = False) -> None:
+        self.tables = tables
+        self.name = "table" if tables else "yaml"
+
+    # ---------------------------------
+    # Encoding
+    # ---------------------------------
+    def dumps(self, value) -> str:
+        if isinstance(value, (dict, list)) and value:
+            return "\n".join(self._block(value, 0))
+        return self._scalar(value)
+
+    def _block(self, value, depth: int) -> list[str]:
+        pad = INDENT * depth
+        lines = []
+        if isinstance(value, dict):
+            for k, v in value.items():
+                key = _key(k)
+                if self._is_table(v):
+                    fields = list(v[0])
+                    lines.append(f"{pad}{key}[{len(v)}]{{{','.join(_key(f) for f in fields)}}}:")
+                    lines += [f"{pad}{INDENT}{','.join(self._cell(row[f]) for f in fields)}" for row in v]
+                elif isinstance(v, (dict, list)) and v:
+                    lines.append(f"{pad}{key}:")
+                    lines += self._block(v, depth + 1)
+                else:
+                    lines.append(f"{pad}{key}: {self._scalar(v)}")
+            return lines
+
+        for item in value:
+            if isinstance(item, (dict, list)) and item:
+                inner = self._block(item, depth + 1)
+                # "- " takes the place of the first line's indentation
+                lines.append(f"{pad}- {inner[0][len(pad) + len(INDENT):]}" if isinstance(item, dict) else f"{pad}-")
+                lines += inner[1:] if isinstance(item, dict) else inner
+            else:
+                lines.append(f"{pad}- {self._scalar(item)}")
+        return lines
+
+    def _is_table(self, value) -> bool:
+        if not self.tables or not isinstance(value, list) or len(value) < 2:
+            return False
+        if not all(isinstance(v, dict) and v for v in value):
+            return False
+        keys = list(value[0])
+        return all(list(v) == keys for v in value[1:])
+
+    def _scalar(self, value) -> str:
+        if isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False) if _needs_quotes(value) else value
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    def _cell(self, value) -> str:
+        if isinstance(value, str) and "," in value:
+            return json.dumps(value, ensure_ascii=False)
+        return self._scalar(value)
+
+    # ---------------------------------
+    # Decoding
+    # ---------------------------------
+    def loads(self, text: str):
+        lines = [line for line in text.split("\n") if line.strip()]
+        if not lines:
+            return ""
+        if len(lines) == 1 and not _is_entry(lines[0].strip()):
+            return _parse_scalar(lines[0].strip())
+        value, _ = _parse_block(lines, 0, 0)
+        return value
+
+
+def _key(k: str) -> str:
+    return k if _PLAIN_KEY.fullmatch(k) else json.dumps(k, ensure_ascii=False)
+
+
+def _needs_quotes(s: str) -> bool:
+    return (
+        s == "" or s != s.strip() or "\n" in s or ": " in s or s.endswith(":")
+        or s[0] in "-[{\"'#" or s in ("null", "true", "false") or bool(_NUMBER.fullmatch(s))
+    )
+
+
+def _parse_scalar(s: str):
+    if s in ("null", "true", "false") or _NUMBER.fullmatch(s) or s[:1] in "\"[{":
+        return json.loads(s)
+    return s
+
+
+def _leading_key(line: str) -> tuple[str, str]|None:
+    # The key a line starts with, and the rest of the line
+    if line.startswith('"'):
+        key, end = json.JSONDecoder().raw_decode(line)
+        return key, line[end:]
+    if match := _PLAIN_KEY.match(line):
+        return match.group(), line[match.end():]
+    return None
+
+
+def _split_key(line: str) -> tuple[str, str]|None:
+    # `key: value` / `key:` -> (key, value); None for a plain scalar
+    if (parsed := _leading_key(line)) is None:
+        return None
+    key, rest = parsed
+    if rest == ":":
+        return key, ""
+    if rest.startswith(": "):
+        return key, rest[2:]
+    return None
+
+
+def _split_table(line: str) -> tuple[str, int, list[str]]|None:
+    # `key[n]{a,b}:` -> (key, n, fields)
+    if (parsed := _leading_key(line)) is None:
+        return None
+    key, rest = parsed
+    if not (match := _TABLE_HEADER.fullmatch(rest)):
+        return None
+    return key, int(match.group(1)), [_parse_key(f) for f in _split_row(match.group(2))]
+
+
+def _is_entry(line: str) -> bool:
+    return line.startswith("- ") or line == "-" or _split_key(line) is not None or _split_table(line) is not None
+
+
+def _depth(line: str) -> int:
+    return (len(line) - len(line.lstrip(" "))) // len(INDENT)
+
+
+def _parse_block(lines: list[str], i: int, depth: int):
+    # A list if the block starts with "- ", a dict otherwise
+    if lines[i].strip().startswith("-"):
+        return _parse_list(lines, i, depth)
+    return _parse_dict(lines, i, depth)
+
+
+def _parse_dict(lines: list[str], i: int, depth: int, first: str|None = None):
+    result = {}
+    while i < len(lines) or first is not None:
+        if first is not None:
+            line, first = first, None
+        elif _depth(lines[i]) < depth:
+            break
+        else:
+            line = lines[i].strip()
+            i += 1
+        if table := _split_table(line):
+            key, n, fields = table
+            rows = []
+            for _ in range(n):
+                cells = _split_row(lines[i].strip())
+                rows.append({f: _parse_scalar(c) for f, c in zip(fields, cells)})
+                i += 1
+            result[key] = rows
+            continue
+        key, rest = _split_key(line)
+        if rest:
+            result[key] = _parse_scalar(rest)
+        else:
+            result[key], i = _parse_block(lines, i, depth + 1)
+    return result, i
+
+
+def _parse_list(lines: list[str], i: int, depth: int):
+    result = []
+    while i < len(lines) and _depth(lines[i]) == depth and lines[i].strip().startswith("-"):
+        line = lines[i].strip()
+        i += 1
+        if line == "-":
+            item, i = _parse_block(lines, i, depth + 1)
+        elif _split_key(line[2:]) is not None or _split_table(line[2:]) is not None:
+            item, i = _parse_dict(lines, i, depth + 1, first=line[2:])
+        else:
+            item = _parse_scalar(line[2:])
+        result.append(item)
+    return result, i
+
+
+def _parse_key(s: str) -> str:
+    return json.loads(s) if s.startswith('"') else s
+
+
+def _split_row(row: str) -> list[str]:
+    # Comma-separated cells; quoted cells and inline JSON may contain commas
+    cells, decoder, i = [], json.JSONDecoder(), 0
+    while i <= len(row):
+        if row[i:i + 1] in ('"', "[", "{"):
+            _, end = decoder.raw_decode(row, i)
+        else:
+            end = row.find(",", i)
+            end = len(row) if end == -1 else end
+        cells.append(row[i:end])
+        i = end + 1
+    return cells
+
+
+DEFAULT_FORMAT = "json-indent"
+SERIALIZERS: dict[str, Serializer] = {
+    s.name: s for s in (IndentedJson(), MinifiedJson(), CompactYaml(), CompactYaml(tables=True))
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown output format {name!r}, expected one of {list(SERIALIZERS)}")
+    return SERIALIZERS[name]
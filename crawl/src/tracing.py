@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+import contextlib
+import contextvars
+import statistics
+from collections import defaultdict
+
+from loguru import logger
+
+
+# Gemini 2.5 Flash list prices, USD per 1M tokens
+DEFAULT_INPUT_PRICE = 0.30
+DEFAULT_OUTPUT_PRICE = 2.50
+
+
+class Span():
+    def __init__(self, tracer: "Tracer|None", name: str, parent: "Span|None", attrs: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration: float|None = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, **counters) -> None:
+        # Counters bubble up, so a source span sums the tokens of all its steps
+        span = self
+        while span is not None:
+            for k, v in counters.items():
+                span.attrs[k] = span.attrs.get(k, 0) + v
+            span = span.parent
+
+    def finish(self, error: BaseException|None = None) -> None:
+        self.duration = time.perf_counter() - self._t0
+        if error is not None:
+            self.attrs["error"] = repr(error)
+        if self.tracer is not None:
+            self.tracer.write(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer():
+    """Append finished spans to a JSONL file as soon as they end."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+_tracer: Tracer|None = None
+_current: contextvars.ContextVar[Span|None] = contextvars.ContextVar("askthebio_span", default=None)
+
+
+def set_tracer(tracer: Tracer|None) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def current_span() -> Span|None:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    # Works in sync and async code: child tasks inherit the current span
+    s = Span(_tracer, name, _current.get(), attrs)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.finish(error=e)
+        raise
+    else:
+        s.finish()
+    finally:
+        _current.reset(token)
+
+
+# ---------------------------------
+# browser-use integration
+# ---------------------------------
+class TracedChatModel():
+    """Wrap a browser-use chat model to record latency and token usage per call."""
+
+    def __init__(self, llm) -> None:
+        self.llm = llm
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    async def ainvoke(self, messages, output_format=None):
+        with span("llm", model=self.llm.model) as s:
+            response = await self.llm.ainvoke(messages, output_format)
+            usage = response.usage
+            s.set(
+                input_tokens=usage.prompt_tokens if usage else 0,
+                output_tokens=usage.completion_tokens if usage else 0,
+                cached_tokens=(usage.prompt_cached_tokens or 0) if usage else 0,
+            )
+        if s.parent is not None:
+            s.parent.add(
+                llm_s=s.duration,
+                llm_calls=1,
+                input_tokens=s.attrs["input_tokens"],
+                output_tokens=s.attrs["output_tokens"],
+            )
+        return response
+
+
+def trace_controller(controller):
+    # Time every action (built-in and custom ones like get_github_code)
+    act = controller.act
+
+    async def traced_act(action, browser_session, *args, **kwargs):
+        names = list(action.model_dump(exclude_unset=True).keys())
+        with span("action", action=",".join(names)) as s:
+            result = await act(action, browser_session, *args, **kwargs)
+        if s.parent is not None:
+            s.parent.add(action_s=s.duration, actions=1)
+        return result
+
+    controller.act = traced_act
+    return controller
+
+
+class StepTracer():
+    """`on_step_start` / `on_step_end` hooks for Agent.run() that open one span per step.
+
+    Whatever part of the step is neither LLM nor action time is reported as
+    `browser_state_s`: DOM/screenshot capture and page-load waits.
+    """
+
+    def __init__(self) -> None:
+        self._open: dict[int, tuple[Span, contextvars.Token]] = {}
+
+    async def on_step_start(self, agent) -> None:
+        s = Span(_tracer, "agent.step", _current.get(), {"step": agent.state.n_steps})
+        self._open[id(agent)] = (s, _current.set(s))
+
+    async def on_step_end(self, agent) -> None:
+        s, token = self._open.pop(id(agent))
+        _current.reset(token)
+        elapsed = time.perf_counter() - s._t0
+        s.set(browser_state_s=max(0.0, elapsed - s.attrs.get("llm_s", 0) - s.attrs.get("action_s", 0)))
+        s.finish()
+        if s.parent is not None:
+            s.parent.add(steps=1)
+
+
+# ---------------------------------
+# Summary CLI
+# ---------------------------------
+def load_spans(path: str) -> list[dict]:
+    spans = {}
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                d = json.loads(line)
+                spans[d["span_id"]] = d
+    return list(spans.values())
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def summarize(spans: list[dict], input_price: float = DEFAULT_INPUT_PRICE, output_price: float = DEFAULT_OUTPUT_PRICE) -> str:
+    by_id = {s["span_id"]: s for s in spans}
+
+    def source_of(s: dict) -> dict|None:
+        while s is not None and s["name"] != "source":
+            s = by_id.get(s["parent_id"])
+        return s
+
+    steps = defaultdict(list)
+    for s in spans:
+        if s["name"] == "agent.step":
+            src = source_of(s)
+            steps[src["span_id"] if src else None].append(s)
+
+    lines = [f"{'source':<45} {'time':>8} {'steps':>6} {'p50':>7} {'p95':>7} {'in_tok':>9} {'out_tok':>8} {'cost$':>7}"]
+    total_cost = 0.0
+    for src in sorted((s for s in spans if s["name"] == "source"), key=lambda s: -s["duration"]):
+        a = src["attrs"]
+        latencies = [st["duration"] for st in steps[src["span_id"]]]
+        cost = a.get("input_tokens", 0) / 1e6 * input_price + a.get("output_tokens", 0) / 1e6 * output_price
+        total_cost += cost
+        lines.append(
+            f"{a.get('url', '?')[:45]:<45} {src['duration']:>7.1f}s {len(latencies):>6} "
+            f"{percentile(latencies, 50):>6.1f}s {percentile(latencies, 95):>6.1f}s "
+            f"{a.get('input_tokens', 0):>9} {a.get('output_tokens', 0):>8} {cost:>7.3f}"
+        )
+
+    all_steps = [s for ss in steps.values() for s in ss]
+    if all_steps:
+        latencies = [s["duration"] for s in all_steps]
+        lines.append("")
+        lines.append(
+            f"steps: {len(all_steps)}, p50 {percentile(latencies, 50):.1f}s, p95 {percentile(latencies, 95):.1f}s; "
+            f"per step llm {sum(s['attrs'].get('llm_s', 0) for s in all_steps) / len(all_steps):.1f}s, "
+            f"actions {sum(s['attrs'].get('action_s', 0) for s in all_steps) / len(all_steps):.1f}s, "
+            f"browser state {sum(s['attrs'].get('browser_state_s', 0) for s in all_steps) / len(all_steps):.1f}s"
+        )
+
+    phases = defaultdict(float)
+    for s in spans:
+        if s["name"] in ("browser.launch", "profile.copy", "extractor", "agent.run"):
+            phases[s["name"]] += s["duration"]
+    if phases:
+        lines.append("phases (summed over parallel work): " + ", ".join(f"{k} {v:.1f}s" for k, v in phases.items()))
+    lines.append(f"total cost: ${total_cost:.3f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a crawl trace (JSONL).")
+    parser.add_argument("trace")
+    parser.add_argument("--input-price", type=float, default=DEFAULT_INPUT_PRICE, help="USD per 1M input tokens")
+    parser.add_argument("--output-price", type=float, default=DEFAULT_OUTPUT_PRICE, help="USD per 1M output tokens")
+    args = parser.parse_args()
+    if not os.path.exists(args.trace):
+        logger.error(f"No trace at {args.trace}")
+        sys.exit(1)
+    print(summarize(load_spans(args.trace), args.input_price, args.output_price))
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import contextlib
+
+from pydantic import BaseModel
+
+from src.models import UserInput
+from src.manifest import digest
+
+# pending -> leased -> done | failed; a leased job whose lease expires is pending again
+STATUSES = ("pending", "leased", "done", "failed")
+
+
+class Job(BaseModel):
+    id: int
+    user: UserInput
+    link: int             # index in user.links
+    out_path: str
+    status: str
+    attempts: int
+    worker: str|None = None
+    result: dict|None = None
+    error: str|None = None
+
+
+class JobQueue():
+    """Durable queue of per-source crawl jobs in one SQLite file, shared by processes.
+
+    Workers `lease()` a job for `lease_seconds` and keep it with `heartbeat()`;
+    a lease that is not renewed (dead or stuck worker) expires and the job is
+    leased again, up to `max_attempts` times. `complete()` stores the result,
+    which the coordinator picks up with `collect()`.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, timeout: float = 30.0) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit, with explicit BEGIN IMMEDIATE where a read decides a write
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, user TEXT, link INTEGER, url TEXT, out_path TEXT, "
+            "priority REAL, status TEXT, attempts INTEGER DEFAULT 0, worker TEXT, lease_until REAL, "
+            "result TEXT, error TEXT, collected INTEGER DEFAULT 0, enqueued_at REAL, finished_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority)")
+
+    def enqueue(self, user: UserInput, link: int, out_path: str, priority: float = 0.0) -> int:
+        # A job for the same source still pending or running (e.g. coordinator restarted) is reused;
+        # a finished one nobody collected is stale (the coordinator decided to recrawl), so it is dropped
+        key = digest(out_path, user.name, user.links[link].url)
+        with self._transaction():
+            self._expire(time.time())
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE key = ? AND collected = 0 AND status IN ('pending', 'leased')", (key,)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            self._db.execute("UPDATE jobs SET collected = 1 WHERE key = ? AND collected = 0", (key,))
+            cursor = self._db.execute(
+                "INSERT INTO jobs (key, user, link, url, out_path, priority, status, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, 'pending', ?)",
+                (key, user.model_dump_json(), link, user.links[link].url, out_path, priority, time.time()),
+            )
+            return cursor.lastrowid
+
+    def lease(self, worker: str, lease_seconds: float) -> Job|None:
+        # Longest expected job first, like the Scheduler
+        now = time.time()
+        with self._transaction():
+            self._expire(now)
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE status = 'pending' ORDER BY priority DESC, id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, row[0]),
+            )
+        return self.get(row[0])
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float) -> bool:
+        # False if the lease was lost: the job is someone else's now
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: dict|None, error: str|None = None) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (
+                    "done" if result is not None else "failed",
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    worker,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def collect(self, ids: list[int]) -> list[Job]:
+        # Finished jobs among `ids` not collected yet, marked collected
+        if not ids:
+            return []
+        with self._transaction():
+            self._expire(time.time())
+            marks = ",".join("?" * len(ids))
+            rows = self._db.execute(
+                f"SELECT id FROM jobs WHERE id IN ({marks}) AND status IN ('done', 'failed') AND collected = 0", ids
+            ).fetchall()
+            self._db.executemany("UPDATE jobs SET collected = 1 WHERE id = ?", rows)
+        return [self.get(row[0]) for row in rows]
+
+    def get(self, job_id: int) -> Job:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, user, link, out_path, status, attempts, worker, result, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job(
+            id=row[0],
+            user=UserInput.model_validate_json(row[1]),
+            link=row[2],
+            out_path=row[3],
+            status=row[4],
+            attempts=row[5],
+            worker=row[6],
+            result=json.loads(row[7]) if row[7] else None,
+            error=row[8],
+        )
+
+    def counts(self) -> dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        with self._lock:
+            counts.update(dict(self._db.execute("SELECT status, COUNT(*) FROM jobs WHERE collected = 0 GROUP BY status")))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ---------------------------------
+    # Internals
+    # ---------------------------------
+    def _expire(self, now: float) -> None:
+        self._db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease expired ' || attempts || ' times', finished_at = ? "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        )
+        self._db.execute(
+            "UPDATE jobs SET status = 'pending', worker = NULL WHERE status = 'leased' AND lease_until < ?", (now,)
+        )
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't lease the same job
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
@@ -0,0 +1,49 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # GET /<path>?<query> -> <root>/<path>.json or .html (/ is index.html), else <root>/<path> as text; the query is ignored
+    root = FIXTURES
+
+    def do_GET(self):
+        path = os.path.join(self.root, urlparse(self.path).path.strip("/") or "index")
+        candidates = ((f"{path}.json", "application/json"), (f"{path}.html", "text/html; charset=utf-8"), (path, "text/plain; charset=utf-8"))
+        for file, content_type in candidates:
+            if os.path.isfile(file):
+                with open(file, "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_stub():
+    """Local HTTP server of recorded API responses: call it with a fixtures dir, get its base URL."""
+    servers = []
+
+    def serve(root: str = FIXTURES) -> str:
+        handler = type("Handler", (FixtureHandler,), {"root": root})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,41 @@
+import asyncio
+import contextlib
+
+from src.models import Link, UserInput
+from src.crawl import UserCrawl, customization_for
+from src.budgets import Deadline
+from benchmarks.scripted_llm import ScriptedChatModel
+
+
+class QueuedPool():
+    """One browser, free only after `wait` seconds; records whether its job was cancelled in it."""
+
+    size = 1
+
+    def __init__(self, wait: float) -> None:
+        self.wait = wait
+        self.interrupted = False
+
+    @contextlib.asynccontextmanager
+    async def browser(self):
+        await asyncio.sleep(self.wait)
+        try:
+            yield object()
+        except (asyncio.CancelledError, TimeoutError):
+            self.interrupted = True
+            raise
+
+
+def test_agent_out_of_time_while_queued_leaves_its_browser_alone(tmp_path):
+    user = UserInput(name="Ada Lovelace", links=[Link(url="https://ada.example.org", description="")], texts=[], docs=[])
+    crawl = UserCrawl(user, str(tmp_path), llm_factory=lambda: ScriptedChatModel(scrolls=1, latency=0.0))
+    builder = customization_for(user.links[0], str(tmp_path))
+    pool = QueuedPool(wait=0.3)
+
+    history = asyncio.run(crawl.run_agent(
+        builder, pool, "Crawl the website.", crawl.controller(builder, builder.result_class()), 5, 900.0, Deadline(0.2),
+    ))
+    assert history.number_of_steps() == 0
+    assert builder in crawl.partial
+    # No step ran: the browser doesn't need replacing
+    assert not pool.interrupted
@@ -0,0 +1,54 @@
+from src.context import compile_context, count_tokens
+
+
+def results() -> dict:
+    bio = "Mathematician and writer, known for her notes on the Analytical Engine of Charles Babbage (1843)."
+    return {
+        "x": {"bio": bio, "posts": [{"text": f"Post {i} " + "about engines " * 30} for i in range(8)]},
+        "linkedin": {
+            "about": bio,
+            "experiences": [{"job_title": "Translator", "company": "Scientific Memoirs", "location": "N/A"}],
+            "skills": [],
+        },
+        "github": {
+            "experiences": [{"job_title": "translator", "company": "Scientific-Memoirs", "start": "1842"}],
+            "repositories": [{"name": f"repo-{i}", "readme": f"Cards of engine program {i}. " * 20} for i in range(10)],
+        },
+    }
+
+
+def test_duplicates_and_placeholders_are_removed_and_merged():
+    compiled = compile_context("Ada Lovelace", results(), budget=100_000)
+    md = compiled.markdown
+
+    # The bio is kept in the highest-priority source only
+    assert md.count("notes on the Analytical Engine") == 1
+    # The same job from GitHub is merged into LinkedIn's, which gets its missing start date
+    assert md.count("Translator") == 1 and "translator" not in md
+    assert '"start":"1842"' in md
+    assert "N/A" not in md and "skills" not in md
+    assert compiled.deduplicated == 2
+    assert compiled.dropped == []
+    # Sections in priority order
+    assert md.index("## linkedin") < md.index("## github") < md.index("## x")
+
+
+def test_over_budget_the_lowest_priority_sources_shrink_then_drop():
+    full = compile_context("Ada Lovelace", results(), budget=100_000)
+
+    shrunk = compile_context("Ada Lovelace", results(), budget=full.tokens_after - 200)
+    assert shrunk.tokens_after <= full.tokens_after - 200
+    assert shrunk.dropped == []
+    # Only X, the lowest priority, lost posts; GitHub is whole
+    assert 0 < shrunk.markdown.count("Post ") < 8
+    assert shrunk.markdown.count("repo-") == 10
+
+    tight = compile_context("Ada Lovelace", results(), budget=300)
+    assert tight.tokens_after <= 300
+    # X can't shrink any further and goes, then GitHub shrinks
+    assert tight.dropped == ["x"]
+    assert "## x" not in tight.markdown and 0 < tight.markdown.count("repo-") < 10
+    assert "Scientific Memoirs" in tight.markdown
+    assert count_tokens(tight.markdown) == tight.tokens_after
+
+    assert compile_context("Ada Lovelace", results(), budget=80).dropped == ["x", "github"]
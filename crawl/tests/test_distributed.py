@@ -0,0 +1,41 @@
+import os
+import asyncio
+
+from src.models import Link, UserInput
+from src.distributed import Worker
+
+
+def user(name: str) -> UserInput:
+    return UserInput(name=name, links=[Link(url="https://example.org", description="")], texts=[], docs=[])
+
+
+def test_each_out_path_keeps_its_own_step_history(tmp_path):
+    worker = Worker(str(tmp_path / "queue.sqlite"))
+    queue = worker.queue
+    jobs = [queue.get(queue.enqueue(user(name), 0, str(tmp_path / out))) for name, out in (("Ada", "a"), ("Charles", "b"), ("Mary", "a"))]
+    crawls = [worker._crawl_for(job) for job in jobs]
+    worker.queue.close()
+
+    assert crawls[0].step_history is crawls[2].step_history
+    assert crawls[1].step_history.path == os.path.join(str(tmp_path / "b"), ".step_history.json")
+    assert crawls[0].step_history.path == os.path.join(str(tmp_path / "a"), ".step_history.json")
+
+
+def test_a_crashing_job_is_marked_failed_and_the_worker_goes_on(tmp_path):
+    worker = Worker(str(tmp_path / "queue.sqlite"), lease_seconds=60.0)
+    queue = worker.queue
+    ids = [queue.enqueue(user(name), 0, str(tmp_path / "out")) for name in ("Ada", "Charles")]
+
+    async def crash(builder, pool):
+        raise RuntimeError("unexpected")
+
+    async def run():
+        for _ in ids:
+            job = queue.lease(worker.id, worker.lease_seconds)
+            worker._crawl_for(job).crawl_source = crash
+            await worker.run_job(job, pool=None)
+
+    asyncio.run(run())
+    jobs = queue.collect(ids)
+    queue.close()
+    assert [(j.status, j.error) for j in jobs] == [("failed", "RuntimeError('unexpected')")] * 2
@@ -0,0 +1,11 @@
+from src.documents import _url_name
+
+
+def test_url_without_extension_takes_it_from_the_content_type():
+    assert _url_name("https://example.org/", "application/pdf") == "document.pdf"
+    assert _url_name(
+        "https://example.org/cv/download", "application/vnd.openxmlformats-officedocument.wordprocessingml.document; charset=binary"
+    ) == "download.docx"
+    # The URL's own extension wins, an unknown type adds nothing
+    assert _url_name("https://example.org/cv.pdf", "text/html") == "cv.pdf"
+    assert _url_name("https://example.org/cv", "") == "cv"
@@ -0,0 +1,15 @@
+import asyncio
+
+import pytest
+
+from src.browser_settings import find_chrome
+from benchmarks.e2e_crawl import check, run
+
+CHROME = find_chrome()
+
+
+@pytest.mark.skipif(CHROME is None, reason="no Chromium: set CHROME_PATH or put chromium on PATH")
+def test_offline_crawl_of_the_fixture_user():
+    # benchmarks.e2e_crawl at concurrency 1 and 2: fixture sites, scripted LLM, headless Chromium
+    runs = asyncio.run(run(CHROME, max_concurrency=2, llm_latency=0.0))
+    assert check(runs) == []
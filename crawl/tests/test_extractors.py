@@ -0,0 +1,204 @@
+import os
+import json
+import shutil
+import asyncio
+
+from browser_use.llm.views import ChatInvokeCompletion
+
+from src.http_client import HttpClient
+from src.extractors import GitHubExtractor, HuggingFaceExtractor, WebsiteExtractor
+from src.customizations.website import WebsiteResult
+from src.customizations.huggingface import HFPapers, HFWriting, Reference
+from src.models import Link, UserInput
+from src.crawl import UserCrawl, customization_for
+from src.budgets import Deadline
+from src.extractors.github import GitHubSummaries, RepoSummary
+from src.extractors.huggingface import HFSummaries, NamedSummary
+from tests.conftest import FIXTURES
+
+
+class FixedLLM():
+    """Answers each structured call with the fixed instance of its model."""
+
+    def __init__(self, *answers) -> None:
+        self.answers = {type(a): a for a in answers}
+        self.prompts = []
+
+    async def ainvoke(self, messages, output_format=None):
+        self.prompts.append(messages[-1].content)
+        return ChatInvokeCompletion(completion=self.answers[output_format], usage=None)
+
+
+def extract(extractor, url: str, llm: FixedLLM):
+    async def run():
+        try:
+            return await extractor.extract(url, "Ada Lovelace", llm)
+        finally:
+            await extractor.client.aclose()
+    return asyncio.run(run())
+
+
+def github(base: str) -> GitHubExtractor:
+    return GitHubExtractor(api_base=base, web_base=base, client=HttpClient(cache_dir=None, retries=0))
+
+
+GITHUB_SUMMARIES = GitHubSummaries(
+    repositories=[
+        RepoSummary(name="analytical-engine", readme_summary="Note G programs.", code_overview="Python interpreter of engine cards."),
+        RepoSummary(name="notes-on-babbage", readme_summary="", code_overview="LaTeX sources."),
+    ],
+    profile_summary="Writes programs for the Analytical Engine.",
+)
+
+
+def test_github_from_recorded_api(api_stub):
+    base = api_stub(os.path.join(FIXTURES, "github"))
+    llm = FixedLLM(GITHUB_SUMMARIES)
+    result = extract(github(base), "https://github.com/ada", llm)
+
+    assert result is not None
+    assert result.username == "ada"
+    assert result.location == "London"
+    assert result.contributions_last_year == 1204
+    assert result.socials == "https://ada.example.org, https://www.linkedin.com/in/ada-lovelace, https://x.com/adalovelace"
+    # Forks are neither detailed nor summarized by the LLM
+    assert [r.name for r in result.repositories_detailed] == ["analytical-engine", "notes-on-babbage"]
+    engine = result.repositories_detailed[0]
+    assert engine.stars == 412
+    assert engine.languages == ["Python", "C"]
+    assert engine.license == "MIT"
+    assert engine.last_commit == "2024-10-02T12:00:00Z: Compute B7 with the corrected table"
+    assert engine.code_overview == "Python interpreter of engine cards."
+    assert [(r.name, r.author) for r in result.repositories_basic] == [("difference-engine", "charles")]
+    assert [r.name for r in result.other_people_starred_repos] == ["jacquard-loom"]
+    # The README went to the LLM, the missing one is just empty
+    assert "Note G: Bernoulli numbers" in llm.prompts[0]
+
+
+def test_huggingface_from_recorded_api(api_stub):
+    base = api_stub(os.path.join(FIXTURES, "huggingface"))
+    llm = FixedLLM(HFSummaries(
+        models=[NamedSummary(name="ada/bernoulli-7b", summary="Computes Bernoulli numbers.")],
+        datasets=[NamedSummary(name="ada/punched-cards", summary="Loom cards.")],
+        summary="Active, focused on numerical methods.",
+    ))
+    extractor = HuggingFaceExtractor(api_base=f"{base}/api", web_base=base, client=HttpClient(cache_dir=None, retries=0))
+    result = extract(extractor, "https://huggingface.co/ada", llm)
+
+    assert result is not None
+    assert result.name == "Ada Lovelace"
+    assert result.organizations == ["Analytical Society"]
+    assert result.stats.followers == 321
+    assert result.stats.n_models == 2
+    assert [(m.name, m.size, m.downloads) for m in result.models] == [("ada/bernoulli-7b", "7.2B", 5120), ("ada/note-g-small", "124M", 430)]
+    assert result.models[0].summary == "Computes Bernoulli numbers."
+    assert [(d.name, d.size) for d in result.datasets] == [("ada/punched-cards", "1K<n<10K")]
+    assert result.collections[0].url == f"{base}/collections/ada/engine-programs-66aa01"
+    assert "step by step" in llm.prompts[0]
+    assert [(a.name, a.date) for a in result.recent_activity] == [
+        ("Updated model ada/bernoulli-7b", "2024-09-30T10:00:00.000Z"),
+        ("Updated dataset ada/punched-cards", "2024-08-01T10:00:00.000Z"),
+        ("Updated model ada/note-g-small", "2024-05-11T10:00:00.000Z"),
+    ]
+    # 3 posts and 1 paper on the profile, not in the API: left to the agent, no articles to look for
+    assert extractor.missing(result) == {"posts", "papers"}
+
+
+def test_huggingface_agent_fills_only_what_the_api_lacks(api_stub, tmp_path):
+    base = api_stub(os.path.join(FIXTURES, "huggingface"))
+    extractor = HuggingFaceExtractor(api_base=f"{base}/api", web_base=base, client=HttpClient(cache_dir=None, retries=0))
+    parsed = extract(extractor, "https://huggingface.co/ada", FixedLLM(HFSummaries(models=[], datasets=[], summary="Active.")))
+    user = UserInput(name="Ada Lovelace", links=[Link(url="https://huggingface.co/ada", description="")], texts=[], docs=[])
+    crawl = UserCrawl(user, str(tmp_path))
+    builder = customization_for(user.links[0], str(tmp_path))
+    note = Reference(name="Note G", url="https://huggingface.co/papers/1843", summary="Bernoulli numbers.")
+    outputs = {
+        "papers": HFPapers(papers=[note]),
+        "writing": HFWriting(posts=[note], articles=[], collections=[Reference(name="dup", url="", summary="")]),
+    }
+    ran = []
+
+    async def run_subtask(builder, pool, task, deadline):
+        ran.append(task.key)
+        return outputs[task.key]
+
+    crawl.run_subtask = run_subtask
+    filled = asyncio.run(crawl.fill_in(builder, None, Deadline(), parsed, extractor.missing(parsed)))
+
+    assert sorted(ran) == ["papers", "writing"]
+    assert filled.papers == [note] and filled.posts == [note]
+    # What the API got is kept as is
+    assert filled.collections == parsed.collections
+    assert filled.models == parsed.models
+    assert builder not in crawl.partial
+
+
+def test_unexpected_payloads_fall_back_to_the_agent(api_stub, tmp_path):
+    # A non-JSON body and a repo without its owner: no result, no exception
+    broken = tmp_path / "github"
+    shutil.copytree(os.path.join(FIXTURES, "github"), broken)
+    (broken / "users" / "ada" / "starred.json").write_text("<html>rate limited</html>")
+    assert extract(github(api_stub(str(broken))), "https://github.com/ada", FixedLLM(GITHUB_SUMMARIES)) is None
+
+    shutil.copytree(os.path.join(FIXTURES, "github"), tmp_path / "github-2")
+    repos = json.loads((tmp_path / "github-2" / "users" / "ada" / "repos.json").read_text())
+    del repos[2]["owner"]
+    (tmp_path / "github-2" / "users" / "ada" / "repos.json").write_text(json.dumps(repos))
+    assert extract(github(api_stub(str(tmp_path / "github-2"))), "https://github.com/ada", FixedLLM(GITHUB_SUMMARIES)) is None
+
+    # null where a list was (TypeError), a list where an object was (AttributeError)
+    for name, overview in (("orgs-null", {"orgs": None}), ("list", [])):
+        hf = tmp_path / f"huggingface-{name}"
+        shutil.copytree(os.path.join(FIXTURES, "huggingface"), hf)
+        path = hf / "api" / "users" / "ada" / "overview.json"
+        data = json.loads(path.read_text())
+        path.write_text(json.dumps({**data, **overview} if isinstance(overview, dict) else overview))
+        base = api_stub(str(hf))
+        extractor = HuggingFaceExtractor(api_base=f"{base}/api", web_base=base, client=HttpClient(cache_dir=None, retries=0))
+        assert extract(extractor, "https://huggingface.co/ada", FixedLLM(HFSummaries(models=[], datasets=[], summary=""))) is None
+
+
+def website_result(base: str, summary: str) -> WebsiteResult:
+    return WebsiteResult(root_url=base, root_tag="personal_website", relevant_contents=[], children=[], overall_summary=summary)
+
+
+def test_website_skips_a_few_pages_that_need_javascript(api_stub):
+    base = api_stub(os.path.join(FIXTURES, "website"))
+    llm = FixedLLM(website_result(base, "Mathematician."))
+    extractor = WebsiteExtractor(client=HttpClient(cache_dir=None, retries=0))
+    result = extract(extractor, base, llm)
+
+    assert result is not None
+    # The short page with an analytics script is read, only the empty app shell needs JavaScript
+    assert [p.url for p in extractor.pages if p.js_only] == [f"{base}/app"]
+    assert "Note G, on Bernoulli numbers." in llm.prompts[0]
+    assert "Born in London in 1815." in llm.prompts[0]
+
+
+def test_website_crawl_stays_under_the_linked_path(api_stub):
+    # A profile on a shared host: neither the host's other pages nor other people's
+    base = api_stub(os.path.join(FIXTURES, "website"))
+    llm = FixedLLM(website_result(base, "Writes about the engine."))
+    extractor = WebsiteExtractor(client=HttpClient(cache_dir=None, retries=0))
+    assert extract(extractor, f"{base}/people/ada", llm) is not None
+    assert [p.url for p in extractor.pages] == [f"{base}/people/ada", f"{base}/people/ada/note-g"]
+
+
+def test_website_agent_gets_urls_and_the_text_is_merged_after(api_stub, tmp_path):
+    site = tmp_path / "website"
+    shutil.copytree(os.path.join(FIXTURES, "website"), site)
+    (site / "index.html").write_text((site / "app.html").read_text().replace("</body>", '<a href="/about"></a><a href="/notes"></a></body>'))
+    base = api_stub(str(site))
+    extractor = WebsiteExtractor(client=HttpClient(cache_dir=None, retries=0))
+    assert extract(extractor, base, FixedLLM()) is None
+
+    # Only URLs in the prompt repeated on every agent step
+    context = extractor.agent_context()
+    assert f"{base}/about" in context and json.dumps([base]) in context
+    assert "Born in London" not in context
+
+    llm = FixedLLM(website_result(base, "Mathematician, born in London."))
+    merged = asyncio.run(extractor.complete(website_result("", "Runs an engine simulator."), "Ada Lovelace", llm))
+    assert merged.overall_summary == "Mathematician, born in London."
+    assert merged.root_url == base
+    assert "Born in London in 1815." in llm.prompts[0] and "Runs an engine simulator." in llm.prompts[0]
@@ -0,0 +1,11 @@
+import asyncio
+
+from benchmarks.http_concurrency import check, run
+
+
+def test_slow_request_does_not_block_other_agents_and_revalidates():
+    delay = 0.5
+    result = asyncio.run(run(delay))
+    assert result["status"] == 200
+    assert result["slow_seconds"] >= delay
+    assert check(result, delay) == []
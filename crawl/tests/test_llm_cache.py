@@ -0,0 +1,63 @@
+import asyncio
+
+from pydantic import BaseModel
+from browser_use.llm import UserMessage
+from browser_use.llm.views import ChatInvokeCompletion
+
+from src.llm_cache import CachedChatModel, LLMCache
+
+
+class StepOutput(BaseModel):
+    memory: str
+    action: list[dict]
+
+
+class OneAnswerLLM():
+    model = "fake-model"
+
+    def __init__(self, answer: StepOutput) -> None:
+        self.answer = answer
+        self.calls = 0
+
+    async def ainvoke(self, messages, output_format=None):
+        self.calls += 1
+        return ChatInvokeCompletion(completion=self.answer, usage=None)
+
+
+def test_cached_step_gets_the_new_tab_ids_only_in_tab_actions(tmp_path):
+    answer = StepOutput(
+        memory="Read the 2023 posts of the cafe blog on tab A1B2.",
+        action=[{"switch_tab": {"tab_id": "A1B2"}}, {"input_text": {"index": 3, "text": "2023"}}, {"close_tab": {"tab_id": "2023"}}],
+    )
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    llm = CachedChatModel(OneAnswerLLM(answer), cache)
+
+    def step(tabs: tuple[str, str]):
+        prompt = f"Current tab: {tabs[0]}\nTab {tabs[0]}: https://blog.example.org - Cafe\nTab {tabs[1]}: https://example.org/2023 - 2023"
+        return asyncio.run(llm.ainvoke([UserMessage(content=prompt)], StepOutput)).completion
+
+    # The old tab id "2023" is also a year typed in a search field
+    assert step(("A1B2", "2023")) == answer
+    rerun = step(("BEEF", "CAFE"))
+    cache.close()
+
+    assert llm.llm.calls == 1
+    assert rerun.action == [{"switch_tab": {"tab_id": "BEEF"}}, {"input_text": {"index": 3, "text": "2023"}}, {"close_tab": {"tab_id": "CAFE"}}]
+    assert rerun.memory == answer.memory
+
+
+def test_cached_step_hits_across_step_budgets(tmp_path):
+    answer = StepOutput(memory="Scrolled.", action=[{"scroll": {"down": True}}])
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    llm = CachedChatModel(OneAnswerLLM(answer), cache)
+
+    def step(max_steps: int):
+        prompt = f"Step 3. Maximum steps: {max_steps}\nCurrent date and time: 2026-10-18 11:00"
+        return asyncio.run(llm.ainvoke([UserMessage(content=prompt)], StepOutput)).completion
+
+    # The adaptive budget of the last run, then of this one
+    assert step(40) == answer
+    assert step(57) == answer
+    cache.close()
+    assert llm.llm.calls == 1
+    assert cache.stats["hits"] == 1
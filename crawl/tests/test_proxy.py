@@ -0,0 +1,88 @@
+import os
+import asyncio
+
+from src.proxy import CacheRule, CachingProxy
+
+
+async def origin(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # /ok, /missing and /nostore as plain responses, a 304 to revalidations; /ws switches protocols and echoes
+    request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    path = request.split(" ", 2)[1]
+    if "if-none-match:" in request.lower():
+        writer.write(b"HTTP/1.1 304 Not Modified\r\nETag: \"v1\"\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        writer.close()
+        return
+    if path == "/ws":
+        assert "upgrade: websocket" in request.lower()
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n\r\n")
+        while data := await reader.read(1024):
+            writer.write(b"echo:" + data)
+            await writer.drain()
+        writer.close()
+        return
+    status, extra = {"/ok": ("200 OK", ""), "/missing": ("404 Not Found", ""), "/nostore": ("200 OK", "Cache-Control: no-store\r\n")}[path]
+    body = path.encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain\r\n{extra}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    writer.close()
+
+
+async def get(proxy: CachingProxy, url: str, extra: str = "") -> bytes:
+    reader, writer = await asyncio.open_connection(proxy.host, proxy.port)
+    writer.write(f"GET {url} HTTP/1.1\r\nHost: x\r\n{extra}Connection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+def test_cache_mode_stores_only_cacheable_responses_and_passes_upgrades_through(tmp_path):
+    async def run():
+        server = await asyncio.start_server(origin, "127.0.0.1", 0)
+        base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        proxy = CachingProxy(str(tmp_path / "archive.sqlite"), mode="cache", rules=[CacheRule(pattern="127.0.0.1")])
+        await proxy.start()
+        try:
+            for path in ("/ok", "/missing", "/nostore"):
+                assert path.encode() in await get(proxy, base + path)
+            stored = {key for key in ("ok", "missing", "nostore") if proxy.archive.get(f"GET {base}/{key}") is not None}
+            assert stored == {"ok"}
+
+            reader, writer = await asyncio.open_connection(proxy.host, proxy.port)
+            writer.write(f"GET {base}/ws HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n\r\n".encode())
+            assert (await reader.readuntil(b"\r\n\r\n")).startswith(b"HTTP/1.1 101")
+            writer.write(b"ping")
+            assert await reader.readexactly(9) == b"echo:ping"
+            writer.close()
+        finally:
+            certdir = proxy._certdir
+            await proxy.close()
+            server.close()
+        assert not os.path.exists(certdir)
+
+    asyncio.run(run())
+
+
+def test_revalidation_does_not_replace_the_recorded_body(tmp_path):
+    async def run():
+        server = await asyncio.start_server(origin, "127.0.0.1", 0)
+        base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        archive = str(tmp_path / "archive.sqlite")
+        try:
+            recorder = CachingProxy(archive, mode="record")
+            await recorder.start()
+            assert (await get(recorder, f"{base}/ok")).endswith(b"/ok")
+            # The browser revalidates its cached copy: the proxy asks for the full response instead
+            revalidated = await get(recorder, f"{base}/ok", 'If-None-Match: "v1"\r\nIf-Modified-Since: Mon, 01 Jan 2024 00:00:00 GMT\r\n')
+            assert revalidated.startswith(b"HTTP/1.1 200") and revalidated.endswith(b"/ok")
+            await recorder.close()
+
+            replayer = CachingProxy(archive, mode="replay")
+            await replayer.start()
+            replayed = await get(replayer, f"{base}/ok")
+            await replayer.close()
+        finally:
+            server.close()
+        assert replayed.startswith(b"HTTP/1.1 200") and replayed.endswith(b"/ok")
+
+    asyncio.run(run())
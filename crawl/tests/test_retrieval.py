@@ -0,0 +1,63 @@
+from src.retrieval import RetrievalIndex, chunk_results, tokenize
+
+
+RESULTS = {
+    "linkedin": {
+        "name": "Ada Lovelace",
+        "location": "London",
+        "experiences": [
+            {"job_title": "Translator", "company": "Scientific Memoirs", "description": "Translated Menabrea's paper."},
+            {"job_title": "Tutor", "company": "Private", "description": "Mathematics lessons."},
+        ],
+        "education": [{"school": "Home tutoring", "degree": "Mathematics with De Morgan"}],
+    },
+    "github": {
+        "repositories_detailed": [
+            {"name": "analytical-engine", "languages": ["Python"], "code_overview": "Interpreter of engine cards."},
+            {"name": "bernoulli", "languages": ["C"], "code_overview": "Computes Bernoulli numbers."},
+        ],
+    },
+    "Notes": "# Note G\n\nA program for Bernoulli numbers.\n\n# Note A\n\nThe engine weaves algebraic patterns.",
+}
+
+
+def test_passages_by_source_and_section():
+    chunks = {(c.source, c.section) for c in chunk_results(RESULTS)}
+    assert {("linkedin", "profile"), ("linkedin", "experiences"), ("github", "repositories_detailed"), ("Notes", "Note G"), ("Notes", "Note A")} <= chunks
+    assert tokenize("The repositories of companies") == ["repository", "company"]
+
+
+def test_bm25_ranks_the_matching_passage_first():
+    index = RetrievalIndex.build(RESULTS)
+    best, _ = index.search("Bernoulli numbers", k=3)[0]
+    assert "Bernoulli" in best.text
+    scores = [score for _, score in index.search("Bernoulli numbers", k=3)]
+    assert scores == sorted(scores, reverse=True)
+    assert index.search("quantum chromodynamics") == []
+
+
+def test_question_words_are_expanded_to_result_fields():
+    index = RetrievalIndex.build(RESULTS)
+    # Neither "work" nor "study" appear in the results: they match the experience and education fields
+    assert index.search("Where did she work?", k=1)[0][0].section == "experiences"
+    assert index.search("What did she study?", k=1)[0][0].section == "education"
+    assert index.search("Where is she based?", k=1)[0][0].section == "profile"
+
+
+def test_search_fits_the_token_budget():
+    index = RetrievalIndex.build(RESULTS)
+    hits = index.search("engine", k=8, budget=20)
+    assert hits and sum(len(c.render()) for c, _ in hits) <= 20 * 4
+
+
+def test_index_round_trips_through_gzip(tmp_path):
+    index = RetrievalIndex.build(RESULTS)
+    path = str(tmp_path / "ada.index.json.gz")
+    index.save(path)
+    with open(path, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+
+    loaded = RetrievalIndex.load(path)
+    assert [c.to_list() for c in loaded.chunks] == [c.to_list() for c in index.chunks]
+    for query in ("Bernoulli numbers", "Where did she work?", "engine cards"):
+        assert loaded.scores(query) == index.scores(query)
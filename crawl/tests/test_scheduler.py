@@ -0,0 +1,93 @@
+import asyncio
+
+from src.models import Link
+from src.customizations.base_customization import BaseCustomization
+from src.scheduler import DomainLimit, DurationHistory, Scheduler, simulate
+from benchmarks.scheduler_makespan import TYPICAL, peak_concurrency, workloads
+
+
+def test_longest_first_makespan_is_at_most_fifo():
+    # Simulated makespans: wall-clock timings of a few milliseconds are at the mercy of the runner's load
+    for _, jobs in workloads(users=5):
+        seconds = [s for _, _, s in jobs]
+        for workers in (2, 3, 5):
+            assert simulate(seconds, workers) <= simulate(seconds, workers, longest_first=False)
+
+
+def test_scheduler_starts_the_longest_expected_jobs_first():
+    # The order simulate() assumes, on the real scheduler
+    _, jobs = workloads(users=5)[1]
+    history = DurationHistory()
+    started = []
+    scheduled = []
+    for i, (url, name, seconds) in enumerate(jobs):
+        builder = BaseCustomization(link=Link(url=url, description=""), name=f"{name}-{i}")
+        history.durations[builder.name] = seconds
+
+        async def job(seconds=seconds):
+            started.append(seconds)
+
+        scheduled.append((builder, job))
+    asyncio.run(Scheduler(n_workers=1, history=history, domain_limits={}).run(scheduled))
+    assert started == sorted((s for _, _, s in jobs), reverse=True)
+
+
+def test_domains_never_run_over_their_limit():
+    jobs = [(url, name, seconds) for _ in range(4) for url, name, seconds in TYPICAL]
+    limits = {"github.com": DomainLimit(max_concurrent=2), "linkedin.com": DomainLimit(max_concurrent=1), "x.com": DomainLimit(max_concurrent=1)}
+    peak = asyncio.run(peak_concurrency(jobs, workers=8, scale=0.0002, limits=limits))
+    assert peak["github.com"] == 2
+    assert peak["linkedin.com"] == 1
+    assert peak["x.com"] == 1
+
+
+def test_only_jobs_returning_true_are_recorded():
+    history = DurationHistory()
+    builders = [BaseCustomization(link=Link(url=f"https://example.org/{i}", description=""), name=f"job-{i}") for i in range(3)]
+
+    async def agent_run():
+        return True
+
+    async def extracted_or_failed():
+        return False
+
+    async def crashed():
+        raise RuntimeError("boom")
+
+    async def run():
+        scheduler = Scheduler(n_workers=3, history=history, domain_limits={})
+        await asyncio.gather(
+            scheduler.run([(builders[0], agent_run), (builders[1], extracted_or_failed)]),
+            Scheduler(n_workers=1, history=history, domain_limits={}).run([(builders[2], crashed)]),
+            return_exceptions=True,
+        )
+
+    asyncio.run(run())
+    assert list(history.durations) == ["job-0"]
+
+
+def test_fan_out_agents_share_their_domain_limit():
+    builders = [BaseCustomization(link=Link(url=f"https://github.com/user-{i}", description=""), name=f"github-{i}") for i in range(2)]
+    scheduler = Scheduler(n_workers=2, domain_limits={"github.com": DomainLimit(max_concurrent=2)})
+    running, peak = 0, 0
+
+    async def agent():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+
+    def fan_out(builder):
+        async def job():
+            await agent()   # discovery, on the job's own slot
+            async with scheduler.lends_slot(builder):
+                async def sub():
+                    async with scheduler.domain_slot(builder):
+                        await agent()
+                await asyncio.gather(*(sub() for _ in range(3)))
+            return True
+        return job
+
+    asyncio.run(asyncio.wait_for(scheduler.run([(b, fan_out(b)) for b in builders]), timeout=5))
+    assert peak == 2
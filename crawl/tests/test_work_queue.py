@@ -0,0 +1,20 @@
+from src.models import Link, UserInput
+from src.work_queue import JobQueue
+
+
+def test_restarted_coordinator_reuses_only_unfinished_jobs(tmp_path):
+    user = UserInput(name="Ada Lovelace", links=[Link(url=f"https://example.org/{i}", description="") for i in range(3)], texts=[], docs=[])
+    queue = JobQueue(str(tmp_path / "queue.sqlite"))
+    # Leased highest priority first
+    pending, running, finished = (queue.enqueue(user, i, "out", priority=i) for i in range(3))
+    assert queue.complete(queue.lease("w", 60.0).id, "w", {"bio": "from the crashed run"})
+    assert queue.lease("w", 60.0).id == running
+
+    # The coordinator crashed before collecting anything, then runs again (e.g. with --force-refresh)
+    assert queue.enqueue(user, 0, "out") == pending
+    assert queue.enqueue(user, 1, "out") == running
+    fresh = queue.enqueue(user, 2, "out")
+    assert fresh != finished
+    assert queue.get(fresh).status == "pending"
+    assert queue.collect([finished]) == []
+    queue.close()